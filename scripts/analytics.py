@@ -12,27 +12,95 @@ OpenClaw TON Skill — Token Analytics CLI
 Использует DYOR API (если ключ настроен) + TonAPI как fallback.
 """
 
+import os
 import sys
-import json
-import argparse
+import time
+import importlib.util
 from pathlib import Path
-from typing import Optional, List, Union
-from datetime import datetime, UTC
+from typing import TYPE_CHECKING, Optional, List, Union
+
+if TYPE_CHECKING:
+    import numpy as np
 
 # Локальный импорт
 script_dir = Path(__file__).parent
 sys.path.insert(0, str(script_dir))
 
-from dyor import (  # noqa: E402
-    get_token_info,
-    get_trust_score,
-    get_price_history,
-    get_token_pools,
-    resolve_token_address,
-    get_dyor_api_key,
+# Лёгкий модуль (только stdlib). dyor/tokens тянут requests и cryptography,
+# поэтому импортируются внутри функций — команды без сети (tokens) их не грузят.
+from common import (  # noqa: E402
     KNOWN_TOKENS,
+    format_price,
+    format_large_number,
+    json_dumps,
+    trust_assessment,
 )
-from tokens import get_token_market_data  # noqa: E402
+
+# NumPy / Numba / numexpr опциональны и импортируются при первом использовании,
+# здесь только проверяем, что пакеты установлены
+NUMPY_AVAILABLE = importlib.util.find_spec("numpy") is not None
+NUMBA_AVAILABLE = NUMPY_AVAILABLE and importlib.util.find_spec("numba") is not None
+NUMEXPR_AVAILABLE = NUMPY_AVAILABLE and importlib.util.find_spec("numexpr") is not None
+
+
+# Ниже этого числа точек накладные расходы NumPy больше выигрыша
+NUMPY_MIN_POINTS = 32
+
+# С этого размера дисперсия считается однопроходным Welford (Numba)
+WELFORD_MIN_POINTS = 256
+
+# Без Numba: с этого размера дисперсия считается fused-ядром numexpr
+NUMEXPR_MIN_POINTS = 4096
+
+
+# Скомпилированные Numba ядра (создаются при первом использовании)
+_numba_kernels: dict = {}
+
+
+def _welford_var_impl(a):  # pragma: no cover - компилируется Numba
+    """Популяционная дисперсия за один проход (алгоритм Welford)."""
+    mean = 0.0
+    m2 = 0.0
+    count = 0
+    for datum in a:
+        count += 1
+        delta = datum - mean
+        mean += delta / count
+        m2 += (datum - mean) * delta
+    return m2 / count if count else 0.0
+
+
+def _welford_var(a) -> float:
+    """
+    Welford-дисперсия float64-массива через Numba.
+
+    Ядро объявлено с явной сигнатурой и cache=True: машинный код
+    компилируется один раз и дальше загружается из __pycache__, а команды,
+    которым ядро не нужно, не платят ни за импорт Numba, ни за загрузку.
+    """
+    import numpy as np
+
+    kernel = _numba_kernels.get("welford_var")
+    if kernel is None:
+        from numba import njit
+
+        kernel = njit("f8(f8[::1])", cache=True)(_welford_var_impl)
+        _numba_kernels["welford_var"] = kernel
+    return kernel(np.ascontiguousarray(a, dtype=np.float64))
+
+
+_numexpr_module = None
+
+
+def _numexpr():
+    """Импортирует numexpr при первом использовании (и ограничивает потоки)."""
+    global _numexpr_module
+    if _numexpr_module is None:
+        import numexpr
+
+        numexpr.set_num_threads(min(4, os.cpu_count() or 1))
+        _numexpr_module = numexpr
+    return _numexpr_module
 
 
 # =============================================================================
@@ -40,7 +108,7 @@ from tokens import get_token_market_data  # noqa: E402
 # =============================================================================
 
 
-def get_full_token_info(token: str) -> dict:
+def get_full_token_info(token: str, *, include_formatted: bool = True) -> dict:
     """
     Получает полную информацию о токене (агрегация из разных источников).
 
@@ -49,42 +117,51 @@ def get_full_token_info(token: str) -> dict:
 
     Args:
         token: Символ токена или адрес
+        include_formatted: Добавлять ли блок "formatted" (строки для вывода)
 
     Returns:
         dict с полной информацией
     """
+    from concurrent.futures import ThreadPoolExecutor
+
+    from dyor import get_token_info, get_trust_score, resolve_token_address
+    from tokens import get_token_market_data
+
     token_address = resolve_token_address(token)
 
-    # Базовая информация
-    info = get_token_info(token)
+    # Три независимых запроса — выполняем параллельно
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        info_future = executor.submit(get_token_info, token)
+        trust_future = executor.submit(get_trust_score, token)
+        market_future = executor.submit(get_token_market_data, token_address)
 
-    # Trust score
-    trust = get_trust_score(token)
+        # Базовая информация
+        info = info_future.result()
 
-    # Try swap.coffee Tokens API for better market stats
-    tokens_api_data = {}
-    try:
-        tokens_result = get_token_market_data(token_address)
-        if tokens_result.get("success"):
-            tokens_api_data = tokens_result
-    except Exception:
-        pass
-
-    holders_count: Union[int, None] = tokens_api_data.get("holders_count") or info.get(
-        "holders_count"
-    )
-    liquidity: Union[int, float, None] = tokens_api_data.get("tvl_usd") or info.get(
-        "liquidity"
-    )
-    price_usd: Union[float, None] = tokens_api_data.get("price_usd") or info.get(
-        "price_usd"
+        # Trust score
+        trust = trust_future.result()
+
+        # Try swap.coffee Tokens API for better market stats
+        tokens_api_data = {}
+        try:
+            tokens_result = market_future.result()
+            if tokens_result.get("success"):
+                tokens_api_data = tokens_result
+        except Exception:
+            pass
+
+    market = tokens_api_data.get
+    base = info.get
+
+    holders_count: Union[int, None] = _pick(
+        market("holders_count"), base("holders_count")
     )
-    market_cap: Union[int, float, None] = tokens_api_data.get("mcap") or info.get(
-        "market_cap"
+    liquidity: Union[int, float, None] = _pick(market("tvl_usd"), base("liquidity"))
+    price_usd: Union[float, None] = _pick(market("price_usd"), base("price_usd"))
+    market_cap: Union[int, float, None] = _pick(market("mcap"), base("market_cap"))
+    volume_24h: Union[int, float, None] = _pick(
+        market("volume_usd_24h"), base("volume_24h")
     )
-    volume_24h: Union[int, float, None] = tokens_api_data.get(
-        "volume_usd_24h"
-    ) or info.get("volume_24h")
 
     # Объединяем (swap.coffee > DYOR > TonAPI)
     result = {
@@ -101,18 +178,16 @@ def get_full_token_info(token: str) -> dict:
             if s
         ],
         # Metadata
-        "name": tokens_api_data.get("name") or info.get("name"),
-        "symbol": tokens_api_data.get("symbol") or info.get("symbol"),
+        "name": _pick(market("name"), base("name")),
+        "symbol": _pick(market("symbol"), base("symbol")),
         "decimals": info.get("decimals"),
         "image": info.get("image"),
         "description": info.get("description"),
         # Market data (prefer swap.coffee)
         "price_usd": price_usd,
-        "price_change_24h": tokens_api_data.get("price_change_24h")
-        or info.get("price_change_24h"),
+        "price_change_24h": _pick(market("price_change_24h"), base("price_change_24h")),
         "market_cap": market_cap,
-        "fully_diluted_mcap": tokens_api_data.get("fdmc")
-        or info.get("fully_diluted_mcap"),
+        "fully_diluted_mcap": _pick(market("fdmc"), base("fully_diluted_mcap")),
         "volume_24h": volume_24h,
         "liquidity": liquidity,
         # Supply
@@ -121,11 +196,11 @@ def get_full_token_info(token: str) -> dict:
         "holders_count": holders_count,
         "mintable": info.get("mintable"),
         # Trust (prefer swap.coffee trust_score)
-        "trust_score": tokens_api_data.get("trust_score") or trust.get("trust_score"),
+        "trust_score": _pick(market("trust_score"), trust.get("trust_score")),
         "trust_level": trust.get("trust_level"),
-        "verification": tokens_api_data.get("verification")
-        or info.get("verification")
-        or trust.get("verification"),
+        "verification": _pick(
+            market("verification"), base("verification"), trust.get("verification")
+        ),
         "warnings": trust.get("warnings", []),
         "flags": trust.get("flags", []),
         # Links
@@ -133,50 +208,66 @@ def get_full_token_info(token: str) -> dict:
         "websites": info.get("websites", []),
         # Meta
         "created_at": info.get("created_at"),
-        "fetched_at": datetime.now(UTC).isoformat(),
+        "fetched_at": _fetched_at(),
     }
 
     # Форматируем большие числа
-    result["formatted"] = {
-        "price": _format_price(price_usd),
-        "market_cap": _format_large_number(market_cap),
-        "volume_24h": _format_large_number(volume_24h),
-        "liquidity": _format_large_number(liquidity),
-        "holders": _format_number(holders_count),
-    }
+    if include_formatted:
+        result["formatted"] = {
+            "price": _format_price(price_usd),
+            "market_cap": _format_large_number(market_cap),
+            "volume_24h": _format_large_number(volume_24h),
+            "liquidity": _format_large_number(liquidity),
+            "holders": _format_number(holders_count),
+        }
 
     return result
 
 
-def _format_price(price: Optional[float]) -> str:
-    """Форматирует цену."""
-    if price is None:
-        return "N/A"
-    if price < 0.0001:
-        return f"${price:.8f}"
-    elif price < 1:
-        return f"${price:.6f}"
-    elif price < 100:
-        return f"${price:.4f}"
-    else:
-        return f"${price:,.2f}"
+def _pick(*values):
+    """
+    Первое значение, которое не None (приоритет источников слева направо).
 
+    В отличие от цепочки `a or b`, законные 0 / 0.0 (например, holders_count == 0)
+    не проваливаются к следующему источнику.
+    """
+    for value in values:
+        if value is not None:
+            return value
+    return None
 
-def _format_large_number(num: Optional[float]) -> str:
-    """Форматирует большое число (1.5M, 2.3B и т.д.)."""
-    if num is None:
-        return "N/A"
 
-    num = float(num)
+# (unix time, ISO-строка) последней метки fetched_at
+_fetched_at_cache: tuple = (0.0, "")
 
-    if num >= 1_000_000_000:
-        return f"${num / 1_000_000_000:.2f}B"
-    elif num >= 1_000_000:
-        return f"${num / 1_000_000:.2f}M"
-    elif num >= 1_000:
-        return f"${num / 1_000:.2f}K"
-    else:
-        return f"${num:,.2f}"
+
+def _fetched_at() -> str:
+    """
+    ISO-метка текущего времени (UTC) для fetched_at.
+
+    В пределах одной секунды возвращает одну и ту же строку, чтобы пакетные
+    запросы (compare) не создавали datetime на каждый токен.
+    """
+    global _fetched_at_cache
+    now = time.time()
+    cached_at, cached = _fetched_at_cache
+    if 0 <= now - cached_at < 1.0:
+        return cached
+    from datetime import datetime, UTC
+
+    stamp = datetime.fromtimestamp(now, UTC).isoformat()
+    _fetched_at_cache = (now, stamp)
+    return stamp
+
+
+def _format_price(price: Optional[float]) -> str:
+    """Форматирует цену. Делегирует в common.format_price."""
+    return format_price(price)
+
+
+def _format_large_number(num: Optional[float]) -> str:
+    """Форматирует большое число (1.5M, 2.3B и т.д.). Делегирует в common.format_large_number."""
+    return format_large_number(num)
 
 
 def _format_number(num: Optional[int]) -> str:
@@ -202,6 +293,8 @@ def analyze_price_history(token: str, days: int = 7) -> dict:
     Returns:
         dict с анализом
     """
+    from dyor import get_price_history
+
     history = get_price_history(token, days=days, interval="1h")
 
     if not history.get("success"):
@@ -213,25 +306,21 @@ def analyze_price_history(token: str, days: int = 7) -> dict:
         return {"success": False, "error": "No price data available"}
 
     # Извлекаем цены
-    prices = [float(p.get("price", 0)) for p in data if p.get("price")]
+    prices = _extract_prices(data)
 
-    if not prices:
+    if len(prices) == 0:
         return {"success": False, "error": "No valid prices in history"}
 
     # Статистика
-    current_price = prices[-1]
-    start_price = prices[0]
-    high_price = max(prices)
-    low_price = min(prices)
-    avg_price = sum(prices) / len(prices)
+    current_price = float(prices[-1])
+    start_price = float(prices[0])
+    high_price, low_price, avg_price, volatility = _price_stats(prices)
 
     # Изменения
     change_abs = current_price - start_price
     change_pct = (change_abs / start_price * 100) if start_price > 0 else 0
 
     # Волатильность (стандартное отклонение)
-    variance = sum((p - avg_price) ** 2 for p in prices) / len(prices)
-    volatility = variance**0.5
     volatility_pct = (volatility / avg_price * 100) if avg_price > 0 else 0
 
     # Тренд
@@ -270,6 +359,57 @@ def analyze_price_history(token: str, days: int = 7) -> dict:
     }
 
 
+def _extract_prices(data: List[dict]):
+    """
+    Извлекает ненулевые цены из списка точек истории ({"price": ...}).
+
+    Длинные ряды пишутся сразу в float64-массив, без промежуточного списка;
+    короткие возвращаются списком.
+    """
+    if not NUMPY_AVAILABLE:
+        return [float(p.get("price", 0)) for p in data if p.get("price")]
+
+    import numpy as np
+
+    if len(data) >= NUMPY_MIN_POINTS:
+        return np.fromiter(
+            (float(p["price"]) for p in data if p.get("price")), dtype=np.float64
+        )
+
+    return [float(p.get("price", 0)) for p in data if p.get("price")]
+
+
+def _price_stats(prices: Union[List[float], "np.ndarray"]) -> tuple:
+    """
+    Считает max, min, среднее и стандартное отклонение (популяционное) цен.
+
+    Для длинных рядов — один векторизованный проход NumPy (если установлен),
+    для очень длинных — численно устойчивый Welford, скомпилированный Numba,
+    либо (без Numba) fused-ядро numexpr.
+    """
+    if NUMPY_AVAILABLE and (
+        not isinstance(prices, list) or len(prices) >= NUMPY_MIN_POINTS
+    ):
+        import numpy as np
+
+        arr = np.asarray(prices, dtype=np.float64)
+        if NUMBA_AVAILABLE and len(arr) > WELFORD_MIN_POINTS:
+            volatility = float(_welford_var(arr)) ** 0.5
+        elif NUMEXPR_AVAILABLE and len(arr) > NUMEXPR_MIN_POINTS:
+            mean = arr.mean()
+            sq_sum = _numexpr().evaluate(
+                "sum((prices - mean) ** 2)", local_dict={"prices": arr, "mean": mean}
+            )
+            volatility = (float(sq_sum) / len(arr)) ** 0.5
+        else:
+            volatility = float(arr.std())
+        return float(arr.max()), float(arr.min()), float(arr.mean()), volatility
+
+    avg_price = sum(prices) / len(prices)
+    variance = sum((p - avg_price) ** 2 for p in prices) / len(prices)
+    return max(prices), min(prices), avg_price, variance**0.5
+
+
 # =============================================================================
 # Pool Analysis
 # =============================================================================
@@ -285,6 +425,8 @@ def analyze_pools(token: str) -> dict:
     Returns:
         dict с анализом пулов
     """
+    from dyor import get_token_pools
+
     pools_data = get_token_pools(token)
 
     if not pools_data.get("success"):
@@ -300,43 +442,54 @@ def analyze_pools(token: str) -> dict:
             "message": "No pools found for this token",
         }
 
-    # Группировка по DEX
-    dex_stats = {}
-    total_liquidity = 0
-    total_volume = 0
-
-    for pool in pools:
-        dex = pool.get("dex", pool.get("dex_name", "unknown"))
-        liq = pool.get("liquidity", 0) or 0
-        vol = pool.get("volume_24h", 0) or 0
-
-        if dex not in dex_stats:
-            dex_stats[dex] = {
-                "pools_count": 0,
-                "total_liquidity": 0,
-                "total_volume_24h": 0,
-                "pairs": [],
-            }
+    # Колонки (SoA) — один проход по пулам
+    dexes, pairs, liquidity, volume = _pool_columns(pools)
+
+    # Индекс группы для каждого пула (DEX в порядке первого появления)
+    dex_index: dict = {}
+    group = [dex_index.setdefault(dex, len(dex_index)) for dex in dexes]
+    groups_count = len(dex_index)
+
+    if NUMPY_AVAILABLE and len(pools) >= NUMPY_MIN_POINTS:
+        import numpy as np
+
+        liq_arr = np.asarray(liquidity, dtype=np.float64)
+        vol_arr = np.asarray(volume, dtype=np.float64)
+        counts = np.bincount(group, minlength=groups_count).tolist()
+        liq_sums = np.bincount(group, liq_arr, minlength=groups_count).tolist()
+        vol_sums = np.bincount(group, vol_arr, minlength=groups_count).tolist()
+        total_liquidity = float(liq_arr.sum())
+        total_volume = float(vol_arr.sum())
+        top_idx = np.argsort(-liq_arr, kind="stable")[:5].tolist()
+    else:
+        counts = [0] * groups_count
+        liq_sums = [0] * groups_count
+        vol_sums = [0] * groups_count
+        for g, liq, vol in zip(group, liquidity, volume):
+            counts[g] += 1
+            liq_sums[g] += liq
+            vol_sums[g] += vol
+        total_liquidity = sum(liquidity)
+        total_volume = sum(volume)
+        top_idx = sorted(range(len(pools)), key=liquidity.__getitem__, reverse=True)[:5]
 
-        dex_stats[dex]["pools_count"] += 1
-        dex_stats[dex]["total_liquidity"] += liq
-        dex_stats[dex]["total_volume_24h"] += vol
+    # Группировка по DEX
+    dex_stats = {
+        dex: {
+            "pools_count": counts[i],
+            "total_liquidity": liq_sums[i],
+            "total_volume_24h": vol_sums[i],
+            "pairs": [],
+        }
+        for dex, i in dex_index.items()
+    }
+    for dex, pair, liq, vol in zip(dexes, pairs, liquidity, volume):
         dex_stats[dex]["pairs"].append(
-            {
-                "pair": pool.get("pair_name")
-                or f"{pool.get('token0_symbol')}/{pool.get('token1_symbol')}",
-                "liquidity": liq,
-                "volume_24h": vol,
-            }
+            {"pair": pair, "liquidity": liq, "volume_24h": vol}
         )
 
-        total_liquidity += liq
-        total_volume += vol
-
-    # Сортировка пулов по ликвидности
-    top_pools = sorted(pools, key=lambda x: x.get("liquidity", 0) or 0, reverse=True)[
-        :5
-    ]
+    # Топ пулов по ликвидности
+    top_pools = [pools[i] for i in top_idx]
 
     return {
         "success": True,
@@ -353,6 +506,30 @@ def analyze_pools(token: str) -> dict:
     }
 
 
+def _pool_columns(pools: List[dict]) -> tuple:
+    """
+    Проецирует пулы в колонки (dex, pair, liquidity, volume_24h) за один проход.
+
+    Остальные поля пулов не трогаются — дальше агрегация работает только
+    с этими колонками.
+    """
+    dexes = []
+    pairs = []
+    liquidity = []
+    volume = []
+
+    for pool in pools:
+        get = pool.get
+        dexes.append(get("dex", get("dex_name", "unknown")))
+        pairs.append(
+            get("pair_name") or f"{get('token0_symbol')}/{get('token1_symbol')}"
+        )
+        liquidity.append(get("liquidity", 0) or 0)
+        volume.append(get("volume_24h", 0) or 0)
+
+    return dexes, pairs, liquidity, volume
+
+
 # =============================================================================
 # Token Comparison
 # =============================================================================
@@ -370,24 +547,40 @@ def compare_tokens_detailed(tokens: List[str]) -> dict:
     """
     results = []
 
-    for token in tokens:
-        info = get_full_token_info(token)
+    # Токены независимы — запрашиваем параллельно (порядок сохраняется)
+    infos = []
+    if tokens:
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=min(len(tokens), 8)) as executor:
+            infos = list(
+                executor.map(
+                    lambda t: get_full_token_info(t, include_formatted=False), tokens
+                )
+            )
+
+    for token, info in zip(tokens, infos):
+        price_usd = info.get("price_usd")
+        market_cap = info.get("market_cap")
+        volume_24h = info.get("volume_24h")
+        liquidity = info.get("liquidity")
+        holders = info.get("holders_count")
 
         results.append(
             {
                 "token": token,
                 "symbol": info.get("symbol"),
                 "name": info.get("name"),
-                "price_usd": info.get("price_usd"),
-                "price_formatted": info.get("formatted", {}).get("price"),
-                "market_cap": info.get("market_cap"),
-                "market_cap_formatted": info.get("formatted", {}).get("market_cap"),
-                "volume_24h": info.get("volume_24h"),
-                "volume_formatted": info.get("formatted", {}).get("volume_24h"),
-                "liquidity": info.get("liquidity"),
-                "liquidity_formatted": info.get("formatted", {}).get("liquidity"),
-                "holders": info.get("holders_count"),
-                "holders_formatted": info.get("formatted", {}).get("holders"),
+                "price_usd": price_usd,
+                "price_formatted": _format_price(price_usd),
+                "market_cap": market_cap,
+                "market_cap_formatted": _format_large_number(market_cap),
+                "volume_24h": volume_24h,
+                "volume_formatted": _format_large_number(volume_24h),
+                "liquidity": liquidity,
+                "liquidity_formatted": _format_large_number(liquidity),
+                "holders": holders,
+                "holders_formatted": _format_number(holders),
                 "trust_score": info.get("trust_score"),
                 "trust_level": info.get("trust_level"),
                 "verification": info.get("verification"),
@@ -397,22 +590,9 @@ def compare_tokens_detailed(tokens: List[str]) -> dict:
 
     # Рейтинги
     if len(results) > 1:
-        # По market cap
-        by_mcap = sorted(results, key=lambda x: x.get("market_cap") or 0, reverse=True)
-        for i, r in enumerate(by_mcap):
-            r["rank_by_mcap"] = i + 1
-
-        # По ликвидности
-        by_liq = sorted(results, key=lambda x: x.get("liquidity") or 0, reverse=True)
-        for i, r in enumerate(by_liq):
-            r["rank_by_liquidity"] = i + 1
-
-        # По trust
-        by_trust = sorted(
-            results, key=lambda x: x.get("trust_score") or 0, reverse=True
-        )
-        for i, r in enumerate(by_trust):
-            r["rank_by_trust"] = i + 1
+        _assign_ranks(results, "market_cap", "rank_by_mcap")
+        _assign_ranks(results, "liquidity", "rank_by_liquidity")
+        _assign_ranks(results, "trust_score", "rank_by_trust")
 
     return {
         "success": True,
@@ -425,12 +605,97 @@ def compare_tokens_detailed(tokens: List[str]) -> dict:
     }
 
 
+def _assign_ranks(results: List[dict], key: str, rank_field: str) -> None:
+    """
+    Проставляет ранг (1 = наибольшее значение key) в rank_field каждой строки.
+
+    При равенстве значений сохраняется исходный порядок.
+    """
+    if NUMPY_AVAILABLE and len(results) >= NUMPY_MIN_POINTS:
+        import numpy as np
+
+        column = np.fromiter(
+            (r.get(key) or 0 for r in results), dtype=np.float64, count=len(results)
+        )
+        order = np.argsort(-column, kind="stable")
+        ranks = np.empty_like(order)
+        ranks[order] = np.arange(1, len(order) + 1)
+        for r, rank in zip(results, ranks.tolist()):
+            r[rank_field] = rank
+        return
+
+    ordered = sorted(results, key=lambda x: x.get(key) or 0, reverse=True)
+    for i, r in enumerate(ordered):
+        r[rank_field] = i + 1
+
+
 # =============================================================================
 # CLI
 # =============================================================================
 
 
+def _handle_trust(args) -> dict:
+    """trust: trust score + человекочитаемая оценка."""
+    from dyor import get_trust_score
+
+    result = get_trust_score(args.token)
+
+    # Добавляем человекочитаемую оценку
+    score = result.get("trust_score")
+    if score is not None:
+        result["assessment"] = trust_assessment(score)
+
+    return result
+
+
+def _handle_compare(args) -> dict:
+    """compare: сравнение токенов из списка через запятую."""
+    tokens = [t.strip() for t in args.tokens.split(",")]
+    return compare_tokens_detailed(tokens)
+
+
+def _handle_tokens(args) -> dict:
+    """tokens: список известных токенов."""
+    return {
+        "success": True,
+        "known_tokens": [
+            {"symbol": k, "address": v} for k, v in sorted(KNOWN_TOKENS.items())
+        ],
+        "count": len(KNOWN_TOKENS),
+    }
+
+
+def _handle_status(args) -> dict:
+    """status: доступность API."""
+    from dyor import get_dyor_api_key
+
+    dyor_key = get_dyor_api_key()
+    return {
+        "success": True,
+        "dyor_api": {
+            "configured": bool(dyor_key),
+            "status": "ready" if dyor_key else "not configured",
+        },
+        "tonapi": {"status": "always available (fallback)"},
+        "note": "Run 'python dyor.py config --key YOUR_KEY' to enable full DYOR features",
+    }
+
+
+# Команда CLI -> обработчик (args) -> dict
+COMMAND_HANDLERS = {
+    "info": lambda args: get_full_token_info(args.token),
+    "trust": _handle_trust,
+    "history": lambda args: analyze_price_history(args.token, args.days),
+    "pools": lambda args: analyze_pools(args.token),
+    "compare": _handle_compare,
+    "tokens": _handle_tokens,
+    "status": _handle_status,
+}
+
+
 def main():
+    import argparse
+
     parser = argparse.ArgumentParser(
         description="TON Token Analytics CLI",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -502,65 +767,19 @@ Notes:
         return
 
     try:
-        if args.command == "info":
-            result = get_full_token_info(args.token)
-
-        elif args.command == "trust":
-            result = get_trust_score(args.token)
-
-            # Добавляем человекочитаемую оценку
-            score = result.get("trust_score")
-            if score is not None:
-                if score >= 80:
-                    result["assessment"] = "✅ HIGH TRUST - Generally safe"
-                elif score >= 50:
-                    result["assessment"] = "⚠️ MEDIUM TRUST - Proceed with caution"
-                elif score >= 20:
-                    result["assessment"] = "🔴 LOW TRUST - High risk"
-                else:
-                    result["assessment"] = "🚨 VERY LOW TRUST - Likely scam"
-
-        elif args.command == "history":
-            result = analyze_price_history(args.token, args.days)
-
-        elif args.command == "pools":
-            result = analyze_pools(args.token)
-
-        elif args.command == "compare":
-            tokens = [t.strip() for t in args.tokens.split(",")]
-            result = compare_tokens_detailed(tokens)
-
-        elif args.command == "tokens":
-            result = {
-                "success": True,
-                "known_tokens": [
-                    {"symbol": k, "address": v} for k, v in sorted(KNOWN_TOKENS.items())
-                ],
-                "count": len(KNOWN_TOKENS),
-            }
-
-        elif args.command == "status":
-            dyor_key = get_dyor_api_key()
-            result = {
-                "success": True,
-                "dyor_api": {
-                    "configured": bool(dyor_key),
-                    "status": "ready" if dyor_key else "not configured",
-                },
-                "tonapi": {"status": "always available (fallback)"},
-                "note": "Run 'python dyor.py config --key YOUR_KEY' to enable full DYOR features",
-            }
-
-        else:
+        handler = COMMAND_HANDLERS.get(args.command)
+        if handler is None:
             result = {"error": f"Unknown command: {args.command}"}
+        else:
+            result = handler(args)
 
-        print(json.dumps(result, indent=2, ensure_ascii=False))
+        print(json_dumps(result))
 
         if not result.get("success", True):
             return sys.exit(1)
 
     except Exception as e:
-        print(json.dumps({"error": str(e)}, indent=2))
+        print(json_dumps({"error": str(e)}))
         return sys.exit(1)
 
 
@@ -10,13 +10,25 @@ Centralized configuration for:
 - Formatting utilities
 """
 
-from typing import Optional
+import json
+from bisect import bisect_right
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Optional, Union
+
+# Опционально: быстрый JSON (C-реализация)
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 # =============================================================================
 # Known Tokens (symbol -> master contract address)
 # =============================================================================
 
-KNOWN_TOKENS = {
+_KNOWN_TOKENS = {
     # Native
     "TON": "native",
     # Stablecoins
@@ -46,10 +58,18 @@ KNOWN_TOKENS = {
     "PUNK": "EQA8R2R0JMRXQzYKy_fNFbzgTbJHvzLQZI3k8Fh8dJcSo9BK",
 }
 
+# Read-only views: the tables are fixed at import time
+KNOWN_TOKENS = MappingProxyType(_KNOWN_TOKENS)
+
+# Uppercase-keyed view for case-insensitive symbol lookups
+KNOWN_TOKENS_UPPER = MappingProxyType(
+    {symbol.upper(): addr for symbol, addr in _KNOWN_TOKENS.items()}
+)
+
 # Reverse mapping (address -> symbol) for quick lookups
-ADDRESS_TO_SYMBOL = {
-    addr: symbol for symbol, addr in KNOWN_TOKENS.items() if addr != "native"
-}
+ADDRESS_TO_SYMBOL = MappingProxyType(
+    {addr: symbol for symbol, addr in _KNOWN_TOKENS.items() if addr != "native"}
+)
 
 
 # =============================================================================
@@ -107,6 +127,20 @@ TRUST_LEVEL_MAP = {
     "BLACKLISTED": {"score": 5, "level": "scam", "emoji": "🚨"},
 }
 
+# Trust score thresholds (0-100) and human-readable assessments per band
+_TRUST_THRESHOLDS = (20, 50, 80)
+_TRUST_MESSAGES = (
+    "🚨 VERY LOW TRUST - Likely scam",
+    "🔴 LOW TRUST - High risk",
+    "⚠️ MEDIUM TRUST - Proceed with caution",
+    "✅ HIGH TRUST - Generally safe",
+)
+
+
+def trust_assessment(score: float) -> str:
+    """Human-readable assessment for a 0-100 trust score."""
+    return _TRUST_MESSAGES[bisect_right(_TRUST_THRESHOLDS, score)]
+
 
 # =============================================================================
 # Error Messages
@@ -129,20 +163,25 @@ ERROR_MESSAGES = {
 # =============================================================================
 
 
+# Таблицы порогов для форматирования (bisect вместо цепочки if/elif)
+_PRICE_THRESHOLDS = (0.000001, 0.0001, 1, 100)
+_PRICE_FORMATS = (".10f", ".8f", ".6f", ".4f", ",.2f")
+
+_LARGE_NUMBER_THRESHOLDS = (1_000, 1_000_000, 1_000_000_000)
+_LARGE_NUMBER_SCALES = (
+    (1, ",.2f", ""),
+    (1_000, ".2f", "K"),
+    (1_000_000, ".2f", "M"),
+    (1_000_000_000, ".2f", "B"),
+)
+
+
 def format_price(price: Optional[float]) -> str:
     """Format price for display with appropriate precision."""
     if price is None:
         return "N/A"
-    if price < 0.000001:
-        return f"${price:.10f}"
-    elif price < 0.0001:
-        return f"${price:.8f}"
-    elif price < 1:
-        return f"${price:.6f}"
-    elif price < 100:
-        return f"${price:.4f}"
-    else:
-        return f"${price:,.2f}"
+    spec = _PRICE_FORMATS[bisect_right(_PRICE_THRESHOLDS, price)]
+    return f"${price:{spec}}"
 
 
 def format_large_number(num: Optional[float], prefix: str = "$") -> str:
@@ -154,14 +193,10 @@ def format_large_number(num: Optional[float], prefix: str = "$") -> str:
     sign = "-" if num < 0 else ""
     num = abs(num)
 
-    if num >= 1_000_000_000:
-        return f"{sign}{prefix}{num / 1_000_000_000:.2f}B"
-    elif num >= 1_000_000:
-        return f"{sign}{prefix}{num / 1_000_000:.2f}M"
-    elif num >= 1_000:
-        return f"{sign}{prefix}{num / 1_000:.2f}K"
-    else:
-        return f"{sign}{prefix}{num:,.2f}"
+    scale, spec, suffix = _LARGE_NUMBER_SCALES[
+        bisect_right(_LARGE_NUMBER_THRESHOLDS, num)
+    ]
+    return f"{sign}{prefix}{num / scale:{spec}}{suffix}"
 
 
 def format_number(num: Optional[int]) -> str:
@@ -199,11 +234,44 @@ def truncate_address(address: str, start: int = 6, end: int = 4) -> str:
     return f"{address[:start]}...{address[-end:]}"
 
 
+# =============================================================================
+# JSON (orjson if installed)
+# =============================================================================
+
+
+def json_dumps(obj: Any, indent: bool = True) -> str:
+    """
+    Serialize an object to a JSON string for CLI output.
+
+    Uses orjson when installed, stdlib json otherwise.
+    Non-ASCII characters are kept unescaped in both cases.
+    """
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        try:
+            return orjson.dumps(obj, option=option).decode("utf-8")
+        except TypeError:
+            # e.g. ints wider than 64 bits — stdlib handles them
+            pass
+    if indent:
+        return json.dumps(obj, indent=2, ensure_ascii=False)
+    # Compact, same bytes as orjson without OPT_INDENT_2
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+
+def json_loads(data: Union[str, bytes]) -> Any:
+    """Parse JSON with orjson when installed, stdlib json otherwise."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
 # =============================================================================
 # Token Resolution
 # =============================================================================
 
 
+@lru_cache(maxsize=1024)
 def resolve_token_symbol(token: str) -> str:
     """
     Resolve token symbol or address to master contract address.
@@ -217,8 +285,9 @@ def resolve_token_symbol(token: str) -> str:
     token_upper = token.upper().strip()
 
     # Check known tokens first
-    if token_upper in KNOWN_TOKENS:
-        return KNOWN_TOKENS[token_upper]
+    known = KNOWN_TOKENS_UPPER.get(token_upper)
+    if known is not None:
+        return known
 
     # If it looks like an address, return as-is
     if ":" in token or len(token) > 40:
@@ -228,6 +297,7 @@ def resolve_token_symbol(token: str) -> str:
     return token
 
 
+@lru_cache(maxsize=1024)
 def get_token_symbol(address: str) -> Optional[str]:
     """
     Get token symbol from address if known.
@@ -272,6 +342,7 @@ For more information: https://github.com/openclaw/openclaw-ton-skill
 __all__ = [
     # Tokens
     "KNOWN_TOKENS",
+    "KNOWN_TOKENS_UPPER",
     "ADDRESS_TO_SYMBOL",
     "resolve_token_symbol",
     "get_token_symbol",
@@ -289,6 +360,7 @@ __all__ = [
     # Verification
     "VERIFICATION_LEVELS",
     "TRUST_LEVEL_MAP",
+    "trust_assessment",
     # Errors
     "ERROR_MESSAGES",
     # Formatting
@@ -298,6 +370,9 @@ __all__ = [
     "format_percent",
     "format_ton_amount",
     "truncate_address",
+    # JSON
+    "json_dumps",
+    "json_loads",
     # Help
     "COMMON_EPILOG",
 ]
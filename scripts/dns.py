@@ -6,52 +6,85 @@ OpenClaw TON Skill — DNS (.ton домены)
 - Информация о домене
 """
 
+import re
 import sys
-import json
 import argparse
 from pathlib import Path
+from types import MappingProxyType
+from typing import Tuple
 
 # Локальный импорт
 script_dir = Path(__file__).parent
 sys.path.insert(0, str(script_dir))
 
-from utils import tonapi_request, is_valid_address, raw_to_friendly, normalize_address  # noqa: E402
+from utils import (  # noqa: E402
+    tonapi_request,
+    is_valid_address,
+    raw_to_friendly,
+    normalize_address,
+    ttl_cache,
+)
+from common import json_dumps  # noqa: E402
 
 
 # =============================================================================
 # DNS Resolution
 # =============================================================================
 
+# Общий read-only default для отсутствующих вложенных объектов ответа
+_EMPTY = MappingProxyType({})
+
+
+# Подстрока ошибки TonAPI → читаемое сообщение
+_DNS_ERROR_MESSAGES = MappingProxyType(
+    {
+        "not resolved": "Domain not found or has no wallet address",
+        "entity not found": "Domain does not exist",
+    }
+)
+
+# Все подстроки одним regex — один проход по тексту ошибки
+_DNS_ERROR_RE = re.compile("|".join(map(re.escape, _DNS_ERROR_MESSAGES)))
+
 
 def _format_dns_error(error) -> str:
     """Форматирует ошибку DNS в читаемый вид."""
     if isinstance(error, dict):
         inner_error = error.get("error", "")
-        if "not resolved" in str(inner_error):
-            return "Domain not found or has no wallet address"
-        if "entity not found" in str(inner_error):
-            return "Domain does not exist"
-        return str(inner_error) if inner_error else "Unknown DNS error"
+        if not inner_error:
+            return "Unknown DNS error"
+        inner_error = str(inner_error)
+        match = _DNS_ERROR_RE.search(inner_error)
+        return _DNS_ERROR_MESSAGES[match.group(0)] if match else inner_error
     return str(error)
 
 
-def resolve_domain(domain: str) -> dict:
+def _split_domain(domain: str) -> Tuple[str, bool]:
+    """Один проход по вводу: (строка в нижнем регистре без пробелов, оканчивается ли на .ton)."""
+    domain_clean = domain.strip().lower()
+    return domain_clean, domain_clean.endswith(".ton")
+
+
+def _normalize_domain(domain: str) -> str:
+    """Приводит домен к виду "name.ton" (нижний регистр, без пробелов)."""
+    domain_clean, is_dot_ton = _split_domain(domain)
+    return domain_clean if is_dot_ton else domain_clean + ".ton"
+
+
+@ttl_cache("long", key_func=_normalize_domain)
+def resolve_domain(domain: str, include_raw: bool = False) -> dict:
     """
     Резолвит .ton домен в адрес.
 
     Args:
         domain: Домен (с или без .ton суффикса)
+        include_raw: Добавить исходный ответ API в raw_response
 
     Returns:
         dict с wallet адресом и информацией о домене
     """
     # Нормализуем домен
-    domain_clean = domain.lower().strip()
-    if not domain_clean.endswith(".ton"):
-        domain_clean += ".ton"
-
-    # Убираем .ton для API
-    # domain_name = domain_clean[:-4]
+    domain_clean = _normalize_domain(domain)
 
     # TonAPI DNS resolve
     result = tonapi_request(f"/dns/{domain_clean}/resolve")
@@ -79,7 +112,7 @@ def resolve_domain(domain: str) -> dict:
     # Fallback: ищем в sites (некоторые домены имеют site но не wallet)
     sites = data.get("sites", [])
 
-    return {
+    output = {
         "success": True,
         "domain": domain_clean,
         "wallet": wallet_address,
@@ -87,24 +120,26 @@ def resolve_domain(domain: str) -> dict:
         if wallet_address and ":" in wallet_address
         else wallet_address,
         "sites": sites,
-        "raw_response": data,
     }
+    if include_raw:
+        output["raw_response"] = data
+    return output
 
 
-def get_domain_info(domain: str) -> dict:
+@ttl_cache("long", key_func=_normalize_domain)
+def get_domain_info(domain: str, include_raw: bool = False) -> dict:
     """
     Получает полную информацию о .ton домене.
 
     Args:
         domain: Домен (с или без .ton суффикса)
+        include_raw: Добавить исходный ответ API в raw_response
 
     Returns:
         dict с информацией о домене (владелец, NFT адрес, expiry и т.д.)
     """
     # Нормализуем домен
-    domain_clean = domain.lower().strip()
-    if not domain_clean.endswith(".ton"):
-        domain_clean += ".ton"
+    domain_clean = _normalize_domain(domain)
 
     # TonAPI DNS info
     result = tonapi_request(f"/dns/{domain_clean}")
@@ -119,11 +154,11 @@ def get_domain_info(domain: str) -> dict:
     data = result["data"]
 
     # Парсим ответ
-    nft_item = data.get("item", {})
-    owner = nft_item.get("owner", {}).get("address")
-    collection = nft_item.get("collection", {})
+    nft_item = data.get("item") or _EMPTY
+    owner = (nft_item.get("owner") or _EMPTY).get("address")
+    collection = nft_item.get("collection") or _EMPTY
 
-    return {
+    output = {
         "success": True,
         "domain": domain_clean,
         "owner": owner,
@@ -132,8 +167,10 @@ def get_domain_info(domain: str) -> dict:
         "collection_name": collection.get("name", "TON DNS"),
         "collection_address": collection.get("address"),
         "expiring_at": data.get("expiring_at"),
-        "raw_response": data,
     }
+    if include_raw:
+        output["raw_response"] = data
+    return output
 
 
 def is_ton_domain(address_or_domain: str) -> bool:
@@ -145,22 +182,14 @@ def is_ton_domain(address_or_domain: str) -> bool:
     """
     clean = address_or_domain.strip()
 
-    # Если это валидный TON адрес — точно не домен
-    if is_valid_address(clean):
-        return False
-
-    # Если содержит ":" — это raw адрес, не домен
-    if ":" in clean:
-        return False
-
-    clean_lower = clean.lower()
-
     # Только явное окончание .ton считается доменом
     # Короткие имена типа "skill-test" НЕ являются доменами — это могут быть лейблы кошельков
-    if clean_lower.endswith(".ton"):
-        return True
+    if len(clean) < 4 or clean[-4:].lower() != ".ton":
+        return False
 
-    return False
+    # Friendly адрес (base64url) не содержит ".", поэтому is_valid_address
+    # здесь не нужен; ":" — raw адрес, пробелы в домене невозможны
+    return ":" not in clean and " " not in clean
 
 
 def resolve_address(address_or_domain: str) -> dict:
@@ -265,18 +294,18 @@ Examples:
 
     try:
         if args.command == "resolve":
-            result = resolve_domain(args.domain)
+            result = resolve_domain(args.domain, include_raw=True)
         elif args.command == "info":
-            result = get_domain_info(args.domain)
+            result = get_domain_info(args.domain, include_raw=True)
         elif args.command == "check":
             result = resolve_address(args.input)
         else:
             result = {"error": f"Unknown command: {args.command}"}
 
-        print(json.dumps(result, indent=2, ensure_ascii=False))
+        print(json_dumps(result))
 
     except Exception as e:
-        print(json.dumps({"error": str(e)}, indent=2))
+        print(json_dumps({"error": str(e)}))
         return sys.exit(1)
 
 
@@ -15,10 +15,13 @@ Swagger: https://dyor.io/tonapi/swagger
 
 import os
 import sys
-import json
 import argparse
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, List
+from types import MappingProxyType
+from typing import Optional, List, Mapping
 
 # Локальный импорт
 script_dir = Path(__file__).parent
@@ -28,12 +31,13 @@ from utils import (  # noqa: E402
     api_request,
     load_config,
     save_config,
-    is_valid_address,
     tonapi_request,
+    ttl_cache,
 )
 from common import (  # noqa: E402
-    KNOWN_TOKENS,
+    KNOWN_TOKENS_UPPER,
     DYOR_API_BASE_URL,
+    json_dumps,
 )
 
 
@@ -43,6 +47,64 @@ from common import (  # noqa: E402
 
 DYOR_API_BASE = DYOR_API_BASE_URL
 
+# NumPy опционален и импортируется при первом использовании
+NUMPY_AVAILABLE = importlib.util.find_spec("numpy") is not None
+
+# Ниже этого числа токенов сортировка через NumPy не окупается
+NUMPY_MIN_ROWS = 32
+
+# Захардкоженные метаданные TON (у native нет jetton master для /jettons)
+_NATIVE_TON_INFO = MappingProxyType(
+    {
+        "address": "native",
+        "name": "Toncoin",
+        "symbol": "TON",
+        "decimals": 9,
+        "image": "https://ton.org/download/ton_symbol.png",
+    }
+)
+
+# Маппинг TonAPI verification на trust score / level
+_VERIFICATION_TRUST = MappingProxyType(
+    {
+        "whitelist": (90, "high"),
+        "none": (50, "medium"),
+        "blacklist": (10, "scam"),
+    }
+)
+_UNKNOWN_TRUST = (50, "unknown")
+
+# Поля сводки токена (get_token_summary) — подмножество get_token_info
+_SUMMARY_FIELDS = (
+    "address",
+    "name",
+    "symbol",
+    "price_usd",
+    "price_change_24h",
+    "market_cap",
+    "volume_24h",
+    "liquidity",
+    "holders_count",
+    "verification",
+)
+
+# Колонки строки сравнения (порядок ключей в выводе)
+_COMPARE_COLUMNS = (
+    "token",
+    "address",
+    "symbol",
+    "name",
+    "price_usd",
+    "market_cap",
+    "volume_24h",
+    "liquidity",
+    "holders",
+    "trust_score",
+    "trust_level",
+    "verification",
+    "success",
+)
+
 
 # =============================================================================
 # DYOR API Client
@@ -92,6 +154,7 @@ def dyor_request(
     )
 
 
+@lru_cache(maxsize=1024)
 def resolve_token_address(token: str) -> str:
     """
     Резолвит токен (символ или адрес) в адрес мастер-контракта.
@@ -102,16 +165,15 @@ def resolve_token_address(token: str) -> str:
     Returns:
         Адрес jetton master или "native" для TON
     """
-    token_upper = token.upper()
-
-    # Проверяем известные токены
-    if token_upper in KNOWN_TOKENS:
-        return KNOWN_TOKENS[token_upper]
-
-    # Если похоже на адрес — возвращаем как есть
-    if is_valid_address(token) or ":" in token:
-        return token
-
+    # Проверяем известные токены: сначала как есть (обычно уже "TON", "USDT"),
+    # и только потом через upper()
+    known = KNOWN_TOKENS_UPPER.get(token)
+    if known is None:
+        known = KNOWN_TOKENS_UPPER.get(token.upper())
+    if known is not None:
+        return known
+
+    # Иначе это адрес (или неизвестный символ) — возвращаем как есть
     return token
 
 
@@ -120,10 +182,68 @@ def resolve_token_address(token: str) -> str:
 # =============================================================================
 
 
-def get_token_info_dyor(token_address: str) -> dict:
+def _dyor_token_fields(data: dict) -> dict:
+    """Поля токена из ответа DYOR /jetton."""
+    return {
+        "name": data.get("name"),
+        "symbol": data.get("symbol"),
+        "decimals": data.get("decimals", 9),
+        "image": data.get("image"),
+        "description": data.get("description"),
+        "price_usd": data.get("price"),
+        "price_change_24h": data.get("price_change_24h"),
+        "market_cap": data.get("market_cap"),
+        "fully_diluted_mcap": data.get("fdv"),
+        "volume_24h": data.get("volume_24h"),
+        "liquidity": data.get("liquidity"),
+        "total_supply": data.get("total_supply"),
+        "circulating_supply": data.get("circulating_supply"),
+        "holders_count": data.get("holders"),
+        "created_at": data.get("created_at"),
+    }
+
+
+def _rates_fields(rates: dict) -> dict:
+    """Цены из ответа TonAPI /rates (None, если курса нет)."""
+    ok = rates.get("success")
+    return {
+        "price_usd": rates.get("price_usd") if ok else None,
+        "price_change_24h": rates.get("price_change_24h") if ok else None,
+    }
+
+
+def _tonapi_token_fields(data: dict, rates: dict) -> dict:
+    """Поля токена из ответа TonAPI /jettons, цены — из ответа /rates."""
+    metadata = data.get("metadata", {})
+    return {
+        "name": metadata.get("name"),
+        "symbol": metadata.get("symbol"),
+        "decimals": int(metadata.get("decimals", 9)),
+        "image": metadata.get("image"),
+        "description": metadata.get("description"),
+        **_rates_fields(rates),
+        "total_supply": data.get("total_supply"),
+        "holders_count": data.get("holders_count"),
+        "verification": data.get("verification"),
+        "mintable": data.get("mintable"),
+        "social": metadata.get("social", []),
+        "websites": metadata.get("websites", []),
+    }
+
+
+def _summary_fields(fields: Mapping) -> dict:
+    """Поля сводки (_SUMMARY_FIELDS), которые есть в fields."""
+    return {key: fields[key] for key in _SUMMARY_FIELDS if key in fields}
+
+
+def get_token_info_dyor(token_address: str, include_raw: bool = False) -> dict:
     """
     Получает информацию о токене через DYOR API.
 
+    Args:
+        token_address: Адрес токена
+        include_raw: Добавить исходный ответ API в raw_data
+
     Returns:
         dict с информацией о токене (цена, mcap, volume, liquidity и т.д.)
     """
@@ -135,29 +255,18 @@ def get_token_info_dyor(token_address: str) -> dict:
     data = result["data"]
 
     # Нормализуем ответ
-    return {
+    output = {
         "success": True,
         "source": "dyor",
         "address": token_address,
-        "name": data.get("name"),
-        "symbol": data.get("symbol"),
-        "decimals": data.get("decimals", 9),
-        "image": data.get("image"),
-        "description": data.get("description"),
-        "price_usd": data.get("price"),
-        "price_change_24h": data.get("price_change_24h"),
-        "market_cap": data.get("market_cap"),
-        "fully_diluted_mcap": data.get("fdv"),
-        "volume_24h": data.get("volume_24h"),
-        "liquidity": data.get("liquidity"),
-        "total_supply": data.get("total_supply"),
-        "circulating_supply": data.get("circulating_supply"),
-        "holders_count": data.get("holders"),
-        "created_at": data.get("created_at"),
-        "raw_data": data,
+        **_dyor_token_fields(data),
     }
+    if include_raw:
+        output["raw_data"] = data
+    return output
 
 
+@ttl_cache("short")
 def get_token_rates_tonapi(token_address: str) -> dict:
     """
     Получает курс токена через TonAPI /rates endpoint.
@@ -168,26 +277,65 @@ def get_token_rates_tonapi(token_address: str) -> dict:
     Returns:
         dict с ценой и изменениями
     """
-    # TonAPI /rates принимает адреса токенов
+    return get_token_rates_tonapi_batch([token_address])[token_address]
+
+
+def get_token_rates_tonapi_batch(token_addresses: List[str]) -> dict:
+    """
+    Получает курсы нескольких токенов одним запросом к TonAPI /rates.
+
+    Args:
+        token_addresses: Адреса токенов ("native" для TON)
+
+    Returns:
+        dict {адрес: результат как у get_token_rates_tonapi}
+    """
+    if not token_addresses:
+        return {}
+
+    # TonAPI /rates принимает адреса токенов через запятую
     # Для TON используем специальный адрес
-    if token_address == "native":
-        token_param = "TON"
-    else:
-        token_param = token_address
+    token_params = {
+        address: "TON" if address == "native" else address
+        for address in token_addresses
+    }
 
     result = tonapi_request(
-        "/rates", params={"tokens": token_param, "currencies": "usd"}
+        "/rates",
+        params={"tokens": ",".join(token_params.values()), "currencies": "usd"},
     )
 
     if not result["success"]:
-        return {"success": False, "error": result.get("error")}
+        error = {"success": False, "error": result.get("error")}
+        return {address: dict(error) for address in token_addresses}
 
     data = result["data"]
     rates = data.get("rates", {})
 
     # TonAPI возвращает rates по адресу токена
-    token_rates = rates.get(token_param) or rates.get(token_address) or {}
+    return {
+        address: _parse_token_rates(rates.get(token_param) or rates.get(address))
+        for address, token_param in token_params.items()
+    }
+
 
+def _parse_diff(diff_str):
+    """Парсит процент изменения (приходит как "+4.63%" или "-2.10%")."""
+    if not diff_str:
+        return None
+    try:
+        # Срезы вместо цепочки .replace(): без промежуточных строк
+        if diff_str[-1] == "%":
+            diff_str = diff_str[:-1]
+        if diff_str[:1] == "+":
+            diff_str = diff_str[1:]
+        return float(diff_str)
+    except Exception:
+        return None
+
+
+def _parse_token_rates(token_rates: Optional[dict]) -> dict:
+    """Нормализует запись одного токена из ответа TonAPI /rates."""
     if not token_rates:
         return {"success": False, "error": "No rates found for token"}
 
@@ -196,87 +344,70 @@ def get_token_rates_tonapi(token_address: str) -> dict:
     diff_7d = token_rates.get("diff_7d", {})
     diff_30d = token_rates.get("diff_30d", {})
 
-    # Парсим процент изменения (приходит как "+4.63%" или "-2.10%")
-    def parse_diff(diff_str):
-        if not diff_str:
-            return None
-        try:
-            return float(diff_str.replace("%", "").replace("+", ""))
-        except Exception:
-            return None
-
     return {
         "success": True,
         "price_usd": prices.get("USD"),
-        "price_change_24h": parse_diff(diff_24h.get("USD")),
-        "price_change_7d": parse_diff(diff_7d.get("USD")),
-        "price_change_30d": parse_diff(diff_30d.get("USD")),
+        "price_change_24h": _parse_diff(diff_24h.get("USD")),
+        "price_change_7d": _parse_diff(diff_7d.get("USD")),
+        "price_change_30d": _parse_diff(diff_30d.get("USD")),
     }
 
 
-def get_token_info_tonapi(token_address: str) -> dict:
+def get_token_info_tonapi(token_address: str, include_raw: bool = False) -> dict:
     """
     Получает информацию о токене через TonAPI (fallback).
     Включает цены из /rates endpoint.
 
+    Args:
+        token_address: Адрес токена или "native"
+        include_raw: Добавить исходный ответ API в raw_data
+
     Returns:
         dict с базовой информацией о токене
     """
-    # Получаем цены отдельно через /rates
-    rates = get_token_rates_tonapi(token_address)
-    price_usd = rates.get("price_usd") if rates.get("success") else None
-    price_change_24h = rates.get("price_change_24h") if rates.get("success") else None
-
     if token_address == "native":
-        # Для TON возвращаем захардкоженные данные + цены
+        # Для TON метаданные захардкожены — нужен только /rates
+        rates = get_token_rates_tonapi(token_address)
         return {
             "success": True,
             "source": "tonapi",
-            "address": "native",
-            "name": "Toncoin",
-            "symbol": "TON",
-            "decimals": 9,
-            "image": "https://ton.org/download/ton_symbol.png",
-            "price_usd": price_usd,
-            "price_change_24h": price_change_24h,
+            **_NATIVE_TON_INFO,
+            **_rates_fields(rates),
         }
 
-    result = tonapi_request(f"/jettons/{token_address}")
+    # /jettons и /rates независимы — /rates уходит в фон, /jettons в текущем потоке
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        rates_future = executor.submit(get_token_rates_tonapi, token_address)
+        result = tonapi_request(f"/jettons/{token_address}")
+        rates = rates_future.result()
 
     if not result["success"]:
         return result
 
     data = result["data"]
-    metadata = data.get("metadata", {})
 
-    return {
+    output = {
         "success": True,
         "source": "tonapi",
         "address": token_address,
-        "name": metadata.get("name"),
-        "symbol": metadata.get("symbol"),
-        "decimals": int(metadata.get("decimals", 9)),
-        "image": metadata.get("image"),
-        "description": metadata.get("description"),
-        "price_usd": price_usd,
-        "price_change_24h": price_change_24h,
-        "total_supply": data.get("total_supply"),
-        "holders_count": data.get("holders_count"),
-        "verification": data.get("verification"),
-        "mintable": data.get("mintable"),
-        "social": metadata.get("social", []),
-        "websites": metadata.get("websites", []),
-        "raw_data": data,
+        **_tonapi_token_fields(data, rates),
     }
+    if include_raw:
+        output["raw_data"] = data
+    return output
 
 
-def get_token_info(token: str, prefer_dyor: bool = True) -> dict:
+@ttl_cache("short", key_func=resolve_token_address)
+def get_token_info(
+    token: str, prefer_dyor: bool = True, include_raw: bool = False
+) -> dict:
     """
     Получает информацию о токене (DYOR + TonAPI fallback).
 
     Args:
         token: Символ токена или адрес
         prefer_dyor: Попробовать DYOR API сначала
+        include_raw: Добавить исходный ответ API в raw_data
 
     Returns:
         dict с информацией о токене
@@ -284,12 +415,60 @@ def get_token_info(token: str, prefer_dyor: bool = True) -> dict:
     token_address = resolve_token_address(token)
 
     if prefer_dyor and get_dyor_api_key():
-        result = get_token_info_dyor(token_address)
+        result = get_token_info_dyor(token_address, include_raw=include_raw)
         if result["success"]:
             return result
 
     # Fallback на TonAPI
-    return get_token_info_tonapi(token_address)
+    return get_token_info_tonapi(token_address, include_raw=include_raw)
+
+
+@ttl_cache("short", key_func=resolve_token_address)
+def get_token_summary(token: str) -> dict:
+    """
+    Краткая сводка о токене для сравнения (compare_tokens).
+
+    Берёт те же эндпоинты и поля, что и get_token_info, но оставляет только
+    _SUMMARY_FIELDS — без raw_data, описаний, ссылок и картинок. /rates здесь
+    не запрашивается (цены TonAPI равны None): compare_tokens получает их
+    одним пакетным запросом.
+
+    Args:
+        token: Символ токена или адрес
+
+    Returns:
+        dict со сводкой
+    """
+    token_address = resolve_token_address(token)
+
+    if get_dyor_api_key():
+        result = dyor_request(f"/jetton/{token_address}")
+        if result["success"]:
+            return {
+                "success": True,
+                "source": "dyor",
+                "address": token_address,
+                **_summary_fields(_dyor_token_fields(result["data"])),
+            }
+
+    if token_address == "native":
+        return {
+            "success": True,
+            "source": "tonapi",
+            **_summary_fields(_NATIVE_TON_INFO),
+        }
+
+    result = tonapi_request(f"/jettons/{token_address}")
+
+    if not result["success"]:
+        return result
+
+    return {
+        "success": True,
+        "source": "tonapi",
+        "address": token_address,
+        **_summary_fields(_tonapi_token_fields(result["data"], {})),
+    }
 
 
 # =============================================================================
@@ -297,12 +476,14 @@ def get_token_info(token: str, prefer_dyor: bool = True) -> dict:
 # =============================================================================
 
 
-def get_trust_score(token: str) -> dict:
+@ttl_cache("long", key_func=resolve_token_address)
+def get_trust_score(token: str, include_raw: bool = False) -> dict:
     """
     Получает рейтинг доверия / скам-скор токена.
 
     Args:
         token: Символ токена или адрес
+        include_raw: Добавить исходный ответ API в raw_data
 
     Returns:
         dict с trust score и деталями
@@ -315,7 +496,7 @@ def get_trust_score(token: str) -> dict:
 
         if result["success"]:
             data = result["data"]
-            return {
+            output = {
                 "success": True,
                 "source": "dyor",
                 "address": token_address,
@@ -324,8 +505,10 @@ def get_trust_score(token: str) -> dict:
                 "flags": data.get("flags", []),
                 "warnings": data.get("warnings", []),
                 "details": data.get("details", {}),
-                "raw_data": data,
             }
+            if include_raw:
+                output["raw_data"] = data
+            return output
 
     # Fallback: используем TonAPI verification
     result = tonapi_request(f"/jettons/{token_address}")
@@ -337,27 +520,23 @@ def get_trust_score(token: str) -> dict:
     verification = data.get("verification", "unknown")
 
     # Маппинг verification на trust level
-    trust_map = {
-        "whitelist": {"score": 90, "level": "high"},
-        "none": {"score": 50, "level": "medium"},
-        "blacklist": {"score": 10, "level": "scam"},
-    }
+    trust_score, trust_level = _VERIFICATION_TRUST.get(verification, _UNKNOWN_TRUST)
 
-    trust_info = trust_map.get(verification, {"score": 50, "level": "unknown"})
-
-    return {
+    output = {
         "success": True,
         "source": "tonapi",
         "address": token_address,
-        "trust_score": trust_info["score"],
-        "trust_level": trust_info["level"],
+        "trust_score": trust_score,
+        "trust_level": trust_level,
         "verification": verification,
         "flags": [],
         "warnings": []
         if verification == "whitelist"
         else ["Limited trust data from TonAPI"],
-        "raw_data": data,
     }
+    if include_raw:
+        output["raw_data"] = data
+    return output
 
 
 # =============================================================================
@@ -365,7 +544,14 @@ def get_trust_score(token: str) -> dict:
 # =============================================================================
 
 
-def get_price_history(token: str, days: int = 7, interval: str = "1h") -> dict:
+@ttl_cache("normal", key_func=resolve_token_address)
+def get_price_history(
+    token: str,
+    days: int = 7,
+    interval: str = "1h",
+    include_raw: bool = False,
+    include_history: bool = True,
+) -> dict:
     """
     Получает историю цены токена.
 
@@ -373,6 +559,9 @@ def get_price_history(token: str, days: int = 7, interval: str = "1h") -> dict:
         token: Символ токена или адрес
         days: Количество дней истории
         interval: Интервал данных (1h, 4h, 1d)
+        include_raw: Добавить исходный ответ API в raw_data
+        include_history: Вернуть точки истории (False — только data_points
+            и price_change, history=None)
 
     Returns:
         dict с историей цены
@@ -390,17 +579,19 @@ def get_price_history(token: str, days: int = 7, interval: str = "1h") -> dict:
             data = result["data"]
             history = data if isinstance(data, list) else data.get("history", [])
 
-            return {
+            output = {
                 "success": True,
                 "source": "dyor",
                 "address": token_address,
                 "days": days,
                 "interval": interval,
                 "data_points": len(history),
-                "history": history,
+                "history": history if include_history else None,
                 "price_change": _calculate_price_change(history),
-                "raw_data": data,
             }
+            if include_raw:
+                output["raw_data"] = data
+            return output
 
     # Fallback: TonAPI rates endpoint
     result = tonapi_request(
@@ -423,9 +614,13 @@ def get_price_history(token: str, days: int = 7, interval: str = "1h") -> dict:
     data = result["data"]
     points = data.get("points", [])
 
-    history = [
-        {"timestamp": p.get("timestamp"), "price": p.get("price")} for p in points
-    ]
+    # Изменение цены считается по крайним точкам исходного списка,
+    # без предварительной сборки history
+    history = None
+    if include_history:
+        history = [
+            {"timestamp": p.get("timestamp"), "price": p.get("price")} for p in points
+        ]
 
     return {
         "success": True,
@@ -433,14 +628,14 @@ def get_price_history(token: str, days: int = 7, interval: str = "1h") -> dict:
         "address": token_address,
         "days": days,
         "interval": interval,
-        "data_points": len(history),
+        "data_points": len(points),
         "history": history,
-        "price_change": _calculate_price_change(history),
+        "price_change": _calculate_price_change(points),
     }
 
 
 def _calculate_price_change(history: List[dict]) -> Optional[dict]:
-    """Вычисляет изменение цены из истории."""
+    """Вычисляет изменение цены по первой и последней точке истории."""
     if not history or len(history) < 2:
         return None
 
@@ -472,12 +667,14 @@ def _calculate_price_change(history: List[dict]) -> Optional[dict]:
 # =============================================================================
 
 
-def get_token_pools(token: str) -> dict:
+@ttl_cache("normal", key_func=resolve_token_address)
+def get_token_pools(token: str, include_raw: bool = False) -> dict:
     """
     Получает список DEX пулов для токена.
 
     Args:
         token: Символ токена или адрес
+        include_raw: Добавить исходный ответ API в raw_data
 
     Returns:
         dict с пулами
@@ -492,14 +689,16 @@ def get_token_pools(token: str) -> dict:
             data = result["data"]
             pools = data if isinstance(data, list) else data.get("pools", [])
 
-            return {
+            output = {
                 "success": True,
                 "source": "dyor",
                 "address": token_address,
                 "pools_count": len(pools),
                 "pools": pools,
-                "raw_data": data,
             }
+            if include_raw:
+                output["raw_data"] = data
+            return output
 
     # Fallback: нет публичного TonAPI endpoint для пулов
     return {
@@ -515,13 +714,15 @@ def get_token_pools(token: str) -> dict:
 # =============================================================================
 
 
-def get_swap_history(token: str, limit: int = 50) -> dict:
+@ttl_cache("short", key_func=resolve_token_address)
+def get_swap_history(token: str, limit: int = 50, include_raw: bool = False) -> dict:
     """
     Получает историю свапов для токена.
 
     Args:
         token: Символ токена или адрес
         limit: Максимум записей
+        include_raw: Добавить исходный ответ API в raw_data
 
     Returns:
         dict с историей свапов
@@ -536,21 +737,28 @@ def get_swap_history(token: str, limit: int = 50) -> dict:
             data = result["data"]
             swaps = data if isinstance(data, list) else data.get("swaps", [])
 
-            # Анализ
-            buys = [s for s in swaps if s.get("type") == "buy"]
-            sells = [s for s in swaps if s.get("type") == "sell"]
+            # Анализ — один проход по списку
+            buys_count = sells_count = 0
+            for swap in swaps:
+                swap_type = swap.get("type")
+                if swap_type == "buy":
+                    buys_count += 1
+                elif swap_type == "sell":
+                    sells_count += 1
 
-            return {
+            output = {
                 "success": True,
                 "source": "dyor",
                 "address": token_address,
                 "total_swaps": len(swaps),
-                "buys_count": len(buys),
-                "sells_count": len(sells),
-                "buy_pressure": len(buys) / len(swaps) * 100 if swaps else 0,
+                "buys_count": buys_count,
+                "sells_count": sells_count,
+                "buy_pressure": buys_count / len(swaps) * 100 if swaps else 0,
                 "swaps": swaps,
-                "raw_data": data,
             }
+            if include_raw:
+                output["raw_data"] = data
+            return output
 
     # Fallback: TonAPI jetton transfers (не совсем swaps, но близко)
     result = tonapi_request(
@@ -593,81 +801,91 @@ def compare_tokens(tokens: List[str]) -> dict:
     Returns:
         dict со сравнительной таблицей
     """
-    results = []
-
-    for token in tokens:
-        info = get_token_info(token)
-        trust = get_trust_score(token)
-
-        results.append(
-            {
-                "token": token,
-                "address": info.get("address"),
-                "symbol": info.get("symbol"),
-                "name": info.get("name"),
-                "price_usd": info.get("price_usd"),
-                "market_cap": info.get("market_cap"),
-                "volume_24h": info.get("volume_24h"),
-                "liquidity": info.get("liquidity"),
-                "holders": info.get("holders_count"),
-                "trust_score": trust.get("trust_score"),
-                "trust_level": trust.get("trust_level"),
-                "verification": info.get("verification"),
-                "success": info.get("success", False),
-            }
-        )
-
-    # Сортировка по market cap
-    results.sort(key=lambda x: x.get("market_cap") or 0, reverse=True)
+    # Цены TonAPI для всех токенов — одним запросом /rates
+    addresses = [resolve_token_address(token) for token in tokens]
+
+    # Запросы независимы — отправляем параллельно, собираем в исходном порядке
+    pending = []
+    rates = {}
+    if tokens:
+        with ThreadPoolExecutor(max_workers=min(16, len(tokens) * 2 + 1)) as executor:
+            rates_future = executor.submit(
+                get_token_rates_tonapi_batch, list(dict.fromkeys(addresses))
+            )
+            pending = [
+                (
+                    token,
+                    address,
+                    executor.submit(get_token_summary, token),
+                    executor.submit(get_trust_score, token),
+                )
+                for token, address in zip(tokens, addresses)
+            ]
+        rates = rates_future.result()
+
+    # Колонки (SoA): строки-словари собираются только в итоговом порядке
+    columns = {name: [] for name in _COMPARE_COLUMNS}
+    for token, address, info_future, trust_future in pending:
+        info = info_future.result()
+        trust = trust_future.result()
+
+        # Сводка не содержит цен TonAPI — подставляем из пакетного /rates
+        price_usd = info.get("price_usd")
+        if price_usd is None:
+            token_rates = rates.get(address, {})
+            if token_rates.get("success"):
+                price_usd = token_rates.get("price_usd")
+
+        columns["token"].append(token)
+        columns["address"].append(info.get("address"))
+        columns["symbol"].append(info.get("symbol"))
+        columns["name"].append(info.get("name"))
+        columns["price_usd"].append(price_usd)
+        columns["market_cap"].append(info.get("market_cap"))
+        columns["volume_24h"].append(info.get("volume_24h"))
+        columns["liquidity"].append(info.get("liquidity"))
+        columns["holders"].append(info.get("holders_count"))
+        columns["trust_score"].append(trust.get("trust_score"))
+        columns["trust_level"].append(trust.get("trust_level"))
+        columns["verification"].append(info.get("verification"))
+        columns["success"].append(info.get("success", False))
+
+    # Сортировка по market cap (по убыванию, равные — в исходном порядке)
+    order = _order_by_market_cap(columns["market_cap"])
+    results = [{name: values[i] for name, values in columns.items()} for i in order]
 
     return {"success": True, "tokens_count": len(tokens), "comparison": results}
 
 
-# =============================================================================
-# CLI
-# =============================================================================
-
+def _order_by_market_cap(market_caps: list) -> list:
+    """Индексы строк по убыванию market cap (стабильно, None считается нулём)."""
+    if NUMPY_AVAILABLE and len(market_caps) >= NUMPY_MIN_ROWS:
+        import numpy as np
 
-def main():
-    parser = argparse.ArgumentParser(
-        description="DYOR.io API wrapper for TON token analytics",
-        formatter_class=argparse.RawDescriptionHelpFormatter,
-        epilog="""
-Examples:
-  # Информация о токене
-  %(prog)s info --token DUST
-  %(prog)s info --token EQBlqsm144Dq6SjbPI4jjZvA1hqTIP3CvHovbIfW_t-SCALE
-  
-  # Trust score
-  %(prog)s trust --token NOT
-  
-  # История цены
-  %(prog)s history --token STON --days 7 --interval 1h
-  
-  # DEX пулы
-  %(prog)s pools --token USDT
-  
-  # История свапов
-  %(prog)s swaps --token DUST --limit 100
-  
-  # Сравнение токенов
-  %(prog)s compare --tokens DUST NOT STON
+        caps = np.array([cap or 0 for cap in market_caps], dtype=np.float64)
+        return np.argsort(-caps, kind="stable").tolist()
 
-Known tokens: TON, USDT, USDC, NOT, STON, DUST, GRAM
-""",
+    return sorted(
+        range(len(market_caps)), key=lambda i: market_caps[i] or 0, reverse=True
     )
 
-    subparsers = parser.add_subparsers(dest="command", help="Commands")
 
-    # --- info ---
+# =============================================================================
+# CLI
+# =============================================================================
+
+
+def _build_info_parser(subparsers) -> None:
     info_p = subparsers.add_parser("info", help="Get token information")
     info_p.add_argument("--token", "-t", required=True, help="Token symbol or address")
 
-    # --- trust ---
+
+def _build_trust_parser(subparsers) -> None:
     trust_p = subparsers.add_parser("trust", help="Get trust score")
     trust_p.add_argument("--token", "-t", required=True, help="Token symbol or address")
 
-    # --- history ---
+
+def _build_history_parser(subparsers) -> None:
     history_p = subparsers.add_parser("history", help="Get price history")
     history_p.add_argument(
         "--token", "-t", required=True, help="Token symbol or address"
@@ -682,29 +900,155 @@ Known tokens: TON, USDT, USDC, NOT, STON, DUST, GRAM
         choices=["1h", "4h", "1d"],
         help="Data interval",
     )
+    history_p.add_argument(
+        "--summary",
+        action="store_true",
+        help="Only data_points and price change, without the points list",
+    )
+
 
-    # --- pools ---
+def _build_pools_parser(subparsers) -> None:
     pools_p = subparsers.add_parser("pools", help="Get DEX pools for token")
     pools_p.add_argument("--token", "-t", required=True, help="Token symbol or address")
 
-    # --- swaps ---
+
+def _build_swaps_parser(subparsers) -> None:
     swaps_p = subparsers.add_parser("swaps", help="Get swap history")
     swaps_p.add_argument("--token", "-t", required=True, help="Token symbol or address")
     swaps_p.add_argument(
         "--limit", "-l", type=int, default=50, help="Max results (default: 50)"
     )
 
-    # --- compare ---
+
+def _build_compare_parser(subparsers) -> None:
     compare_p = subparsers.add_parser("compare", help="Compare multiple tokens")
     compare_p.add_argument(
         "--tokens", "-t", required=True, help="Comma-separated tokens"
     )
 
-    # --- config ---
+
+def _build_config_parser(subparsers) -> None:
     config_p = subparsers.add_parser("config", help="Configure DYOR API key")
     config_p.add_argument("--key", "-k", help="DYOR API key")
     config_p.add_argument("--show", action="store_true", help="Show current key status")
 
+
+# Порядок важен: в нём команды выводятся в --help
+SUBPARSER_BUILDERS = {
+    "info": _build_info_parser,
+    "trust": _build_trust_parser,
+    "history": _build_history_parser,
+    "pools": _build_pools_parser,
+    "swaps": _build_swaps_parser,
+    "compare": _build_compare_parser,
+    "config": _build_config_parser,
+}
+
+
+def _requested_command(argv: List[str]) -> Optional[str]:
+    """Первый позиционный аргумент командной строки (имя команды) или None."""
+    for arg in argv:
+        if not arg.startswith("-"):
+            return arg
+    return None
+
+
+_EPILOG = """
+Examples:
+  # Информация о токене
+  %(prog)s info --token DUST
+  %(prog)s info --token EQBlqsm144Dq6SjbPI4jjZvA1hqTIP3CvHovbIfW_t-SCALE
+  
+  # Trust score
+  %(prog)s trust --token NOT
+  
+  # История цены
+  %(prog)s history --token STON --days 7 --interval 1h
+  %(prog)s history --token STON --days 30 --summary
+  
+  # DEX пулы
+  %(prog)s pools --token USDT
+  
+  # История свапов
+  %(prog)s swaps --token DUST --limit 100
+  
+  # Сравнение токенов
+  %(prog)s compare --tokens DUST NOT STON
+
+Known tokens: TON, USDT, USDC, NOT, STON, DUST, GRAM
+"""
+
+
+def _build_parser(command: Optional[str] = None) -> argparse.ArgumentParser:
+    """
+    Парсер CLI. Если command известна — строится только её подпарсер,
+    иначе (--help, без аргументов, опечатка) — все.
+    """
+    parser = argparse.ArgumentParser(
+        description="DYOR.io API wrapper for TON token analytics",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=_EPILOG,
+    )
+
+    subparsers = parser.add_subparsers(dest="command", help="Commands")
+
+    if command in SUBPARSER_BUILDERS:
+        SUBPARSER_BUILDERS[command](subparsers)
+    else:
+        for build in SUBPARSER_BUILDERS.values():
+            build(subparsers)
+
+    return parser
+
+
+def _handle_history(args) -> dict:
+    """history: история цены (--summary — без списка точек)."""
+    return get_price_history(
+        args.token,
+        args.days,
+        args.interval,
+        include_history=not args.summary,
+    )
+
+
+def _handle_compare(args) -> dict:
+    """compare: сравнение токенов из списка через запятую."""
+    tokens = [t.strip() for t in args.tokens.split(",")]
+    return compare_tokens(tokens)
+
+
+def _handle_config(args) -> dict:
+    """config: показать статус или сохранить DYOR API key."""
+    if args.show:
+        api_key = get_dyor_api_key()
+        return {
+            "configured": bool(api_key),
+            "key_preview": f"{api_key[:8]}..."
+            if api_key and len(api_key) > 8
+            else None,
+        }
+    if args.key:
+        config = load_config()
+        config["dyor_key"] = args.key
+        save_config(config)
+        return {"success": True, "message": "DYOR API key saved"}
+    return {"error": "Use --key to set API key or --show to check status"}
+
+
+# Команда CLI -> обработчик (args) -> dict
+COMMAND_HANDLERS = {
+    "info": lambda args: get_token_info(args.token, include_raw=True),
+    "trust": lambda args: get_trust_score(args.token),
+    "history": _handle_history,
+    "pools": lambda args: get_token_pools(args.token),
+    "swaps": lambda args: get_swap_history(args.token, args.limit),
+    "compare": _handle_compare,
+    "config": _handle_config,
+}
+
+
+def main():
+    parser = _build_parser(_requested_command(sys.argv[1:]))
     args = parser.parse_args()
 
     if not args.command:
@@ -712,52 +1056,19 @@ Known tokens: TON, USDT, USDC, NOT, STON, DUST, GRAM
         return
 
     try:
-        if args.command == "info":
-            result = get_token_info(args.token)
-
-        elif args.command == "trust":
-            result = get_trust_score(args.token)
-
-        elif args.command == "history":
-            result = get_price_history(args.token, args.days, args.interval)
-
-        elif args.command == "pools":
-            result = get_token_pools(args.token)
-
-        elif args.command == "swaps":
-            result = get_swap_history(args.token, args.limit)
-
-        elif args.command == "compare":
-            tokens = [t.strip() for t in args.tokens.split(",")]
-            result = compare_tokens(tokens)
-
-        elif args.command == "config":
-            if args.show:
-                api_key = get_dyor_api_key()
-                result = {
-                    "configured": bool(api_key),
-                    "key_preview": f"{api_key[:8]}..."
-                    if api_key and len(api_key) > 8
-                    else None,
-                }
-            elif args.key:
-                config = load_config()
-                config["dyor_key"] = args.key
-                save_config(config)
-                result = {"success": True, "message": "DYOR API key saved"}
-            else:
-                result = {"error": "Use --key to set API key or --show to check status"}
-
-        else:
+        handler = COMMAND_HANDLERS.get(args.command)
+        if handler is None:
             result = {"error": f"Unknown command: {args.command}"}
+        else:
+            result = handler(args)
 
-        print(json.dumps(result, indent=2, ensure_ascii=False))
+        print(json_dumps(result))
 
         if not result.get("success", True):
             return sys.exit(1)
 
     except Exception as e:
-        print(json.dumps({"error": str(e)}, indent=2))
+        print(json_dumps({"error": str(e)}))
         return sys.exit(1)
 
 
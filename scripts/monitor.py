@@ -2,7 +2,7 @@
 """
 OpenClaw TON Skill — Мониторинг транзакций
 
-Real-time мониторинг кошельков через TonAPI SSE или polling fallback.
+Real-time мониторинг кошельков через TonAPI SSE.
 
 CLI:
   monitor.py start -p <password>         — запуск (foreground)
@@ -14,46 +14,37 @@ CLI:
 import os
 import sys
 import json
+import queue
+import atexit
+import select
 import signal
+import socket
 import time
 import argparse
-import getpass
 import threading
 import logging
 from pathlib import Path
+from types import MappingProxyType
 from datetime import datetime, UTC
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterable, Iterator, Tuple
 
 # Локальный импорт
 script_dir = Path(__file__).parent
-sys.path.insert(0, str(script_dir))
+if str(script_dir) not in sys.path:
+    sys.path.insert(0, str(script_dir))
 
 from utils import (  # noqa: E402
     load_config,
     ensure_skill_dir,
-    tonapi_request,
+    get_shared_session,
     normalize_address,
-    raw_to_friendly,
     SKILL_DIR,
     TONAPI_BASE,
 )
+from common import json_dumps, json_loads  # noqa: E402
 
-from wallet import WalletStorage  # noqa: E402
-
-# Зависимости
-try:
-    import requests
-except ImportError:
-    print(json.dumps({"error": "Missing dependency: requests"}))
-    sys.exit(1)
-    raise SystemExit
-
-try:
-    import sseclient
-
-    SSE_AVAILABLE = True
-except ImportError:
-    SSE_AVAILABLE = False
+# wallet импортируется там, где нужен: status/stop
+# не должны платить за его загрузку
 
 
 # =============================================================================
@@ -64,12 +55,27 @@ MONITOR_STATE_FILE = SKILL_DIR / "monitor_state.json"
 MONITOR_LOG_FILE = SKILL_DIR / "monitor.log"
 MONITOR_PID_FILE = SKILL_DIR / "monitor.pid"
 
-# Polling интервал (fallback)
-POLL_INTERVAL = 30  # секунд
+# Сколько stop ждёт завершения процесса монитора
+STOP_TIMEOUT = 5.0  # секунд
 
 # SSE reconnect delay
 SSE_RECONNECT_DELAY = 5  # секунд
 
+# SSE: таймауты подключения и чтения. TonAPI шлёт heartbeat-комментарии
+# каждые ~15 с, так что тишина дольше SSE_READ_TIMEOUT — мёртвое соединение
+SSE_CONNECT_TIMEOUT = 10  # секунд
+SSE_READ_TIMEOUT = 45  # секунд
+
+# last_seen пишется на диск не чаще, чем раз в N секунд
+STATE_FLUSH_INTERVAL = 5.0  # секунд
+
+# Файл состояния пишется компактно; с --debug-state — с отступами
+DEBUG_STATE = False
+
+# Вывод событий в stdout пачками: до N строк или окно в секундах
+EMIT_BATCH_SIZE = 8
+EMIT_BATCH_WINDOW = 0.025
+
 
 # =============================================================================
 # Logging
@@ -108,23 +114,77 @@ def setup_logging(log_file: Path, verbose: bool = False) -> logging.Logger:
 # =============================================================================
 
 
+# Последнее прочитанное/записанное состояние: (st_mtime_ns файла, state)
+_STATE_CACHE: Optional[Tuple[int, Dict[str, Any]]] = None
+
+
+def _copy_state(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Копия состояния для вызывающего кода.
+
+    Вызывающие меняют только ключи верхнего уровня и записи last_seen
+    (целиком), поэтому копируем эти два уровня, а не весь dict.
+    """
+    copied = dict(state)
+    if isinstance(copied.get("last_seen"), dict):
+        copied["last_seen"] = dict(copied["last_seen"])
+    return copied
+
+
 def load_state() -> Dict[str, Any]:
-    """Загружает состояние мониторинга."""
+    """Загружает состояние мониторинга (перечитывает файл, только если он изменился)."""
+    global _STATE_CACHE
+
     ensure_skill_dir()
-    if MONITOR_STATE_FILE.exists():
-        try:
-            with open(MONITOR_STATE_FILE, "r") as f:
-                return json.load(f)
-        except Exception:
-            pass
-    return {"last_seen": {}, "started_at": None}
+    try:
+        mtime_ns = MONITOR_STATE_FILE.stat().st_mtime_ns
+    except OSError:
+        return {"last_seen": {}, "started_at": None}
+
+    cached = _STATE_CACHE
+    if cached is not None and cached[0] == mtime_ns:
+        return _copy_state(cached[1])
+
+    try:
+        with open(MONITOR_STATE_FILE, "rb") as f:
+            state = json_loads(f.read())
+    except Exception:
+        return {"last_seen": {}, "started_at": None}
+
+    _STATE_CACHE = (mtime_ns, state)
+    return _copy_state(state)
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    """
+    Атомарно записывает файл: временный файл + fsync + os.replace.
+
+    Читатель (status, load_state после падения) видит либо старое
+    содержимое, либо новое, но не частично записанное.
+    """
+    tmp_path = path.with_suffix(".tmp")
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view) :]
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+    os.replace(tmp_path, path)
 
 
 def save_state(state: Dict[str, Any]) -> None:
-    """Сохраняет состояние мониторинга."""
+    """Сохраняет состояние мониторинга (атомарно)."""
+    global _STATE_CACHE
+
     ensure_skill_dir()
-    with open(MONITOR_STATE_FILE, "w") as f:
-        json.dump(state, f, indent=2)
+    _atomic_write(
+        MONITOR_STATE_FILE, json_dumps(state, indent=DEBUG_STATE).encode("utf-8")
+    )
+
+    # Следующий load_state не перечитывает только что записанный файл
+    _STATE_CACHE = (MONITOR_STATE_FILE.stat().st_mtime_ns, _copy_state(state))
 
 
 def update_last_seen(address: str, event_id: str) -> None:
@@ -143,11 +203,245 @@ def get_last_seen(address: str) -> Optional[str]:
     return state.get("last_seen", {}).get(address, {}).get("event_id")
 
 
+class MonitorState:
+    """
+    Состояние работающего монитора в памяти.
+
+    last_seen обновляется в dict, а на диск уходит не чаще, чем раз в
+    flush_interval секунд (и обязательно при остановке через flush()).
+    Несохранённое изменение дописывает таймер, даже если следующее
+    событие так и не придёт.
+    """
+
+    def __init__(self, flush_interval: float = STATE_FLUSH_INTERVAL):
+        self.flush_interval = flush_interval
+        self.state = load_state()
+        self.state.setdefault("last_seen", {})
+        self._dirty = False
+        self._last_flush = time.monotonic()
+        # Таймер пишет состояние из своего потока — state меняется под lock
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+
+    def get_last_seen(self, address: str) -> Optional[str]:
+        """Возвращает last_seen event_id для адреса."""
+        return self.state["last_seen"].get(address, {}).get("event_id")
+
+    def update_last_seen(self, address: str, event_id: str) -> None:
+        """Обновляет last_seen для адреса (запись на диск — отложенная)."""
+        with self._lock:
+            self.state["last_seen"][address] = {
+                "event_id": event_id,
+                "timestamp": datetime.now(UTC).isoformat(),
+            }
+            self._dirty = True
+        self.maybe_flush()
+        self._arm_timer()
+
+    def maybe_flush(self) -> None:
+        """Пишет состояние, если есть изменения и прошёл flush_interval."""
+        if self._dirty and time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self) -> None:
+        """Пишет состояние на диск, если есть несохранённые изменения."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if self._dirty:
+                save_state(self.state)
+                self._dirty = False
+            self._last_flush = time.monotonic()
+
+    def _arm_timer(self) -> None:
+        """Ставит отложенный flush на конец текущего flush_interval."""
+        with self._lock:
+            if not self._dirty or self._timer is not None:
+                return
+            delay = max(0.0, self._last_flush + self.flush_interval - time.monotonic())
+            self._timer = threading.Timer(delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+
 # =============================================================================
 # Event Processing
 # =============================================================================
 
 
+def _addr_key(address: str) -> Optional[bytes]:
+    """
+    Канонический ключ адреса: workchain (1 байт) + hash (32 байта).
+
+    Один и тот же аккаунт в raw и friendly виде даёт одинаковый ключ;
+    None — если адрес не парсится.
+    """
+    try:
+        raw = address if ":" in address else normalize_address(address, "raw")
+        workchain, hash_hex = raw.split(":")
+        return int(workchain).to_bytes(1, "big", signed=True) + bytes.fromhex(hash_hex)
+    except Exception:
+        return None
+
+
+def _match_key(address: str) -> bytes:
+    """Ключ для сравнения адресов; непарсящиеся сравниваются без учёта регистра."""
+    if not address:
+        return b""
+    return _addr_key(address) or address.lower().encode()
+
+
+def _event_timestamp(tx: dict) -> str:
+    """
+    ISO-время события: из timestamp/utime самой транзакции (время в сети),
+    а если его нет — текущее время.
+    """
+    ts = (tx.get("timestamp") or tx.get("utime")) if isinstance(tx, dict) else None
+    if isinstance(ts, (int, float)) and not isinstance(ts, bool):
+        try:
+            return datetime.fromtimestamp(ts, UTC).isoformat()
+        except (OverflowError, OSError, ValueError):
+            pass
+    return datetime.now(UTC).isoformat()
+
+
+# =============================================================================
+# Action handlers (parse_transaction)
+#
+# Каждый обработчик дополняет event полями для своего типа action.
+# our_key — _match_key адреса нашего кошелька (для направления перевода).
+# =============================================================================
+
+# Общий read-only default для отсутствующих вложенных объектов action
+_EMPTY = MappingProxyType({})
+
+# Делители для decimals токенов (10**d), чтобы не считать степень на каждое событие
+_POW10 = tuple(10**d for d in range(19))
+
+
+def _scale_amount(amount, decimals) -> float:
+    """Сумма в минимальных единицах → человекочитаемое число."""
+    if isinstance(decimals, int) and 0 <= decimals < len(_POW10):
+        divisor = _POW10[decimals]
+    else:
+        divisor = 10**decimals
+    try:
+        return int(amount) / divisor
+    except ValueError:
+        # Не целое число в строке (например, "1.5") — как раньше через float
+        return float(amount) / divisor
+
+
+def _handle_ton_transfer(
+    action: dict, action_type: str, event: dict, our_key: bytes
+) -> None:
+    ton_transfer = action.get("TonTransfer", {})
+    sender = (ton_transfer.get("sender") or _EMPTY).get("address", "")
+    recipient = (ton_transfer.get("recipient") or _EMPTY).get("address", "")
+    amount = int(ton_transfer.get("amount", 0)) / 1_000_000_000
+
+    # Определяем направление
+    if _match_key(sender) == our_key:
+        event["type"] = "outgoing_transfer"
+        event["to"] = recipient
+        event["amount"] = f"{amount:.4f} TON"
+    else:
+        event["type"] = "incoming_transfer"
+        event["from"] = sender
+        event["amount"] = f"{amount:.4f} TON"
+
+
+def _handle_jetton_transfer(
+    action: dict, action_type: str, event: dict, our_key: bytes
+) -> None:
+    jetton = action.get("JettonTransfer", {})
+    sender = (jetton.get("sender") or _EMPTY).get("address", "")
+    recipient = (jetton.get("recipient") or _EMPTY).get("address", "")
+    amount = jetton.get("amount", "0")
+    jetton_info = jetton.get("jetton", {})
+    symbol = jetton_info.get("symbol", "???")
+    decimals = jetton_info.get("decimals", 9)
+
+    human_amount = _scale_amount(amount, decimals)
+
+    if _match_key(sender) == our_key:
+        event["type"] = "outgoing_transfer"
+        event["to"] = recipient
+    else:
+        event["type"] = "incoming_transfer"
+        event["from"] = sender
+
+    event["amount"] = f"{human_amount:.4f} {symbol}"
+    event["token"] = symbol
+
+
+def _handle_jetton_swap(
+    action: dict, action_type: str, event: dict, our_key: bytes
+) -> None:
+    swap = action.get("JettonSwap", {})
+    dex = swap.get("dex", "Unknown DEX")
+
+    # Что отдали
+    amount_in = swap.get("amount_in", "0")
+    jetton_in = swap.get("jetton_master_in", {})
+    symbol_in = jetton_in.get("symbol", "TON")
+    decimals_in = jetton_in.get("decimals", 9)
+
+    # Что получили
+    amount_out = swap.get("amount_out", "0")
+    jetton_out = swap.get("jetton_master_out", {})
+    symbol_out = jetton_out.get("symbol", "TON")
+    decimals_out = jetton_out.get("decimals", 9)
+
+    human_in = _scale_amount(amount_in, decimals_in) if amount_in else 0
+    human_out = _scale_amount(amount_out, decimals_out) if amount_out else 0
+
+    event["type"] = "swap"
+    event["dex"] = dex
+    event["amount"] = f"{human_in:.4f} {symbol_in} → {human_out:.4f} {symbol_out}"
+
+
+def _handle_nft_transfer(
+    action: dict, action_type: str, event: dict, our_key: bytes
+) -> None:
+    nft = action.get("NftItemTransfer", {})
+    sender = (nft.get("sender") or _EMPTY).get("address", "")
+    recipient = (nft.get("recipient") or _EMPTY).get("address", "")
+    nft_item = nft.get("nft", "")
+
+    event["type"] = "nft_transfer"
+
+    if _match_key(sender) == our_key:
+        event["to"] = recipient
+        event["direction"] = "outgoing"
+    else:
+        event["from"] = sender
+        event["direction"] = "incoming"
+
+    event["nft"] = nft_item
+    event["amount"] = "1 NFT"
+
+
+def _handle_other_action(
+    action: dict, action_type: str, event: dict, our_key: bytes
+) -> None:
+    event["type"] = "other"
+    event["action_type"] = action_type
+    event["description"] = action.get("simple_preview", {}).get(
+        "description", action_type
+    )
+
+
+# Тип action → обработчик; всё остальное — _handle_other_action
+_ACTION_HANDLERS = {
+    "TonTransfer": _handle_ton_transfer,
+    "JettonTransfer": _handle_jetton_transfer,
+    "JettonSwap": _handle_jetton_swap,
+    "NftItemTransfer": _handle_nft_transfer,
+}
+
+
 def parse_transaction(
     tx: dict, wallet_label: str, wallet_address: str
 ) -> Optional[dict]:
@@ -156,6 +450,8 @@ def parse_transaction(
 
     TonAPI возвращает разные форматы для SSE и events endpoint.
     """
+    timestamp = _event_timestamp(tx)
+
     try:
         # Определяем тип транзакции
         actions = tx.get("actions", [])
@@ -163,7 +459,7 @@ def parse_transaction(
         event = {
             "wallet": wallet_label,
             "address": wallet_address,
-            "timestamp": datetime.now(UTC).isoformat(),
+            "timestamp": timestamp,
             "tx_hash": tx.get("event_id") or tx.get("hash") or tx.get("lt"),
             "raw": tx,  # для отладки
         }
@@ -180,112 +476,11 @@ def parse_transaction(
         action_type = action.get("type", "Unknown")
 
         # Нормализуем наш адрес для сравнения
-        try:
-            our_raw = normalize_address(wallet_address, "raw")
-        except Exception:
-            our_raw = wallet_address.lower()
-
-        if action_type == "TonTransfer":
-            ton_transfer = action.get("TonTransfer", {})
-            sender = ton_transfer.get("sender", {}).get("address", "")
-            recipient = ton_transfer.get("recipient", {}).get("address", "")
-            amount = int(ton_transfer.get("amount", 0)) / 1e9
-
-            # Определяем направление
-            try:
-                sender_raw = normalize_address(sender, "raw") if sender else ""
-            except Exception:
-                sender_raw = sender.lower() if sender else ""
-
-            if sender_raw == our_raw:
-                event["type"] = "outgoing_transfer"
-                event["to"] = recipient
-                event["amount"] = f"{amount:.4f} TON"
-            else:
-                event["type"] = "incoming_transfer"
-                event["from"] = sender
-                event["amount"] = f"{amount:.4f} TON"
-
-        elif action_type == "JettonTransfer":
-            jetton = action.get("JettonTransfer", {})
-            sender = jetton.get("sender", {}).get("address", "")
-            recipient = jetton.get("recipient", {}).get("address", "")
-            amount = jetton.get("amount", "0")
-            jetton_info = jetton.get("jetton", {})
-            symbol = jetton_info.get("symbol", "???")
-            decimals = jetton_info.get("decimals", 9)
-
-            human_amount = float(amount) / (10**decimals)
-
-            try:
-                sender_raw = normalize_address(sender, "raw") if sender else ""
-            except Exception:
-                sender_raw = sender.lower() if sender else ""
-
-            if sender_raw == our_raw:
-                event["type"] = "outgoing_transfer"
-                event["to"] = recipient
-            else:
-                event["type"] = "incoming_transfer"
-                event["from"] = sender
-
-            event["amount"] = f"{human_amount:.4f} {symbol}"
-            event["token"] = symbol
-
-        elif action_type == "JettonSwap":
-            swap = action.get("JettonSwap", {})
-            dex = swap.get("dex", "Unknown DEX")
-
-            # Что отдали
-            amount_in = swap.get("amount_in", "0")
-            jetton_in = swap.get("jetton_master_in", {})
-            symbol_in = jetton_in.get("symbol", "TON")
-            decimals_in = jetton_in.get("decimals", 9)
-
-            # Что получили
-            amount_out = swap.get("amount_out", "0")
-            jetton_out = swap.get("jetton_master_out", {})
-            symbol_out = jetton_out.get("symbol", "TON")
-            decimals_out = jetton_out.get("decimals", 9)
-
-            human_in = float(amount_in) / (10**decimals_in) if amount_in else 0
-            human_out = float(amount_out) / (10**decimals_out) if amount_out else 0
-
-            event["type"] = "swap"
-            event["dex"] = dex
-            event["amount"] = (
-                f"{human_in:.4f} {symbol_in} → {human_out:.4f} {symbol_out}"
-            )
-
-        elif action_type == "NftItemTransfer":
-            nft = action.get("NftItemTransfer", {})
-            sender = nft.get("sender", {}).get("address", "")
-            recipient = nft.get("recipient", {}).get("address", "")
-            nft_item = nft.get("nft", "")
-
-            event["type"] = "nft_transfer"
-
-            try:
-                sender_raw = normalize_address(sender, "raw") if sender else ""
-            except Exception:
-                sender_raw = sender.lower() if sender else ""
-
-            if sender_raw == our_raw:
-                event["to"] = recipient
-                event["direction"] = "outgoing"
-            else:
-                event["from"] = sender
-                event["direction"] = "incoming"
-
-            event["nft"] = nft_item
-            event["amount"] = "1 NFT"
+        our_key = _match_key(wallet_address)
 
-        else:
-            event["type"] = "other"
-            event["action_type"] = action_type
-            event["description"] = action.get("simple_preview", {}).get(
-                "description", action_type
-            )
+        _ACTION_HANDLERS.get(action_type, _handle_other_action)(
+            action, action_type, event, our_key
+        )
 
         # Убираем raw из финального вывода
         del event["raw"]
@@ -298,16 +493,77 @@ def parse_transaction(
             "wallet": wallet_label,
             "address": wallet_address,
             "error": str(e),
-            "timestamp": datetime.now(UTC).isoformat(),
+            "timestamp": timestamp,
         }
 
 
+class _StdoutBatcher:
+    """
+    Фоновый писатель JSON-строк в stdout.
+
+    Строки, пришедшие в пределах EMIT_BATCH_WINDOW (но не больше
+    EMIT_BATCH_SIZE), уходят одним write + flush. Формат вывода не меняется:
+    по одному JSON-объекту на строку, читатель stdout уже разбирает поток
+    построчно, сколько бы строк ни пришло за один flush.
+    """
+
+    def __init__(self, batch_size: int, window: float):
+        self.batch_size = batch_size
+        self.window = window
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def put(self, line: str) -> None:
+        """Ставит строку в очередь (писатель запускается при первом вызове)."""
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(
+                        target=self._run, name="monitor-stdout", daemon=True
+                    )
+                    self._thread.start()
+        self._queue.put(line)
+
+    def flush(self) -> None:
+        """Ждёт, пока все поставленные строки будут записаны."""
+        if self._thread is not None:
+            self._queue.join()
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            try:
+                # sys.stdout читается здесь: в daemon-режиме он подменяется на лог
+                sys.stdout.write("\n".join(batch) + "\n")
+                sys.stdout.flush()
+            except Exception:
+                pass
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+
+_stdout_batcher = _StdoutBatcher(EMIT_BATCH_SIZE, EMIT_BATCH_WINDOW)
+atexit.register(_stdout_batcher.flush)
+
+
 def emit_event(event: dict, logger: logging.Logger) -> None:
     """Выводит событие в stdout (JSON) и логирует."""
-    json_str = json.dumps(event, ensure_ascii=False)
+    json_str = json_dumps(event, indent=False)
 
-    # stdout для парсинга агентом
-    print(json_str, flush=True)
+    # stdout для парсинга агентом (пишется пачками фоновым потоком)
+    _stdout_batcher.put(json_str)
 
     # Лог
     logger.info(
@@ -316,10 +572,95 @@ def emit_event(event: dict, logger: logging.Logger) -> None:
 
 
 # =============================================================================
-# SSE Monitor (Вариант 1 - предпочтительный)
+# SSE Monitor
 # =============================================================================
 
 
+def _parse_sse_frame(frame: bytes) -> Tuple[str, bytes, Optional[str]]:
+    """
+    Разбирает один SSE кадр (без пустой строки-разделителя).
+
+    Returns:
+        (event, data, id) — id None, если в кадре нет поля id
+    """
+    event_type = "message"
+    event_id = None
+    data_lines = []
+
+    for line in frame.split(b"\n"):
+        # Пустые строки и комментарии (":heartbeat") пропускаем
+        if not line or line[:1] == b":":
+            continue
+
+        field, _, value = line.partition(b":")
+        if value[:1] == b" ":
+            value = value[1:]
+
+        if field == b"data":
+            data_lines.append(value)
+        elif field == b"event":
+            event_type = value.decode("utf-8", errors="replace")
+        elif field == b"id" and b"\0" not in value:
+            event_id = value.decode("utf-8", errors="replace")
+
+    return event_type, b"\n".join(data_lines), event_id
+
+
+def _iter_sse_events(
+    chunks: Iterable[bytes],
+) -> Iterator[Tuple[str, bytes, Optional[str]]]:
+    """
+    Поток SSE событий из байтовых чанков HTTP ответа.
+
+    Чанки копятся в одном bytearray, кадры отрезаются по пустой строке;
+    data отдаётся байтами, чтобы JSON разбирался сразу из них.
+    Концы строк CRLF и CR (оба допустимы по спецификации) приводятся к LF.
+    """
+    buf = bytearray()
+    pending_cr = False
+    for chunk in chunks:
+        if not chunk:
+            continue
+        if pending_cr:
+            chunk = b"\r" + chunk
+            pending_cr = False
+        if b"\r" in chunk:
+            # \r в конце чанка может быть первой половиной \r\n —
+            # решаем, когда придёт следующий чанк
+            if chunk[-1:] == b"\r":
+                chunk = chunk[:-1]
+                pending_cr = True
+            chunk = chunk.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+        buf += chunk
+
+        while (idx := buf.find(b"\n\n")) >= 0:
+            frame = bytes(buf[:idx])
+            del buf[: idx + 2]
+            yield _parse_sse_frame(frame)
+
+
+def _abort_stream(response) -> None:
+    """
+    Обрывает потоковый HTTP ответ так, чтобы блокирующий recv вернулся.
+
+    response.close() закрывает только файловую обёртку: сокет остаётся
+    открытым, и прерванное сигналом чтение продолжается. shutdown()
+    будит recv сразу (в том числе из другого потока).
+    """
+    raw = response.raw
+    sock = getattr(getattr(raw, "connection", None), "sock", None)
+    if sock is None:
+        # Connection: close — сокетом владеет сам ответ (http.client)
+        fp = getattr(getattr(raw, "_fp", None), "fp", None)
+        sock = getattr(getattr(fp, "raw", None), "_sock", None)
+    try:
+        if sock is not None:
+            sock.shutdown(socket.SHUT_RDWR)
+        response.close()
+    except Exception:
+        pass
+
+
 class SSEMonitor:
     """Real-time мониторинг через TonAPI SSE."""
 
@@ -336,31 +677,55 @@ class SSEMonitor:
         self.api_key = api_key
         self.running = False
         self._stop_event = threading.Event()
+        self.state = MonitorState()
+
+        # id последнего SSE события: при переподключении уходит в
+        # Last-Event-ID, чтобы сервер дослал пропущенное за разрыв
+        self._last_event_id: Optional[str] = None
+
+        # Текущий поток SSE: stop() закрывает его, чтобы прервать чтение
+        self._response = None
+
+        # Ключ адреса (_match_key) → (address, label); адреса кошельков
+        # разбираются один раз, а не на каждое событие.
+        # При совпадениях побеждает первый кошелёк
+        self._by_key: Dict[bytes, Tuple[str, str]] = {}
+        for addr, label in wallet_map.items():
+            self._by_key.setdefault(_match_key(addr), (addr, label))
 
     def start(self) -> None:
         """Запускает SSE мониторинг."""
-        if not SSE_AVAILABLE:
-            raise RuntimeError(
-                "sseclient not available. Install: pip install sseclient-py"
-            )
-
         self.running = True
         self._stop_event.clear()
 
-        while self.running and not self._stop_event.is_set():
-            try:
-                self._connect_and_listen()
-            except Exception as e:
-                self.logger.error(f"SSE error: {e}")
-                if self.running:
+        try:
+            while self.running and not self._stop_event.is_set():
+                try:
+                    self._connect_and_listen()
+                except Exception as e:
+                    if not self.running:
+                        # Поток закрыт из stop()
+                        break
+                    self.logger.error(f"SSE error: {e}")
                     self.logger.info(f"Reconnecting in {SSE_RECONNECT_DELAY}s...")
-                    time.sleep(SSE_RECONNECT_DELAY)
+                    self._stop_event.wait(SSE_RECONNECT_DELAY)
+        finally:
+            self.state.flush()
 
     def stop(self) -> None:
-        """Останавливает мониторинг."""
+        """
+        Останавливает мониторинг.
+
+        Вызывается и из обработчика сигнала: закрытие потока прерывает
+        блокирующее чтение сразу, не дожидаясь события или read timeout.
+        """
         self.running = False
         self._stop_event.set()
 
+        response = self._response
+        if response is not None:
+            _abort_stream(response)
+
     def _connect_and_listen(self) -> None:
         """Подключается к SSE и слушает события."""
         accounts = ",".join(self.addresses)
@@ -369,28 +734,49 @@ class SSEMonitor:
         headers = {"Accept": "text/event-stream"}
         if self.api_key:
             headers["Authorization"] = f"Bearer {self.api_key}"
+        if self._last_event_id:
+            headers["Last-Event-ID"] = self._last_event_id
 
         self.logger.info(f"Connecting to SSE: {len(self.addresses)} addresses")
 
-        response = requests.get(url, headers=headers, stream=True, timeout=None)
-        response.raise_for_status()
+        # Общая сессия без retry: переподключением управляет start().
+        # Read timeout рвёт соединение, по которому не пришёл даже heartbeat
+        session = get_shared_session(retries=0)
+        with session.get(
+            url,
+            headers=headers,
+            stream=True,
+            timeout=(SSE_CONNECT_TIMEOUT, SSE_READ_TIMEOUT),
+        ) as response:
+            self._response = response
+            try:
+                if self.running:
+                    # Иначе stop() пришёл, пока шло подключение
+                    self._listen(response)
+            finally:
+                self._response = None
 
-        client = sseclient.SSEClient(response)
+    def _listen(self, response) -> None:
+        """Читает события из открытого SSE потока."""
+        response.raise_for_status()
 
         self.logger.info("SSE connected, listening for events...")
 
-        for event in client:
+        chunks = response.iter_content(chunk_size=None)
+        for event_type, data, event_id in _iter_sse_events(chunks):
             if not self.running or self._stop_event.is_set():
                 break
 
-            if event.event == "message" and event.data:
+            if event_id is not None:
+                self._last_event_id = event_id
+
+            if event_type == "message" and data:
                 try:
-                    tx = json.loads(event.data)
+                    tx = json_loads(data)
                     self._process_sse_event(tx)
                 except json.JSONDecodeError:
-                    self.logger.warning(
-                        f"Invalid JSON in SSE event: {event.data[:100]}"
-                    )
+                    preview = data[:100].decode("utf-8", errors="replace")
+                    self.logger.warning(f"Invalid JSON in SSE event: {preview}")
 
     def _process_sse_event(self, tx: dict) -> None:
         """Обрабатывает SSE событие."""
@@ -398,21 +784,9 @@ class SSEMonitor:
         account_id = tx.get("account_id", "")
 
         # Ищем label для этого адреса
-        wallet_label = None
-        wallet_address = None
-
-        for addr, label in self.wallet_map.items():
-            try:
-                addr_raw = normalize_address(addr, "raw")
-                if addr_raw == account_id or addr == account_id:
-                    wallet_label = label
-                    wallet_address = addr
-                    break
-            except Exception:
-                if addr.lower() == account_id.lower():
-                    wallet_label = label
-                    wallet_address = addr
-                    break
+        wallet_address, wallet_label = self._by_key.get(
+            _match_key(account_id), (None, None)
+        )
 
         if not wallet_label or not wallet_address:
             # Используем адрес как есть
@@ -427,104 +801,7 @@ class SSEMonitor:
             # Обновляем last_seen
             event_id = tx.get("event_id") or tx.get("lt")
             if event_id:
-                update_last_seen(wallet_address, str(event_id))
-
-
-# =============================================================================
-# Polling Monitor (Вариант 2 - fallback)
-# =============================================================================
-
-
-class PollingMonitor:
-    """Polling мониторинг через TonAPI events endpoint."""
-
-    def __init__(
-        self,
-        addresses: List[str],
-        wallet_map: Dict[str, str],
-        logger: logging.Logger,
-        interval: int = POLL_INTERVAL,
-    ):
-        self.addresses = addresses
-        self.wallet_map = wallet_map
-        self.logger = logger
-        self.interval = interval
-        self.running = False
-        self._stop_event = threading.Event()
-
-    def start(self) -> None:
-        """Запускает polling мониторинг."""
-        self.running = True
-        self._stop_event.clear()
-
-        self.logger.info(
-            f"Starting polling monitor: {len(self.addresses)} addresses, {self.interval}s interval"
-        )
-
-        while self.running and not self._stop_event.is_set():
-            for address in self.addresses:
-                if not self.running:
-                    break
-
-                try:
-                    self._check_address(address)
-                except Exception as e:
-                    self.logger.error(f"Error checking {address}: {e}")
-
-            # Ждём интервал
-            self._stop_event.wait(self.interval)
-
-    def stop(self) -> None:
-        """Останавливает мониторинг."""
-        self.running = False
-        self._stop_event.set()
-
-    def _check_address(self, address: str) -> None:
-        """Проверяет новые события для адреса."""
-        label = self.wallet_map.get(address, address[:16] + "...")
-
-        # Получаем события
-        try:
-            friendly = raw_to_friendly(address) if ":" in address else address
-        except Exception:
-            friendly = address
-
-        result = tonapi_request(f"/accounts/{friendly}/events", params={"limit": 10})
-
-        if not result["success"]:
-            self.logger.warning(
-                f"Failed to get events for {label}: {result.get('error')}"
-            )
-            return
-
-        events = result["data"].get("events", [])
-        if not events:
-            return
-
-        # Получаем last_seen
-        last_seen = get_last_seen(address)
-
-        # Обрабатываем новые события (в обратном порядке, старые первыми)
-        new_events = []
-        for ev in reversed(events):
-            event_id = ev.get("event_id", "")
-
-            if last_seen and event_id == last_seen:
-                break
-
-            new_events.append(ev)
-
-        # Эмитим события
-        for ev in new_events:
-            event = parse_transaction(ev, label, address)
-            if event:
-                emit_event(event, self.logger)
-
-        # Обновляем last_seen
-        if events:
-            latest_id = events[0].get("event_id", "")
-            if latest_id:
-                update_last_seen(address, latest_id)
+                self.state.update_last_seen(wallet_address, str(event_id))
 
 
 # =============================================================================
@@ -539,12 +816,11 @@ class TONMonitor:
         self,
         password: str,
         wallets: Optional[List[str]] = None,
-        use_sse: bool = True,
         verbose: bool = False,
     ):
         self.password = password
-        self.wallet_filter = wallets
-        self.use_sse = use_sse and SSE_AVAILABLE
+        # Лейблы и адреса для фильтра (None — все кошельки)
+        self.wallet_filter = frozenset(wallets) if wallets else None
         self.verbose = verbose
 
         self.logger = setup_logging(MONITOR_LOG_FILE, verbose)
@@ -553,52 +829,47 @@ class TONMonitor:
 
     def start(self) -> None:
         """Запускает мониторинг."""
+        from wallet import WalletStorage
+
         # Загружаем кошельки
         storage = WalletStorage(self.password)
         all_wallets = storage.get_wallets(include_secrets=False)
 
         if not all_wallets:
             self.logger.error("No wallets found")
-            print(json.dumps({"error": "No wallets configured"}))
+            print(json_dumps({"error": "No wallets configured"}, indent=False))
             return sys.exit(1)
 
         # Фильтруем если указаны конкретные
-        if self.wallet_filter:
-            wallets = []
-            for w in all_wallets:
-                if (
-                    w.get("label") in self.wallet_filter
-                    or w.get("address") in self.wallet_filter
-                ):
-                    wallets.append(w)
+        wallet_filter = self.wallet_filter
+        if wallet_filter:
+            wallets = [
+                w
+                for w in all_wallets
+                if w.get("label") in wallet_filter or w.get("address") in wallet_filter
+            ]
         else:
             wallets = all_wallets
 
         if not wallets:
-            self.logger.error(f"No wallets matching filter: {self.wallet_filter}")
+            requested = sorted(wallet_filter or ())
+            self.logger.error(f"No wallets matching filter: {requested}")
             print(
-                json.dumps(
-                    {"error": f"No wallets matching filter: {self.wallet_filter}"}
+                json_dumps(
+                    {"error": f"No wallets matching filter: {requested}"}, indent=False
                 )
             )
             return sys.exit(1)
 
         # Строим карту адрес -> label
-        addresses = []
-        wallet_map = {}
-
-        for w in wallets:
-            addr = w.get("address", "")
-            label = w.get("label", "")
-            addresses.append(addr)
-            wallet_map[addr] = label
+        wallet_map = {w.get("address", ""): w.get("label", "") for w in wallets}
+        addresses = list(wallet_map)
 
         # Конфиг
         config = load_config()
         api_key = config.get("tonapi_key", "")
 
         self.logger.info(f"Starting monitor: {len(addresses)} wallets")
-        self.logger.info(f"Mode: {'SSE (real-time)' if self.use_sse else 'Polling'}")
 
         # Сохраняем PID
         self._save_pid()
@@ -607,7 +878,7 @@ class TONMonitor:
         state = load_state()
         state["started_at"] = datetime.now(UTC).isoformat()
         state["wallets"] = [w.get("label") for w in wallets]
-        state["mode"] = "sse" if self.use_sse else "polling"
+        state["mode"] = "sse"
         save_state(state)
 
         # Обработка сигналов
@@ -618,11 +889,7 @@ class TONMonitor:
         self._running = True
 
         try:
-            if self.use_sse:
-                self.monitor = SSEMonitor(addresses, wallet_map, self.logger, api_key)
-            else:
-                self.monitor = PollingMonitor(addresses, wallet_map, self.logger)
-
+            self.monitor = SSEMonitor(addresses, wallet_map, self.logger, api_key)
             self.monitor.start()
         finally:
             self._cleanup()
@@ -641,11 +908,12 @@ class TONMonitor:
     def _save_pid(self) -> None:
         """Сохраняет PID процесса."""
         ensure_skill_dir()
-        with open(MONITOR_PID_FILE, "w") as f:
-            f.write(str(os.getpid()))
+        _atomic_write(MONITOR_PID_FILE, str(os.getpid()).encode())
 
     def _cleanup(self) -> None:
         """Очистка при завершении."""
+        _stdout_batcher.flush()
+
         try:
             MONITOR_PID_FILE.unlink(missing_ok=True)
         except Exception:
@@ -663,59 +931,104 @@ class TONMonitor:
 # =============================================================================
 
 
+def _spawn_daemon(args, password: str) -> int:
+    """
+    Запускает монитор в фоне отдельным процессом (start без --daemon).
+
+    posix_spawn не копирует память родителя, как fork. Потомок получает
+    новую сессию, stdout/stderr в лог и stdin из /dev/null; пароль
+    передаётся через WALLET_PASSWORD, а не в argv (виден в ps).
+
+    Returns:
+        PID запущенного процесса
+    """
+    ensure_skill_dir()
+
+    argv = [sys.executable, str(Path(__file__).resolve()), "start"]
+    for wallet in args.wallet or ():
+        argv += ["--wallet", wallet]
+    if args.verbose:
+        argv.append("--verbose")
+    if args.debug_state:
+        argv.append("--debug-state")
+
+    env = dict(os.environ, WALLET_PASSWORD=password)
+    file_actions = [
+        (os.POSIX_SPAWN_OPEN, 0, os.devnull, os.O_RDONLY, 0),
+        (
+            os.POSIX_SPAWN_OPEN,
+            1,
+            str(MONITOR_LOG_FILE),
+            os.O_WRONLY | os.O_CREAT | os.O_APPEND,
+            0o644,
+        ),
+        (os.POSIX_SPAWN_DUP2, 1, 2),
+    ]
+
+    return os.posix_spawn(
+        sys.executable, argv, env, file_actions=file_actions, setsid=True
+    )
+
+
 def cmd_start(args) -> None:
     """Запуск мониторинга."""
+    global DEBUG_STATE
+    DEBUG_STATE = args.debug_state
+
     # Получаем пароль
     password = args.password or os.environ.get("WALLET_PASSWORD")
 
     if not password:
         if sys.stdin.isatty():
+            import getpass
+
             password = getpass.getpass("Wallet password: ")
         else:
             print(
-                json.dumps(
-                    {"error": "Password required. Use -p or WALLET_PASSWORD env"}
+                json_dumps(
+                    {"error": "Password required. Use -p or WALLET_PASSWORD env"},
+                    indent=False,
                 )
             )
             return sys.exit(1)
 
     # Daemon mode
     if args.daemon:
-        # Fork
-        pid = os.fork()
-        if pid > 0:
-            # Parent
-            print(
-                json.dumps(
-                    {
-                        "success": True,
-                        "action": "started",
-                        "pid": pid,
-                        "mode": "daemon",
-                        "log": str(MONITOR_LOG_FILE),
-                    }
-                )
+        pid = _spawn_daemon(args, password)
+        print(
+            json_dumps(
+                {
+                    "success": True,
+                    "action": "started",
+                    "pid": pid,
+                    "mode": "daemon",
+                    "log": str(MONITOR_LOG_FILE),
+                },
+                indent=False,
             )
-            sys.exit(0)
-        else:
-            # Child - detach
-            os.setsid()
-
-            # Redirect stdout/stderr
-            sys.stdout = open(MONITOR_LOG_FILE, "a")
-            sys.stderr = sys.stdout
+        )
+        sys.exit(0)
 
     # Запускаем
     wallets = args.wallet if args.wallet else None
-    use_sse = not args.polling
-
-    monitor = TONMonitor(
-        password=password, wallets=wallets, use_sse=use_sse, verbose=args.verbose
-    )
+    monitor = TONMonitor(password=password, wallets=wallets, verbose=args.verbose)
 
     monitor.start()
 
 
+def _read_pid() -> Optional[int]:
+    """
+    PID из MONITOR_PID_FILE; None, если файла нет.
+
+    Файл пишется атомарно (_atomic_write), поэтому частично записанным
+    не бывает. ValueError — если в нём не число.
+    """
+    try:
+        return int(MONITOR_PID_FILE.read_text().strip())
+    except FileNotFoundError:
+        return None
+
+
 def cmd_status(args) -> None:
     """Статус мониторинга."""
     state = load_state()
@@ -729,51 +1042,86 @@ def cmd_status(args) -> None:
     }
 
     # Проверяем PID
-    if MONITOR_PID_FILE.exists():
-        try:
-            with open(MONITOR_PID_FILE, "r") as f:
-                pid = int(f.read().strip())
-
+    try:
+        pid = _read_pid()
+        if pid is not None:
             # Проверяем жив ли процесс
             os.kill(pid, 0)
             result["running"] = True
             result["pid"] = pid
-        except (ValueError, OSError):
-            # Процесс умер
-            MONITOR_PID_FILE.unlink(missing_ok=True)
+    except (ValueError, OSError):
+        # Процесс умер
+        MONITOR_PID_FILE.unlink(missing_ok=True)
 
-    print(json.dumps(result, indent=2))
+    print(json_dumps(result))
+
+
+def _open_pidfd(pid: int) -> Optional[int]:
+    """pidfd процесса или None (не Linux, старое ядро, нет прав)."""
+    pidfd_open = getattr(os, "pidfd_open", None)
+    if pidfd_open is None:
+        return None
+    try:
+        return pidfd_open(pid)
+    except OSError:
+        return None
+
+
+def _wait_for_exit(pid: int, pidfd: Optional[int], timeout: float) -> None:
+    """
+    Ждёт завершения процесса, но не дольше timeout.
+
+    С pidfd ядро будит select сразу при выходе процесса; без него —
+    опрос os.kill(pid, 0) с растущим интервалом.
+    """
+    if pidfd is not None:
+        select.select([pidfd], [], [], timeout)
+        return
+
+    deadline = time.monotonic() + timeout
+    delay = 0.01
+    while time.monotonic() < deadline:
+        try:
+            os.kill(pid, 0)
+        except OSError:
+            return
+        time.sleep(min(delay, max(0.0, deadline - time.monotonic())))
+        delay = min(delay * 2, 0.5)
 
 
 def cmd_stop(args) -> None:
     """Остановка мониторинга."""
-    if not MONITOR_PID_FILE.exists():
-        print(json.dumps({"success": False, "error": "Monitor not running"}))
-        return sys.exit(1)
-
     try:
-        with open(MONITOR_PID_FILE, "r") as f:
-            pid = int(f.read().strip())
-
-        os.kill(pid, signal.SIGTERM)
+        pid = _read_pid()
+        if pid is None:
+            print(
+                json_dumps(
+                    {"success": False, "error": "Monitor not running"}, indent=False
+                )
+            )
+            return sys.exit(1)
 
-        # Ждём завершения
-        for _ in range(10):
-            try:
-                os.kill(pid, 0)
-                time.sleep(0.5)
-            except OSError:
-                break
+        # pidfd берём до сигнала: он не перепутается с новым процессом
+        # на том же PID
+        pidfd = _open_pidfd(pid)
+        try:
+            os.kill(pid, signal.SIGTERM)
+            _wait_for_exit(pid, pidfd, STOP_TIMEOUT)
+        finally:
+            if pidfd is not None:
+                os.close(pidfd)
 
         MONITOR_PID_FILE.unlink(missing_ok=True)
 
-        print(json.dumps({"success": True, "action": "stopped", "pid": pid}))
+        print(
+            json_dumps({"success": True, "action": "stopped", "pid": pid}, indent=False)
+        )
 
     except ValueError:
-        print(json.dumps({"success": False, "error": "Invalid PID file"}))
+        print(json_dumps({"success": False, "error": "Invalid PID file"}, indent=False))
         return sys.exit(1)
     except OSError as e:
-        print(json.dumps({"success": False, "error": str(e)}))
+        print(json_dumps({"success": False, "error": str(e)}, indent=False))
         return sys.exit(1)
 
 
@@ -782,7 +1130,21 @@ def cmd_stop(args) -> None:
 # =============================================================================
 
 
+COMMANDS = {
+    "start": cmd_start,
+    "status": cmd_status,
+    "stop": cmd_stop,
+}
+
+# Команды без аргументов: вызов без опций обходится без argparse
+_NO_ARG_COMMANDS = frozenset({"status", "stop"})
+
+
 def main():
+    argv = sys.argv[1:]
+    if len(argv) == 1 and argv[0] in _NO_ARG_COMMANDS:
+        return COMMANDS[argv[0]](argparse.Namespace(command=argv[0]))
+
     parser = argparse.ArgumentParser(
         description="TON Transaction Monitor",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -805,10 +1167,12 @@ Examples:
         "--wallet", "-w", action="append", help="Specific wallet(s) to monitor"
     )
     start_p.add_argument("--daemon", "-d", action="store_true", help="Run as daemon")
+    start_p.add_argument("--verbose", "-v", action="store_true", help="Verbose logging")
     start_p.add_argument(
-        "--polling", action="store_true", help="Use polling instead of SSE"
+        "--debug-state",
+        action="store_true",
+        help="Write the state file indented (human-readable)",
     )
-    start_p.add_argument("--verbose", "-v", action="store_true", help="Verbose logging")
 
     # --- status ---
     subparsers.add_parser("status", help="Show monitor status")
@@ -822,13 +1186,7 @@ Examples:
         parser.print_help()
         return sys.exit(1)
 
-    commands = {
-        "start": cmd_start,
-        "status": cmd_status,
-        "stop": cmd_stop,
-    }
-
-    commands[args.command](args)
+    COMMANDS[args.command](args)
 
 
 if __name__ == "__main__":
@@ -16,20 +16,34 @@ OpenClaw TON Skill — NFT операции
 
 import os
 import sys
-import json
+import threading
 import base64
 import argparse
-import getpass
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from types import MappingProxyType
+from typing import Iterator, List, Optional, Tuple
 
 # Локальный импорт
 script_dir = Path(__file__).parent
-sys.path.insert(0, str(script_dir))
-
-from utils import tonapi_request, api_request, normalize_address, load_config  # noqa: E402
+if str(script_dir) not in sys.path:
+    sys.path.insert(0, str(script_dir))
+
+from utils import (  # noqa: E402
+    tonapi_request,
+    api_request,
+    normalize_address,
+    normalize_address_both,
+    load_config,
+    ttl_cache,
+)
+from common import json_dumps  # noqa: E402
 from dns import resolve_address, is_ton_domain  # noqa: E402
-from wallet import WalletStorage  # noqa: E402
+
+# wallet и tonsdk импортируются там, где нужны: list/info/collection
+# не подписывают транзакции и не должны платить за загрузку крипто-модулей
 
 
 def _make_url_safe(address: str) -> str:
@@ -37,15 +51,22 @@ def _make_url_safe(address: str) -> str:
     return address.replace("+", "-").replace("/", "_")
 
 
-# TON SDK
-try:
-    from tonsdk.contract.wallet import Wallets, WalletVersionEnum
-    from tonsdk.utils import to_nano, from_nano  # noqa: F401
-    from tonsdk.boc import Cell  # noqa: F401
+@lru_cache(maxsize=4096)
+def _api_address(address: str) -> str:
+    """
+    Адрес для URL запросов к API: friendly + URL-safe.
+
+    Неразбираемый адрес возвращается как есть (URL-safe).
+    """
+    try:
+        address = normalize_address(address, "friendly")
+    except Exception:
+        pass
+    return _make_url_safe(address)
 
-    TONSDK_AVAILABLE = True
-except ImportError:
-    TONSDK_AVAILABLE = False
+
+# TON SDK (импортируется при первом использовании)
+TONSDK_AVAILABLE = importlib.util.find_spec("tonsdk") is not None
 
 
 # =============================================================================
@@ -55,11 +76,31 @@ except ImportError:
 # NFT Transfer opcode (TEP-62)
 NFT_TRANSFER_OPCODE = 0x5FCC3D14
 
+# Максимальный limit одной страницы TonAPI /accounts/{id}/nfts
+NFT_PAGE_SIZE = 1000
+
 # Marketapp API
 MARKETAPP_BASE = "https://api.marketapp.ws/v1"
 
-# Known collection aliases
-COLLECTION_ALIASES = {
+# nanoTON в 1 TON
+NANO_PER_TON = 10**9
+
+# Максимум исходящих сообщений в одной транзакции v3/v4 кошелька
+MAX_WALLET_MESSAGES = 4
+
+# Сколько записей запрашивать с sort_by=min_bid_asc: по ним проверяем,
+# что сервер действительно отсортировал ответ
+FLOOR_SORT_CHECK = 5
+
+# Размер страницы для поиска floor на клиенте, если сервер не отсортировал
+FLOOR_SCAN_LIMIT = 100
+
+# Сколько ждать фоновую загрузку /collections/ (сек), прежде чем
+# запрашивать индекс самостоятельно
+COLLECTIONS_PREFETCH_WAIT = 10.0
+
+# Known collection aliases (ключи в нижнем регистре)
+_COLLECTION_ALIASES = {
     # Anonymous Telegram Numbers
     "anonymous-numbers": "EQAOQdwdw8kGftJCSFgOErM1mBjYPe4DBPq8-AhF6vr9si5N",
     "anon": "EQAOQdwdw8kGftJCSFgOErM1mBjYPe4DBPq8-AhF6vr9si5N",
@@ -68,6 +109,24 @@ COLLECTION_ALIASES = {
     "usernames": "EQCA14o1-VWhS2efqoh_9M1b_A9DtKTuoqfmkn83AbJzwnPi",
     "username": "EQCA14o1-VWhS2efqoh_9M1b_A9DtKTuoqfmkn83AbJzwnPi",
 }
+COLLECTION_ALIASES = MappingProxyType(_COLLECTION_ALIASES)
+
+
+def _to_ton(value) -> float:
+    """
+    nanoTON (int или строка из API) → TON.
+
+    Одно деление int / int округляется корректно (ближайший float),
+    поэтому отдельная целочисленная часть не даёт большей точности.
+    """
+    return int(value or 0) / NANO_PER_TON
+
+
+def _nano_to_ton(value) -> Optional[float]:
+    """Как _to_ton, но пустое или нулевое значение (нет данных) → None."""
+    if not value:
+        return None
+    return _to_ton(value)
 
 
 # =============================================================================
@@ -123,6 +182,8 @@ def marketapp_request(
 
 def get_wallet_from_storage(identifier: str, password: str) -> Optional[dict]:
     """Получает кошелёк из хранилища с приватными данными."""
+    from wallet import WalletStorage
+
     storage = WalletStorage(password)
     return storage.get_wallet(identifier, include_secrets=True)
 
@@ -132,6 +193,8 @@ def create_wallet_instance(wallet_data: dict):
     if not TONSDK_AVAILABLE:
         raise RuntimeError("tonsdk not available. Install: pip install tonsdk")
 
+    from tonsdk.contract.wallet import Wallets, WalletVersionEnum
+
     mnemonic = wallet_data.get("mnemonic")
     if not mnemonic:
         raise ValueError("Wallet has no mnemonic")
@@ -180,6 +243,8 @@ def resolve_wallet_address(
     # Ищем в хранилище по лейблу
     if password:
         try:
+            from wallet import WalletStorage
+
             storage = WalletStorage(password)
             wallet_data = storage.get_wallet(wallet_identifier, include_secrets=False)
             if wallet_data:
@@ -195,17 +260,123 @@ def resolve_wallet_address(
 # =============================================================================
 
 
+# Префиксы friendly адресов: UQ..., EQ..., kQ..., 0Q... (и -1 workchain)
+_FRIENDLY_PREFIXES = frozenset({"UQ", "EQ", "kQ", "0Q", "Uf", "Ef", "kf", "0f"})
+
+
 def looks_like_address(s: str) -> bool:
     """Быстрая проверка - похоже ли на TON адрес."""
     if not s:
         return False
+    n = len(s)
     # Raw формат: 0:abc123...
-    if ":" in s and len(s) > 40:
-        return True
-    # Friendly формат: UQ..., EQ..., kQ..., 0Q...
-    if len(s) >= 48 and s[:2] in ("UQ", "EQ", "kQ", "0Q", "Uf", "Ef", "kf", "0f"):
+    if n > 40 and ":" in s:
         return True
-    return False
+    # Friendly формат
+    return n >= 48 and s[:2] in _FRIENDLY_PREFIXES
+
+
+def _tonapi_nft_name(item: dict) -> str:
+    """Имя NFT из TonAPI: metadata.name, затем .ton домен, затем индекс."""
+    return (
+        item.get("metadata", {}).get("name")
+        or item.get("dns")
+        or f"NFT #{item.get('index', '?')}"
+    )
+
+
+def _tonapi_nft_sale(item: dict) -> Optional[dict]:
+    """Продажа NFT из TonAPI (поле sale) или None."""
+    sale = item.get("sale")
+    if not sale:
+        return None
+
+    price_nano = int(sale.get("price", {}).get("value", 0))
+    return {
+        "price_nano": price_nano,
+        "price_ton": _to_ton(price_nano),
+        "marketplace": sale.get("market", {}).get("name"),
+    }
+
+
+def _parse_nft_item(item: dict) -> dict:
+    """Разбирает NFT из ответа TonAPI /accounts/{id}/nfts."""
+    metadata = item.get("metadata", {})
+    collection = item.get("collection", {})
+    previews = item.get("previews", [])
+
+    # Выбираем превью: 500x500, иначе первое
+    preview_urls = {p.get("resolution"): p.get("url") for p in previews}
+    preview_url = preview_urls.get("500x500") or next(iter(preview_urls.values()), None)
+
+    nft = {
+        "address": item.get("address"),
+        "index": item.get("index"),
+        "name": _tonapi_nft_name(item),
+        "description": metadata.get("description"),
+        "preview_url": preview_url,
+        "collection": {
+            "address": collection.get("address"),
+            "name": collection.get("name"),
+        }
+        if collection
+        else None,
+        "verified": item.get("verified", False),
+        "owner": item.get("owner", {}).get("address"),
+        "sale": _tonapi_nft_sale(item),
+    }
+
+    if item.get("dns"):
+        nft["dns_domain"] = item.get("dns")
+
+    return nft
+
+
+def _fetch_nft_page(api_address: str, offset: int, page_size: int) -> dict:
+    """Одна страница NFT аккаунта из TonAPI."""
+    return tonapi_request(
+        f"/accounts/{api_address}/nfts",
+        params={"limit": page_size, "offset": offset, "indirect_ownership": "true"},
+    )
+
+
+def iter_nft_pages(api_address: str, limit: int = 100) -> Iterator[dict]:
+    """
+    Постранично отдаёт NFT аккаунта (результаты tonapi_request).
+
+    Следующая страница запрашивается в фоне, пока вызывающий
+    обрабатывает текущую. Неуспешный результат отдаётся последним.
+
+    Args:
+        api_address: Адрес кошелька (friendly)
+        limit: Максимальное количество NFT
+
+    Yields:
+        Результат tonapi_request для очередной страницы
+    """
+    page_size = min(limit, NFT_PAGE_SIZE)
+    offset = 0
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        future = executor.submit(_fetch_nft_page, api_address, offset, page_size)
+        while future is not None:
+            result = future.result()
+            if not result["success"]:
+                yield result
+                return
+
+            received = len(result["data"].get("nft_items", []))
+            offset += received
+
+            # Полная страница и лимит не выбран — заранее просим следующую
+            future = None
+            if received == page_size and offset < limit:
+                page_size = min(page_size, limit - offset)
+                future = executor.submit(
+                    _fetch_nft_page, api_address, offset, page_size
+                )
+
+            yield result
 
 
 def list_nfts(
@@ -231,72 +402,17 @@ def list_nfts(
         }
 
     # Нормализуем адрес для API
-    try:
-        api_address = normalize_address(address, "friendly")
-    except Exception:
-        api_address = address
-
-    # Запрос к TonAPI
-    result = tonapi_request(
-        f"/accounts/{api_address}/nfts",
-        params={"limit": limit, "indirect_ownership": "true"},
-    )
+    api_address = _api_address(address)
 
-    if not result["success"]:
-        return {"success": False, "error": result.get("error", "Failed to fetch NFTs")}
-
-    data = result["data"]
-    nft_items = data.get("nft_items", [])
-
-    # Парсим NFT
     nfts = []
-    for item in nft_items:
-        metadata = item.get("metadata", {})
-        collection = item.get("collection", {})
-        previews = item.get("previews", [])
-
-        # Выбираем превью
-        preview_url = None
-        for p in previews:
-            if p.get("resolution") == "500x500":
-                preview_url = p.get("url")
-                break
-        if not preview_url and previews:
-            preview_url = previews[0].get("url")
-
-        # Sale info
-        sale = item.get("sale")
-        sale_info = None
-        if sale:
-            price_val = int(sale.get("price", {}).get("value", 0))
-            sale_info = {
-                "price_ton": price_val / 1e9,
-                "marketplace": sale.get("market", {}).get("name"),
-            }
-
-        nft = {
-            "address": item.get("address"),
-            "index": item.get("index"),
-            "name": metadata.get("name")
-            or item.get("dns")
-            or f"NFT #{item.get('index', '?')}",
-            "description": metadata.get("description"),
-            "preview_url": preview_url,
-            "collection": {
-                "address": collection.get("address"),
-                "name": collection.get("name"),
+    for result in iter_nft_pages(api_address, limit):
+        if not result["success"]:
+            return {
+                "success": False,
+                "error": result.get("error", "Failed to fetch NFTs"),
             }
-            if collection
-            else None,
-            "verified": item.get("verified", False),
-            "owner": item.get("owner", {}).get("address"),
-            "sale": sale_info,
-        }
-
-        if item.get("dns"):
-            nft["dns_domain"] = item.get("dns")
-
-        nfts.append(nft)
+        items = result["data"].get("nft_items", [])
+        nfts.extend(_parse_nft_item(item) for item in items)
 
     return {"success": True, "wallet": api_address, "count": len(nfts), "nfts": nfts}
 
@@ -318,16 +434,14 @@ def get_nft_info(nft_address: str) -> dict:
     Returns:
         dict с информацией об NFT
     """
-    try:
-        api_address = _make_url_safe(normalize_address(nft_address, "friendly"))
-    except Exception:
-        api_address = _make_url_safe(nft_address)
-
-    # Запрос к Marketapp (может вернуть ошибку если ключ не настроен)
-    marketapp_result = marketapp_request(f"/nfts/{api_address}/")
+    api_address = _api_address(nft_address)
 
-    # Запрос к TonAPI для дополнительных данных
-    tonapi_result = tonapi_request(f"/nfts/{api_address}")
+    # Marketapp (может вернуть ошибку если ключ не настроен) и TonAPI
+    # независимы — запрашиваем параллельно
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        marketapp_future = executor.submit(marketapp_request, f"/nfts/{api_address}/")
+        tonapi_result = tonapi_request(f"/nfts/{api_address}")
+        marketapp_result = marketapp_future.result()
 
     # Если оба API недоступны (и это не просто отсутствие ключа Marketapp)
     if not tonapi_result["success"] and (
@@ -373,7 +487,7 @@ def get_nft_info(nft_address: str) -> dict:
             price_nano = int(status_details.get("price", 0))
             result["sale"] = {
                 "price_nano": price_nano,
-                "price_ton": price_nano / 1e9,
+                "price_ton": _to_ton(price_nano),
                 "marketplace": "Marketapp",
             }
         else:
@@ -388,22 +502,16 @@ def get_nft_info(nft_address: str) -> dict:
 
         # Дополняем если нет из Marketapp
         if not result.get("name"):
-            result["name"] = (
-                metadata.get("name")
-                or ton_data.get("dns")
-                or f"NFT #{ton_data.get('index', '?')}"
-            )
+            result["name"] = _tonapi_nft_name(ton_data)
 
         result["description"] = metadata.get("description")
         result["image"] = metadata.get("image")
         result["index"] = ton_data.get("index")
 
         # Превью
-        preview_urls = {}
-        for p in previews:
-            resolution = p.get("resolution", "unknown")
-            preview_urls[resolution] = p.get("url")
-        result["previews"] = preview_urls
+        result["previews"] = {
+            p.get("resolution", "unknown"): p.get("url") for p in previews
+        }
 
         # Коллекция
         if collection:
@@ -425,23 +533,83 @@ def get_nft_info(nft_address: str) -> dict:
 
         # Sale из TonAPI если нет из Marketapp
         if not result.get("sale"):
-            sale = ton_data.get("sale")
-            if sale:
-                price_val = int(sale.get("price", {}).get("value", 0))
-                result["sale"] = {
-                    "price_nano": price_val,
-                    "price_ton": price_val / 1e9,
-                    "marketplace": sale.get("market", {}).get("name"),
-                }
+            result["sale"] = _tonapi_nft_sale(ton_data)
 
     return result
 
 
+# Торговые функции читают состояние NFT через короткий TTL-кэш: batch-варианты
+# и повторный вызов emulate → confirm в одном процессе не ходят в API заново.
+# Ключ — нормализованный адрес, так что raw и friendly формы делят запись.
+# Просроченные данные при ошибке API не отдаются: по ним проверяются
+# владение и статус продажи.
+_get_nft_info_cached = ttl_cache(
+    "short", maxsize=512, key_func=_api_address, stale_on_error=False
+)(get_nft_info)
+
+
+def invalidate_nft_info(nft_address: str) -> None:
+    """Сбрасывает кэш get_nft_info для NFT (после отправки транзакции)."""
+    _get_nft_info_cached.cache_invalidate(nft_address)
+
+
 # =============================================================================
 # Collection Info (Marketapp)
 # =============================================================================
 
 
+@ttl_cache("normal", maxsize=1)
+def get_collections_index() -> dict:
+    """
+    Список коллекций Marketapp, проиндексированный по адресу.
+
+    Один запрос /collections/ на TTL вместо запроса и линейного поиска
+    на каждый вызов get_collection_info / get_collection_floor.
+
+    Returns:
+        dict: success, collections (read-only: адрес -> коллекция)
+    """
+    result = marketapp_request("/collections/")
+    if not result["success"]:
+        return result
+
+    index = {}
+    for coll in result["data"]:
+        index.setdefault(coll.get("address"), coll)
+
+    return {"success": True, "collections": MappingProxyType(index)}
+
+
+# Фоновая загрузка индекса коллекций при импорте (opt-in через
+# OPENCLAW_PREFETCH_COLLECTIONS=1): первый get_collection_floor в процессе
+# не платит за запрос /collections/.
+_COLLECTIONS_PREFETCHED = threading.Event()
+
+
+def _prefetch_collections_index() -> None:
+    try:
+        get_collections_index()
+    finally:
+        _COLLECTIONS_PREFETCHED.set()
+
+
+def _collections_index() -> dict:
+    """
+    get_collections_index(), дождавшись фоновой загрузки если она идёт.
+
+    Без ожидания первый вызов параллельно с prefetch запросил бы
+    /collections/ второй раз.
+    """
+    _COLLECTIONS_PREFETCHED.wait(COLLECTIONS_PREFETCH_WAIT)
+    return get_collections_index()
+
+
+if os.environ.get("OPENCLAW_PREFETCH_COLLECTIONS") == "1":
+    threading.Thread(target=_prefetch_collections_index, daemon=True).start()
+else:
+    _COLLECTIONS_PREFETCHED.set()
+
+
 def get_collection_info(
     collection_address: str, filter_by: str = "onsale", limit: int = 10
 ) -> dict:
@@ -457,29 +625,29 @@ def get_collection_info(
     Returns:
         dict с информацией о коллекции
     """
-    try:
-        api_address = _make_url_safe(normalize_address(collection_address, "friendly"))
-    except Exception:
-        api_address = _make_url_safe(collection_address)
+    api_address = _api_address(collection_address)
+
+    # Три независимых запроса — выполняем параллельно
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        # Список коллекций для получения статистики (Marketapp)
+        collections_future = executor.submit(_collections_index)
+
+        # NFT в коллекции (Marketapp)
+        nfts_future = executor.submit(
+            marketapp_request,
+            f"/nfts/collections/{api_address}/",
+            params={"filter_by": filter_by, "limit": limit},
+        )
 
-    # TonAPI для метаданных (всегда пробуем)
-    tonapi_result = tonapi_request(f"/nfts/collections/{api_address}")
+        # TonAPI для метаданных (всегда пробуем)
+        tonapi_result = tonapi_request(f"/nfts/collections/{api_address}")
 
-    # Список коллекций для получения статистики (Marketapp)
-    collections_result = marketapp_request("/collections/")
+        collections_result = collections_future.result()
+        nfts_result = nfts_future.result()
 
     collection_stats = None
     if collections_result["success"]:
-        for coll in collections_result["data"]:
-            if coll.get("address") == api_address:
-                collection_stats = coll
-                break
-
-    # NFT в коллекции (Marketapp)
-    nfts_result = marketapp_request(
-        f"/nfts/collections/{api_address}/",
-        params={"filter_by": filter_by, "limit": limit},
-    )
+        collection_stats = collections_result["collections"].get(api_address)
 
     # Если TonAPI недоступен и Marketapp тоже
     if not tonapi_result["success"] and not collections_result["success"]:
@@ -499,15 +667,9 @@ def get_collection_info(
         extra = collection_stats.get("extra_data", {})
         result["stats"] = {
             "items_count": extra.get("items"),
-            "floor_ton": int(extra.get("floor", 0)) / 1e9
-            if extra.get("floor")
-            else None,
-            "volume_7d_ton": int(extra.get("volume7d", 0)) / 1e9
-            if extra.get("volume7d")
-            else None,
-            "volume_30d_ton": int(extra.get("volume30d", 0)) / 1e9
-            if extra.get("volume30d")
-            else None,
+            "floor_ton": _nano_to_ton(extra.get("floor")),
+            "volume_7d_ton": _nano_to_ton(extra.get("volume7d")),
+            "volume_30d_ton": _nano_to_ton(extra.get("volume30d")),
             "owners": extra.get("owners"),
             "on_sale": extra.get("on_sale_all"),
         }
@@ -523,7 +685,7 @@ def get_collection_info(
                 {
                     "address": item.get("address"),
                     "name": item.get("name"),
-                    "price_ton": min_bid / 1e9,
+                    "price_ton": _to_ton(min_bid),
                     "owner": item.get("real_owner"),
                     "item_num": item.get("item_num"),
                 }
@@ -568,13 +730,71 @@ def resolve_collection_alias(collection: str) -> str:
     Returns:
         Collection address
     """
-    # Check if it's a known alias
-    alias_lower = collection.lower().strip()
-    if alias_lower in COLLECTION_ALIASES:
-        return COLLECTION_ALIASES[alias_lower]
+    # Known alias, otherwise return as-is (assume it's an address)
+    return COLLECTION_ALIASES.get(collection.lower().strip(), collection)
+
+
+def _fetch_floor_nft(api_address: str) -> dict:
+    """
+    Самый дешёвый NFT коллекции на продаже (Marketapp).
+
+    Сначала просим сервер отсортировать по цене и вернуть FLOOR_SORT_CHECK
+    записей. Если запрос отклонён, цены не по возрастанию (сервер молча
+    проигнорировал sort_by) или первая запись без цены — сканируем
+    страницу из FLOOR_SCAN_LIMIT NFT на клиенте.
+
+    Returns:
+        dict: success, empty (на продаже ничего нет), floor_nft,
+        floor_price_nano; при скане ещё on_sale_count
+    """
+    endpoint = f"/nfts/collections/{api_address}/"
+
+    sorted_result = marketapp_request(
+        endpoint,
+        params={
+            "filter_by": "onsale",
+            "sort_by": "min_bid_asc",
+            "limit": FLOOR_SORT_CHECK,
+        },
+    )
+    if sorted_result["success"]:
+        items = sorted_result["data"].get("items", [])
+        if not items:
+            return {"success": True, "empty": True, "floor_nft": None}
+
+        prices = [int(item.get("min_bid", 0)) for item in items]
+        price = prices[0]
+        if price > 0 and all(a <= b for a, b in zip(prices, prices[1:])):
+            return {
+                "success": True,
+                "empty": False,
+                "floor_nft": items[0],
+                "floor_price_nano": price,
+            }
 
-    # Return as-is (assume it's an address)
-    return collection
+    scan_result = marketapp_request(
+        endpoint, params={"filter_by": "onsale", "limit": FLOOR_SCAN_LIMIT}
+    )
+    if not scan_result["success"]:
+        return scan_result
+
+    items = scan_result["data"].get("items", [])
+
+    min_price = 0
+    min_nft = None
+    for item in items:
+        price = int(item.get("min_bid", 0))
+        if price > 0 and (min_nft is None or price < min_price):
+            min_price = price
+            min_nft = item
+
+    return {
+        "success": True,
+        "empty": not items,
+        "floor_nft": min_nft,
+        "floor_price_nano": min_price,
+        "on_sale_count": len(items),
+    }
 
 
 def get_collection_floor(collection: str) -> dict:
@@ -588,22 +808,18 @@ def get_collection_floor(collection: str) -> dict:
         dict with floor price info
     """
     # Resolve alias
-    collection_address = resolve_collection_alias(collection)
+    alias_lower = collection.lower().strip()
+    alias = alias_lower if alias_lower in COLLECTION_ALIASES else None
+    collection_address = COLLECTION_ALIASES.get(alias_lower, collection)
 
-    try:
-        api_address = _make_url_safe(normalize_address(collection_address, "friendly"))
-    except Exception:
-        api_address = _make_url_safe(collection_address)
+    api_address = _api_address(collection_address)
 
     # Method 1: Try to get from /collections/ list (has floor in extra_data)
-    collections_result = marketapp_request("/collections/")
+    collections_result = _collections_index()
 
     collection_data = None
     if collections_result["success"]:
-        for coll in collections_result["data"]:
-            if coll.get("address") == api_address:
-                collection_data = coll
-                break
+        collection_data = collections_result["collections"].get(api_address)
 
     if collection_data:
         extra = collection_data.get("extra_data", {})
@@ -614,36 +830,27 @@ def get_collection_floor(collection: str) -> dict:
             "collection": {
                 "address": api_address,
                 "name": collection_data.get("name"),
-                "alias": collection.lower()
-                if collection.lower() in COLLECTION_ALIASES
-                else None,
+                "alias": alias,
             },
             "floor_price_nano": floor_nano,
-            "floor_price_ton": floor_nano / 1e9 if floor_nano else None,
+            "floor_price_ton": _nano_to_ton(floor_nano),
             "stats": {
                 "items_count": extra.get("items"),
                 "on_sale": extra.get("on_sale_all"),
                 "owners": extra.get("owners"),
-                "volume_7d_ton": int(extra.get("volume7d", 0)) / 1e9
-                if extra.get("volume7d")
-                else None,
-                "volume_30d_ton": int(extra.get("volume30d", 0)) / 1e9
-                if extra.get("volume30d")
-                else None,
+                "volume_7d_ton": _nano_to_ton(extra.get("volume7d")),
+                "volume_30d_ton": _nano_to_ton(extra.get("volume30d")),
             },
             "source": "marketapp_collections",
         }
 
     # Method 2: Fallback - get cheapest NFT on sale from the collection
-    nfts_result = marketapp_request(
-        f"/nfts/collections/{api_address}/",
-        params={"filter_by": "onsale", "limit": 100},
-    )
+    floor_result = _fetch_floor_nft(api_address)
 
-    if nfts_result["success"]:
-        items = nfts_result["data"].get("items", [])
+    if floor_result["success"]:
+        min_nft = floor_result["floor_nft"]
 
-        if not items:
+        if floor_result["empty"]:
             # Try TonAPI for collection name at least
             tonapi_result = tonapi_request(f"/nfts/collections/{api_address}")
             collection_name = None
@@ -658,9 +865,7 @@ def get_collection_floor(collection: str) -> dict:
                 "collection": {
                     "address": api_address,
                     "name": collection_name,
-                    "alias": collection.lower()
-                    if collection.lower() in COLLECTION_ALIASES
-                    else None,
+                    "alias": alias,
                 },
                 "floor_price_nano": None,
                 "floor_price_ton": None,
@@ -668,35 +873,27 @@ def get_collection_floor(collection: str) -> dict:
                 "source": "marketapp_nfts",
             }
 
-        # Find minimum price
-        min_price = float("inf")
-        min_nft = None
-        for item in items:
-            price = int(item.get("min_bid", 0))
-            if price > 0 and price < min_price:
-                min_price = price
-                min_nft = item
-
         if min_nft:
-            return {
+            min_price = floor_result["floor_price_nano"]
+            result = {
                 "success": True,
                 "collection": {
                     "address": api_address,
                     "name": min_nft.get("collection_name"),
-                    "alias": collection.lower()
-                    if collection.lower() in COLLECTION_ALIASES
-                    else None,
+                    "alias": alias,
                 },
                 "floor_price_nano": min_price,
-                "floor_price_ton": min_price / 1e9,
+                "floor_price_ton": _to_ton(min_price),
                 "floor_nft": {
                     "address": min_nft.get("address"),
                     "name": min_nft.get("name"),
                     "item_num": min_nft.get("item_num"),
                 },
-                "on_sale_count": len(items),
                 "source": "marketapp_nfts",
             }
+            if "on_sale_count" in floor_result:
+                result["on_sale_count"] = floor_result["on_sale_count"]
+            return result
 
     # Method 3: TonAPI fallback for basic info
     tonapi_result = tonapi_request(f"/nfts/collections/{api_address}")
@@ -710,9 +907,7 @@ def get_collection_floor(collection: str) -> dict:
             "collection": {
                 "address": api_address,
                 "name": metadata.get("name") or ton_data.get("name"),
-                "alias": collection.lower()
-                if collection.lower() in COLLECTION_ALIASES
-                else None,
+                "alias": alias,
             },
             "floor_price_nano": None,
             "floor_price_ton": None,
@@ -732,6 +927,12 @@ def get_collection_floor(collection: str) -> dict:
 # =============================================================================
 
 
+def _fetch_collection_detail(addr_info: dict) -> dict:
+    """Детали коллекции из TonAPI для результата /accounts/search."""
+    address = _make_url_safe(addr_info.get("address"))
+    return tonapi_request(f"/nfts/collections/{address}")
+
+
 def search_collections(query: str, limit: int = 10) -> dict:
     """
     Поиск коллекций NFT по названию через TonAPI.
@@ -748,30 +949,34 @@ def search_collections(query: str, limit: int = 10) -> dict:
     collections = []
 
     if result["success"]:
-        addresses = result["data"].get("addresses", [])
-
-        for addr_info in addresses[: limit * 2]:
-            address = addr_info.get("address")
-            name = addr_info.get("name")
-
-            coll_result = tonapi_request(f"/nfts/collections/{_make_url_safe(address)}")
-
-            if coll_result["success"]:
-                coll_data = coll_result["data"]
-                metadata = coll_data.get("metadata", {})
-
-                collections.append(
-                    {
-                        "address": address,
-                        "name": metadata.get("name") or name or "Unknown",
-                        "description": metadata.get("description"),
-                        "items_count": coll_data.get("next_item_index", 0),
-                        "verified": coll_data.get("verified", False),
-                    }
-                )
+        candidates = result["data"].get("addresses", [])[: limit * 2]
 
-                if len(collections) >= limit:
-                    break
+        # Запросы деталей коллекций независимы — выполняем параллельно;
+        # map сохраняет порядок выдачи поиска
+        details = []
+        if candidates:
+            with ThreadPoolExecutor(max_workers=min(len(candidates), 8)) as executor:
+                details = list(executor.map(_fetch_collection_detail, candidates))
+
+        for addr_info, coll_result in zip(candidates, details):
+            if not coll_result["success"]:
+                continue
+
+            coll_data = coll_result["data"]
+            metadata = coll_data.get("metadata", {})
+
+            collections.append(
+                {
+                    "address": addr_info.get("address"),
+                    "name": metadata.get("name") or addr_info.get("name") or "Unknown",
+                    "description": metadata.get("description"),
+                    "items_count": coll_data.get("next_item_index", 0),
+                    "verified": coll_data.get("verified", False),
+                }
+            )
+
+            if len(collections) >= limit:
+                break
 
     return {
         "success": True,
@@ -834,20 +1039,28 @@ def get_gifts_on_sale(
     gifts = []
     for item in items:
         min_bid = int(item.get("min_bid", 0))
-        attrs = {
-            a.get("trait_type"): a.get("value") for a in item.get("attributes", [])
-        }
+
+        # Нужны только три трейта — один проход без промежуточного dict
+        gift_model = gift_symbol = gift_backdrop = None
+        for attr in item.get("attributes", ()):
+            trait = attr.get("trait_type")
+            if trait in ("Model", "model"):
+                gift_model = gift_model or attr.get("value")
+            elif trait in ("Symbol", "symbol"):
+                gift_symbol = gift_symbol or attr.get("value")
+            elif trait in ("Backdrop", "backdrop"):
+                gift_backdrop = gift_backdrop or attr.get("value")
 
         gifts.append(
             {
                 "address": item.get("address"),
                 "name": item.get("name"),
-                "price_ton": min_bid / 1e9,
+                "price_ton": _to_ton(min_bid),
                 "owner": item.get("real_owner"),
                 "item_num": item.get("item_num"),
-                "model": attrs.get("Model") or attrs.get("model"),
-                "symbol": attrs.get("Symbol") or attrs.get("symbol"),
-                "backdrop": attrs.get("Backdrop") or attrs.get("backdrop"),
+                "model": gift_model,
+                "symbol": gift_symbol,
+                "backdrop": gift_backdrop,
                 "collection": item.get("collection_address"),
             }
         )
@@ -897,12 +1110,12 @@ def emulate_marketapp_tx(transaction: dict, wallet_address: str) -> dict:
         "success": True,
         "messages_count": len(messages),
         "total_amount_nano": total_amount,
-        "total_amount_ton": total_amount / 1e9,
+        "total_amount_ton": _to_ton(total_amount),
         "valid_until": transaction.get("validUntil"),
         "messages": [
             {
                 "to": m.get("address"),
-                "amount_ton": int(m.get("amount", 0)) / 1e9,
+                "amount_ton": _to_ton(m.get("amount")),
                 "has_payload": bool(m.get("payload")),
                 "has_state_init": bool(m.get("stateInit")),
             }
@@ -911,6 +1124,43 @@ def emulate_marketapp_tx(transaction: dict, wallet_address: str) -> dict:
     }
 
 
+def create_multi_transfer_message(wallet, orders: List[tuple], seqno: int) -> dict:
+    """
+    Подписывает external message с несколькими исходящими сообщениями.
+
+    То же, что wallet.create_transfer_message, но v3/v4 кошелёк принимает
+    до MAX_WALLET_MESSAGES пар (send_mode, message) в одном подписанном теле.
+    Для одного сообщения результат совпадает с create_transfer_message.
+
+    Args:
+        wallet: Инстанс кошелька (v3r2 / v4r2)
+        orders: Список (to_addr, amount_nano, payload Cell или None)
+        seqno: Текущий seqno
+
+    Returns:
+        dict как у create_transfer_message (message, body, ...)
+    """
+    import decimal
+
+    from tonsdk.boc import Cell
+    from tonsdk.contract import Contract
+    from tonsdk.contract.wallet import SendModeEnum
+    from tonsdk.utils import Address
+
+    send_mode = SendModeEnum.ignore_errors | SendModeEnum.pay_gas_separately
+    signing_message = wallet.create_signing_message(seqno)
+
+    for to_addr, amount, payload in orders:
+        header = Contract.create_internal_message_header(
+            Address(to_addr), decimal.Decimal(amount)
+        )
+        order = Contract.create_common_msg_info(header, None, payload or Cell())
+        signing_message.bits.write_uint8(send_mode)
+        signing_message.refs.append(order)
+
+    return wallet.create_external_message(signing_message, seqno)
+
+
 def build_and_send_marketapp_tx(
     transaction: dict, wallet, wallet_address: str, seqno: int
 ) -> dict:
@@ -933,36 +1183,36 @@ def build_and_send_marketapp_tx(
     if not messages:
         return {"success": False, "error": "No messages in transaction"}
 
-    # Для мультисообщений нужен v4 кошелёк
-    # Пока поддерживаем только одно сообщение
-    if len(messages) > 1:
+    if len(messages) > MAX_WALLET_MESSAGES:
         return {
             "success": False,
-            "error": "Multiple messages not yet supported. Use TonConnect wallet.",
+            "error": f"Transaction has {len(messages)} messages, "
+            f"wallet supports at most {MAX_WALLET_MESSAGES}",
         }
 
-    msg = messages[0]
-    to_addr = msg.get("address")
-    amount = int(msg.get("amount", 0))
-    payload_b64 = msg.get("payload")
-    # state_init_b64 = msg.get("stateInit")
+    orders = []
+    for msg in messages:
+        to_addr = msg.get("address")
+        amount = int(msg.get("amount", 0))
+        payload_b64 = msg.get("payload")
+        # state_init_b64 = msg.get("stateInit")
 
-    if not to_addr:
-        return {"success": False, "error": "Transaction message has no address"}
+        if not to_addr:
+            return {"success": False, "error": "Transaction message has no address"}
 
-    # Декодируем payload из API (Cell в base64)
-    payload = None
-    if payload_b64:
-        try:
-            payload_bytes = base64.b64decode(payload_b64)
-            payload = Cell.one_from_boc(payload_bytes)
-        except Exception as e:
-            return {"success": False, "error": f"Failed to decode payload: {e}"}
+        # Декодируем payload из API (Cell в base64)
+        payload = None
+        if payload_b64:
+            try:
+                payload_bytes = base64.b64decode(payload_b64)
+                payload = Cell.one_from_boc(payload_bytes)
+            except Exception as e:
+                return {"success": False, "error": f"Failed to decode payload: {e}"}
+
+        orders.append((to_addr, amount, payload))
 
     # Строим транзакцию
-    query = wallet.create_transfer_message(
-        to_addr=to_addr, amount=amount, payload=payload, seqno=seqno
-    )
+    query = create_multi_transfer_message(wallet, orders, seqno)
 
     boc = query["message"].to_boc(False)
     boc_b64 = base64.b64encode(boc).decode("ascii")
@@ -981,6 +1231,104 @@ def build_and_send_marketapp_tx(
     return {"success": True, "message": "Transaction sent successfully"}
 
 
+def _marketapp_trade_batch(
+    endpoint: str, owner_address: Optional[str], items: List[dict]
+) -> dict:
+    """
+    Запрашивает у Marketapp одну транзакцию сразу на несколько NFT.
+
+    Args:
+        endpoint: Эндпоинт Marketapp (/nfts/buy/, /nfts/sale/, /nfts/change_price/)
+        owner_address: Адрес владельца (None для покупки)
+        items: Список {"nft_address": ..., "price": ...}
+
+    Returns:
+        dict с transaction (TonTransactionSchema) или ошибкой
+    """
+    json_data = {"data": items}
+    if owner_address:
+        json_data["owner_address"] = owner_address
+
+    result = marketapp_request(endpoint, method="POST", json_data=json_data)
+    if not result["success"]:
+        return result
+
+    transaction = result["data"].get("transaction", {})
+
+    # Отказываем до эмуляции, если кошелёк не сможет подписать транзакцию
+    messages_count = len(transaction.get("messages", []))
+    if messages_count > MAX_WALLET_MESSAGES:
+        return {
+            "success": False,
+            "error": f"Transaction has {messages_count} messages, "
+            f"wallet supports at most {MAX_WALLET_MESSAGES}. Use smaller batches.",
+        }
+
+    return {"success": True, "transaction": transaction}
+
+
+def _send_marketapp_result(
+    result: dict,
+    transaction: dict,
+    wallet_data: dict,
+    wallet_address: str,
+    message: str,
+    nft_addresses: List[str],
+) -> dict:
+    """
+    Подписывает и отправляет транзакцию Marketapp, дополняя result.
+
+    После успешной отправки сбрасывает кэш get_nft_info для nft_addresses.
+    """
+    # seqno (сеть) и вывод ключей из мнемоники (PBKDF2) независимы —
+    # запрашиваем seqno параллельно
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        seqno_future = executor.submit(get_seqno, wallet_address)
+        wallet = create_wallet_instance(wallet_data)
+        seqno = seqno_future.result()
+
+    send_result = build_and_send_marketapp_tx(
+        transaction=transaction,
+        wallet=wallet,
+        wallet_address=wallet_address,
+        seqno=seqno,
+    )
+
+    result["sent"] = send_result["success"]
+    if send_result["success"]:
+        for nft_address in nft_addresses:
+            invalidate_nft_info(nft_address)
+        result["success"] = True
+        result["message"] = message
+    else:
+        result["success"] = False
+        result["error"] = send_result.get("error")
+
+    return result
+
+
+def _to_friendly_or_raw(address: str) -> str:
+    """Friendly форма адреса, либо исходная строка если нормализация не удалась."""
+    try:
+        return normalize_address(address, "friendly")
+    except Exception:
+        return address
+
+
+def _address_forms(address: str) -> Tuple[str, str]:
+    """(raw, friendly) формы адреса, либо исходная строка если разбор не удался."""
+    try:
+        return normalize_address_both(address)
+    except Exception:
+        return address, address
+
+
+def _get_nft_infos(nft_addresses: List[str]) -> List[dict]:
+    """Загружает информацию о нескольких NFT параллельно, сохраняя порядок."""
+    with ThreadPoolExecutor(max_workers=min(len(nft_addresses), 8)) as executor:
+        return list(executor.map(_get_nft_info_cached, nft_addresses))
+
+
 def buy_nft(
     nft_address: str, wallet_identifier: str, password: str, confirm: bool = False
 ) -> dict:
@@ -1000,7 +1348,7 @@ def buy_nft(
         return {"success": False, "error": "tonsdk not installed"}
 
     # Получаем инфо об NFT
-    nft_info = get_nft_info(nft_address)
+    nft_info = _get_nft_info_cached(nft_address)
     if not nft_info["success"]:
         return nft_info
 
@@ -1021,10 +1369,8 @@ def buy_nft(
         nft_addr_friendly = nft_address
 
     # Запрос к Marketapp для получения транзакции
-    buy_result = marketapp_request(
-        "/nfts/buy/",
-        method="POST",
-        json_data={"data": [{"nft_address": nft_addr_friendly, "price": price_ton}]},
+    buy_result = _marketapp_trade_batch(
+        "/nfts/buy/", None, [{"nft_address": nft_addr_friendly, "price": price_ton}]
     )
 
     if not buy_result["success"]:
@@ -1033,7 +1379,7 @@ def buy_nft(
             "error": buy_result.get("error", "Failed to create buy transaction"),
         }
 
-    transaction = buy_result["data"].get("transaction", {})
+    transaction = buy_result["transaction"]
 
     # Эмуляция
     emulation = emulate_marketapp_tx(transaction, buyer_address)
@@ -1053,28 +1399,109 @@ def buy_nft(
     }
 
     if confirm:
-        wallet = create_wallet_instance(wallet_data)
-        seqno = get_seqno(buyer_address)
-
-        send_result = build_and_send_marketapp_tx(
-            transaction=transaction,
-            wallet=wallet,
-            wallet_address=buyer_address,
-            seqno=seqno,
+        return _send_marketapp_result(
+            result,
+            transaction,
+            wallet_data,
+            buyer_address,
+            "Buy transaction sent successfully",
+            [nft_address],
         )
 
-        result["sent"] = send_result["success"]
-        if send_result["success"]:
-            result["success"] = True
-            result["message"] = "Buy transaction sent successfully"
-        else:
-            result["success"] = False
-            result["error"] = send_result.get("error")
-    else:
-        result["success"] = True
-        result["confirmed"] = False
-        result["message"] = "Emulation successful. Use --confirm to buy."
+    result["success"] = True
+    result["confirmed"] = False
+    result["message"] = "Emulation successful. Use --confirm to buy."
+    return result
+
+
+def buy_nfts(
+    nft_addresses: List[str],
+    wallet_identifier: str,
+    password: str,
+    confirm: bool = False,
+) -> dict:
+    """
+    Покупает несколько NFT одной транзакцией Marketapp.
+
+    Args:
+        nft_addresses: Адреса NFT (не больше MAX_WALLET_MESSAGES)
+        wallet_identifier: Кошелёк покупателя
+        password: Пароль
+        confirm: Подтвердить и отправить
+
+    Returns:
+        dict с результатом (эмуляция по каждому сообщению транзакции)
+    """
+    if not TONSDK_AVAILABLE:
+        return {"success": False, "error": "tonsdk not installed"}
+
+    if not nft_addresses:
+        return {"success": False, "error": "No NFT addresses given"}
+
+    if len(nft_addresses) > MAX_WALLET_MESSAGES:
+        return {
+            "success": False,
+            "error": f"At most {MAX_WALLET_MESSAGES} NFTs per batch",
+        }
+
+    nft_infos = _get_nft_infos(nft_addresses)
+    for nft_address, nft_info in zip(nft_addresses, nft_infos):
+        if not nft_info["success"]:
+            return nft_info
+        if not nft_info.get("sale"):
+            return {"success": False, "error": f"NFT is not for sale: {nft_address}"}
+
+    wallet_data = get_wallet_from_storage(wallet_identifier, password)
+    if not wallet_data:
+        return {"success": False, "error": f"Wallet not found: {wallet_identifier}"}
+
+    buyer_address = wallet_data["address"]
+    items = [
+        {
+            "nft_address": _to_friendly_or_raw(nft_address),
+            "price": nft_info["sale"]["price_ton"],
+        }
+        for nft_address, nft_info in zip(nft_addresses, nft_infos)
+    ]
+
+    buy_result = _marketapp_trade_batch("/nfts/buy/", None, items)
+    if not buy_result["success"]:
+        return {
+            "success": False,
+            "error": buy_result.get("error", "Failed to create buy transaction"),
+        }
+
+    transaction = buy_result["transaction"]
+    emulation = emulate_marketapp_tx(transaction, buyer_address)
+
+    result = {
+        "action": "buy_nfts",
+        "nfts": [
+            {
+                "address": item["nft_address"],
+                "name": nft_info.get("name"),
+                "price_ton": item["price"],
+            }
+            for item, nft_info in zip(items, nft_infos)
+        ],
+        "total_price_ton": sum(item["price"] for item in items),
+        "buyer": buyer_address,
+        "emulation": emulation,
+    }
 
+    if confirm:
+        return _send_marketapp_result(
+            result,
+            transaction,
+            wallet_data,
+            buyer_address,
+            "Buy transaction sent successfully",
+            nft_addresses,
+        )
+
+    result["success"] = True
+    result["confirmed"] = False
+    result["message"] = "Emulation successful. Use --confirm to buy."
     return result
 
 
@@ -1109,42 +1536,28 @@ def sell_nft(
     owner_address = wallet_data["address"]
 
     # Проверяем владение
-    nft_info = get_nft_info(nft_address)
+    nft_info = _get_nft_info_cached(nft_address)
     if not nft_info["success"]:
         return nft_info
 
-    try:
-        owner_raw = normalize_address(owner_address, "raw")
-        nft_owner_raw = (
-            normalize_address(nft_info.get("owner", ""), "raw")
-            if nft_info.get("owner")
-            else None
-        )
-    except Exception:
-        owner_raw = owner_address
-        nft_owner_raw = nft_info.get("owner")
+    # Обе формы адреса владельца нужны ниже — конвертируем один раз
+    owner_raw, owner_addr_friendly = _address_forms(owner_address)
+    nft_owner = nft_info.get("owner")
+    nft_owner_raw = _address_forms(nft_owner)[0] if nft_owner else None
 
     if owner_raw != nft_owner_raw:
         return {
             "success": False,
-            "error": f"NFT is not owned by this wallet. Owner: {nft_info.get('owner')}",
+            "error": f"NFT is not owned by this wallet. Owner: {nft_owner}",
         }
 
-    try:
-        nft_addr_friendly = normalize_address(nft_address, "friendly")
-        owner_addr_friendly = normalize_address(owner_address, "friendly")
-    except Exception:
-        nft_addr_friendly = nft_address
-        owner_addr_friendly = owner_address
+    nft_addr_friendly = _to_friendly_or_raw(nft_address)
 
     # Запрос к Marketapp
-    sale_result = marketapp_request(
+    sale_result = _marketapp_trade_batch(
         "/nfts/sale/",
-        method="POST",
-        json_data={
-            "owner_address": owner_addr_friendly,
-            "data": [{"nft_address": nft_addr_friendly, "price": price_ton}],
-        },
+        owner_addr_friendly,
+        [{"nft_address": nft_addr_friendly, "price": price_ton}],
     )
 
     if not sale_result["success"]:
@@ -1153,7 +1566,7 @@ def sell_nft(
             "error": sale_result.get("error", "Failed to create sale transaction"),
         }
 
-    transaction = sale_result["data"].get("transaction", {})
+    transaction = sale_result["transaction"]
     emulation = emulate_marketapp_tx(transaction, owner_address)
 
     result = {
@@ -1171,28 +1584,118 @@ def sell_nft(
     }
 
     if confirm:
-        wallet = create_wallet_instance(wallet_data)
-        seqno = get_seqno(owner_address)
-
-        send_result = build_and_send_marketapp_tx(
-            transaction=transaction,
-            wallet=wallet,
-            wallet_address=owner_address,
-            seqno=seqno,
+        return _send_marketapp_result(
+            result,
+            transaction,
+            wallet_data,
+            owner_address,
+            "Sale transaction sent successfully",
+            [nft_address],
         )
 
-        result["sent"] = send_result["success"]
-        if send_result["success"]:
-            result["success"] = True
-            result["message"] = "Sale transaction sent successfully"
-        else:
-            result["success"] = False
-            result["error"] = send_result.get("error")
-    else:
-        result["success"] = True
-        result["confirmed"] = False
-        result["message"] = "Emulation successful. Use --confirm to list for sale."
+    result["success"] = True
+    result["confirmed"] = False
+    result["message"] = "Emulation successful. Use --confirm to list for sale."
+    return result
+
+
+def sell_nfts(
+    items: List[dict],
+    wallet_identifier: str,
+    password: str,
+    confirm: bool = False,
+) -> dict:
+    """
+    Выставляет несколько NFT на продажу одной транзакцией Marketapp.
+
+    Args:
+        items: Список {"nft_address": ..., "price": <TON>}
+            (не больше MAX_WALLET_MESSAGES)
+        wallet_identifier: Кошелёк владельца
+        password: Пароль
+        confirm: Подтвердить и отправить
+
+    Returns:
+        dict с результатом (эмуляция по каждому сообщению транзакции)
+    """
+    if not TONSDK_AVAILABLE:
+        return {"success": False, "error": "tonsdk not installed"}
+
+    if not items:
+        return {"success": False, "error": "No NFT addresses given"}
+
+    if len(items) > MAX_WALLET_MESSAGES:
+        return {
+            "success": False,
+            "error": f"At most {MAX_WALLET_MESSAGES} NFTs per batch",
+        }
+
+    wallet_data = get_wallet_from_storage(wallet_identifier, password)
+    if not wallet_data:
+        return {"success": False, "error": f"Wallet not found: {wallet_identifier}"}
+
+    owner_address = wallet_data["address"]
+    owner_raw, owner_addr_friendly = _address_forms(owner_address)
+
+    # Проверяем владение всеми NFT
+    nft_infos = _get_nft_infos([item["nft_address"] for item in items])
+    for nft_info in nft_infos:
+        if not nft_info["success"]:
+            return nft_info
+        nft_owner = nft_info.get("owner")
+        if not nft_owner or _address_forms(nft_owner)[0] != owner_raw:
+            return {
+                "success": False,
+                "error": f"NFT is not owned by this wallet. Owner: {nft_owner}",
+            }
+
+    trade_items = [
+        {
+            "nft_address": _to_friendly_or_raw(item["nft_address"]),
+            "price": item["price"],
+        }
+        for item in items
+    ]
+
+    sale_result = _marketapp_trade_batch(
+        "/nfts/sale/", owner_addr_friendly, trade_items
+    )
+    if not sale_result["success"]:
+        return {
+            "success": False,
+            "error": sale_result.get("error", "Failed to create sale transaction"),
+        }
+
+    transaction = sale_result["transaction"]
+    emulation = emulate_marketapp_tx(transaction, owner_address)
+
+    result = {
+        "action": "sell_nfts",
+        "nfts": [
+            {
+                "address": item["nft_address"],
+                "name": nft_info.get("name"),
+                "price_ton": item["price"],
+            }
+            for item, nft_info in zip(trade_items, nft_infos)
+        ],
+        "seller": owner_addr_friendly,
+        "emulation": emulation,
+    }
+
+    if confirm:
+        return _send_marketapp_result(
+            result,
+            transaction,
+            wallet_data,
+            owner_address,
+            "Sale transaction sent successfully",
+            [item["nft_address"] for item in items],
+        )
 
+    result["success"] = True
+    result["confirmed"] = False
+    result["message"] = "Emulation successful. Use --confirm to list for sale."
     return result
 
 
@@ -1220,7 +1723,7 @@ def cancel_sale(
 
     owner_address = wallet_data["address"]
 
-    nft_info = get_nft_info(nft_address)
+    nft_info = _get_nft_info_cached(nft_address)
     if not nft_info["success"]:
         return nft_info
 
@@ -1263,28 +1766,18 @@ def cancel_sale(
     }
 
     if confirm:
-        wallet = create_wallet_instance(wallet_data)
-        seqno = get_seqno(owner_address)
-
-        send_result = build_and_send_marketapp_tx(
-            transaction=transaction,
-            wallet=wallet,
-            wallet_address=owner_address,
-            seqno=seqno,
+        return _send_marketapp_result(
+            result,
+            transaction,
+            wallet_data,
+            owner_address,
+            "Cancel sale transaction sent",
+            [nft_address],
         )
 
-        result["sent"] = send_result["success"]
-        if send_result["success"]:
-            result["success"] = True
-            result["message"] = "Cancel sale transaction sent"
-        else:
-            result["success"] = False
-            result["error"] = send_result.get("error")
-    else:
-        result["success"] = True
-        result["confirmed"] = False
-        result["message"] = "Emulation successful. Use --confirm to cancel sale."
-
+    result["success"] = True
+    result["confirmed"] = False
+    result["message"] = "Emulation successful. Use --confirm to cancel sale."
     return result
 
 
@@ -1317,7 +1810,7 @@ def change_price(
 
     owner_address = wallet_data["address"]
 
-    nft_info = get_nft_info(nft_address)
+    nft_info = _get_nft_info_cached(nft_address)
     if not nft_info["success"]:
         return nft_info
 
@@ -1333,13 +1826,10 @@ def change_price(
         nft_addr_friendly = nft_address
         owner_addr_friendly = owner_address
 
-    change_result = marketapp_request(
+    change_result = _marketapp_trade_batch(
         "/nfts/change_price/",
-        method="POST",
-        json_data={
-            "owner_address": owner_addr_friendly,
-            "data": [{"nft_address": nft_addr_friendly, "price": new_price_ton}],
-        },
+        owner_addr_friendly,
+        [{"nft_address": nft_addr_friendly, "price": new_price_ton}],
     )
 
     if not change_result["success"]:
@@ -1350,7 +1840,7 @@ def change_price(
             ),
         }
 
-    transaction = change_result["data"].get("transaction", {})
+    transaction = change_result["transaction"]
     emulation = emulate_marketapp_tx(transaction, owner_address)
 
     result = {
@@ -1366,28 +1856,119 @@ def change_price(
     }
 
     if confirm:
-        wallet = create_wallet_instance(wallet_data)
-        seqno = get_seqno(owner_address)
-
-        send_result = build_and_send_marketapp_tx(
-            transaction=transaction,
-            wallet=wallet,
-            wallet_address=owner_address,
-            seqno=seqno,
+        return _send_marketapp_result(
+            result,
+            transaction,
+            wallet_data,
+            owner_address,
+            "Price change transaction sent",
+            [nft_address],
         )
 
-        result["sent"] = send_result["success"]
-        if send_result["success"]:
-            result["success"] = True
-            result["message"] = "Price change transaction sent"
-        else:
-            result["success"] = False
-            result["error"] = send_result.get("error")
-    else:
-        result["success"] = True
-        result["confirmed"] = False
-        result["message"] = "Emulation successful. Use --confirm to change price."
+    result["success"] = True
+    result["confirmed"] = False
+    result["message"] = "Emulation successful. Use --confirm to change price."
+    return result
+
+
+def change_prices(
+    items: List[dict],
+    wallet_identifier: str,
+    password: str,
+    confirm: bool = False,
+) -> dict:
+    """
+    Меняет цены нескольких NFT одной транзакцией Marketapp.
+
+    Args:
+        items: Список {"nft_address": ..., "price": <новая цена в TON>}
+            (не больше MAX_WALLET_MESSAGES)
+        wallet_identifier: Кошелёк владельца
+        password: Пароль
+        confirm: Подтвердить и отправить
+
+    Returns:
+        dict с результатом (эмуляция по каждому сообщению транзакции)
+    """
+    if not TONSDK_AVAILABLE:
+        return {"success": False, "error": "tonsdk not installed"}
+
+    if not items:
+        return {"success": False, "error": "No NFT addresses given"}
+
+    if len(items) > MAX_WALLET_MESSAGES:
+        return {
+            "success": False,
+            "error": f"At most {MAX_WALLET_MESSAGES} NFTs per batch",
+        }
+
+    wallet_data = get_wallet_from_storage(wallet_identifier, password)
+    if not wallet_data:
+        return {"success": False, "error": f"Wallet not found: {wallet_identifier}"}
+
+    owner_address = wallet_data["address"]
+
+    nft_infos = _get_nft_infos([item["nft_address"] for item in items])
+    for item, nft_info in zip(items, nft_infos):
+        if not nft_info["success"]:
+            return nft_info
+        if nft_info.get("status") != "for_sale" and not nft_info.get("sale"):
+            return {
+                "success": False,
+                "error": f"NFT is not currently for sale: {item['nft_address']}",
+            }
 
+    owner_addr_friendly = _to_friendly_or_raw(owner_address)
+    trade_items = [
+        {
+            "nft_address": _to_friendly_or_raw(item["nft_address"]),
+            "price": item["price"],
+        }
+        for item in items
+    ]
+
+    change_result = _marketapp_trade_batch(
+        "/nfts/change_price/", owner_addr_friendly, trade_items
+    )
+    if not change_result["success"]:
+        return {
+            "success": False,
+            "error": change_result.get(
+                "error", "Failed to create change price transaction"
+            ),
+        }
+
+    transaction = change_result["transaction"]
+    emulation = emulate_marketapp_tx(transaction, owner_address)
+
+    result = {
+        "action": "change_prices",
+        "nfts": [
+            {
+                "address": item["nft_address"],
+                "name": nft_info.get("name"),
+                "old_price_ton": nft_info.get("sale", {}).get("price_ton"),
+                "new_price_ton": item["price"],
+            }
+            for item, nft_info in zip(trade_items, nft_infos)
+        ],
+        "seller": owner_addr_friendly,
+        "emulation": emulation,
+    }
+
+    if confirm:
+        return _send_marketapp_result(
+            result,
+            transaction,
+            wallet_data,
+            owner_address,
+            "Price change transaction sent",
+            [item["nft_address"] for item in items],
+        )
+
+    result["success"] = True
+    result["confirmed"] = False
+    result["message"] = "Emulation successful. Use --confirm to change price."
     return result
 
 
@@ -1408,7 +1989,7 @@ def build_nft_transfer(
     Строит транзакцию трансфера NFT (TEP-62).
     """
     from tonsdk.boc import Cell
-    from tonsdk.utils import Address
+    from tonsdk.utils import Address, to_nano
 
     payload = Cell()
     payload.bits.write_uint(NFT_TRANSFER_OPCODE, 32)
@@ -1456,7 +2037,7 @@ def emulate_transfer(boc_b64: str, wallet_address: str) -> dict:
     return {
         "success": True,
         "fee_nano": fee,
-        "fee_ton": fee / 1e9,
+        "fee_ton": _to_ton(fee),
         "nft_transfer": nft_transfer,
         "actions_count": len(actions),
         "risk": event.get("risk", {}),
@@ -1748,14 +2329,17 @@ Examples:
 
     if needs_password and not password:
         if sys.stdin.isatty():
+            import getpass
+
             password = getpass.getpass("Wallet password: ")
         else:
             if args.command != "list":
                 print(
-                    json.dumps(
+                    json_dumps(
                         {
                             "error": "Password required. Use --password or WALLET_PASSWORD env"
-                        }
+                        },
+                        indent=False,
                     )
                 )
                 return sys.exit(1)
@@ -1793,18 +2377,17 @@ Examples:
         elif args.command == "buy":
             if not TONSDK_AVAILABLE:
                 print(
-                    json.dumps(
+                    json_dumps(
                         {
                             "error": "Missing dependency: tonsdk",
                             "install": "pip install tonsdk",
                         },
-                        indent=2,
                     )
                 )
                 return sys.exit(1)
 
             if not password:
-                print(json.dumps({"error": "Password required for buy"}))
+                print(json_dumps({"error": "Password required for buy"}, indent=False))
                 return sys.exit(1)
 
             result = buy_nft(
@@ -1817,18 +2400,17 @@ Examples:
         elif args.command == "sell":
             if not TONSDK_AVAILABLE:
                 print(
-                    json.dumps(
+                    json_dumps(
                         {
                             "error": "Missing dependency: tonsdk",
                             "install": "pip install tonsdk",
                         },
-                        indent=2,
                     )
                 )
                 return sys.exit(1)
 
             if not password:
-                print(json.dumps({"error": "Password required for sell"}))
+                print(json_dumps({"error": "Password required for sell"}, indent=False))
                 return sys.exit(1)
 
             result = sell_nft(
@@ -1842,18 +2424,21 @@ Examples:
         elif args.command == "cancel-sale":
             if not TONSDK_AVAILABLE:
                 print(
-                    json.dumps(
+                    json_dumps(
                         {
                             "error": "Missing dependency: tonsdk",
                             "install": "pip install tonsdk",
                         },
-                        indent=2,
                     )
                 )
                 return sys.exit(1)
 
             if not password:
-                print(json.dumps({"error": "Password required for cancel-sale"}))
+                print(
+                    json_dumps(
+                        {"error": "Password required for cancel-sale"}, indent=False
+                    )
+                )
                 return sys.exit(1)
 
             result = cancel_sale(
@@ -1866,18 +2451,21 @@ Examples:
         elif args.command == "change-price":
             if not TONSDK_AVAILABLE:
                 print(
-                    json.dumps(
+                    json_dumps(
                         {
                             "error": "Missing dependency: tonsdk",
                             "install": "pip install tonsdk",
                         },
-                        indent=2,
                     )
                 )
                 return sys.exit(1)
 
             if not password:
-                print(json.dumps({"error": "Password required for change-price"}))
+                print(
+                    json_dumps(
+                        {"error": "Password required for change-price"}, indent=False
+                    )
+                )
                 return sys.exit(1)
 
             result = change_price(
@@ -1891,18 +2479,21 @@ Examples:
         elif args.command == "transfer":
             if not TONSDK_AVAILABLE:
                 print(
-                    json.dumps(
+                    json_dumps(
                         {
                             "error": "Missing dependency: tonsdk",
                             "install": "pip install tonsdk",
                         },
-                        indent=2,
                     )
                 )
                 return sys.exit(1)
 
             if not password:
-                print(json.dumps({"error": "Password required for transfer"}))
+                print(
+                    json_dumps(
+                        {"error": "Password required for transfer"}, indent=False
+                    )
+                )
                 return sys.exit(1)
 
             result = transfer_nft(
@@ -1916,16 +2507,16 @@ Examples:
         else:
             result = {"error": f"Unknown command: {args.command}"}
 
-        print(json.dumps(result, indent=2, ensure_ascii=False))
+        print(json_dumps(result))
 
         if not result.get("success", False):
             return sys.exit(1)
 
     except ValueError as e:
-        print(json.dumps({"error": str(e)}, indent=2))
+        print(json_dumps({"error": str(e)}))
         return sys.exit(1)
     except Exception as e:
-        print(json.dumps({"error": f"Unexpected error: {e}"}, indent=2))
+        print(json_dumps({"error": f"Unexpected error: {e}"}))
         return sys.exit(1)
 
 
@@ -24,10 +24,11 @@ from datetime import datetime, timezone
 script_dir = Path(__file__).parent
 sys.path.insert(0, str(script_dir))
 
-from utils import tokens_api_request  # noqa: E402
+from utils import tokens_api_request, ttl_cache  # noqa: E402
 from common import (  # noqa: E402
     format_price,
     format_large_number,
+    resolve_token_symbol,
 )
 
 
@@ -498,6 +499,7 @@ def resolve_token_by_symbol(symbol: str) -> Optional[dict]:
     return jettons[0] if jettons else None
 
 
+@ttl_cache("short", key_func=resolve_token_symbol)
 def get_token_market_data(address: str) -> dict:
     """
     Get token market data for analytics.
@@ -11,11 +11,17 @@ OpenClaw TON Skill — Общие утилиты
 import os
 import sys
 import json
+import copy
 import base64
+import time
+import atexit
 import hashlib
 import argparse
+import threading
+from collections import OrderedDict
+from functools import lru_cache, wraps
 from pathlib import Path
-from typing import Any, Optional, Union
+from typing import Any, Callable, Optional, Tuple, Union
 
 # Зависимости
 try:
@@ -47,6 +53,15 @@ except ImportError:
     sys.exit(1)
     raise SystemExit
 
+# Локальный импорт (common — только stdlib)
+script_dir = Path(__file__).parent
+sys.path.insert(0, str(script_dir))
+
+from common import ORJSON_AVAILABLE, json_loads  # noqa: E402
+
+if ORJSON_AVAILABLE:
+    import orjson
+
 
 # =============================================================================
 # Константы
@@ -154,24 +169,46 @@ def ensure_skill_dir() -> Path:
     return SKILL_DIR
 
 
+# Последний прочитанный конфиг: ((путь, st_mtime_ns), config с дефолтами)
+_CONFIG_CACHE: Optional[tuple] = None
+
+
 def load_config() -> dict:
-    """Загружает конфигурацию из файла."""
+    """
+    Загружает конфигурацию из файла.
+
+    Разобранный конфиг кэшируется до изменения mtime файла; вызывающий
+    получает глубокую копию и может её менять.
+    """
+    global _CONFIG_CACHE
+
     ensure_skill_dir()
-    if CONFIG_FILE.exists():
-        try:
-            with open(CONFIG_FILE, "r") as f:
-                config = json.load(f)
-            # Merge с дефолтами (для новых полей)
-            merged = DEFAULT_CONFIG.copy()
-            merged.update(config)
-            return merged
-        except Exception:
-            return DEFAULT_CONFIG.copy()
-    return DEFAULT_CONFIG.copy()
+    try:
+        key = (CONFIG_FILE, CONFIG_FILE.stat().st_mtime_ns)
+    except OSError:
+        return copy.deepcopy(DEFAULT_CONFIG)
+
+    cached = _CONFIG_CACHE
+    if cached is not None and cached[0] == key:
+        return copy.deepcopy(cached[1])
+
+    try:
+        with open(CONFIG_FILE, "rb") as f:
+            config = json_loads(f.read())
+        # Merge с дефолтами (для новых полей)
+        merged = DEFAULT_CONFIG.copy()
+        merged.update(config)
+    except Exception:
+        return copy.deepcopy(DEFAULT_CONFIG)
+
+    _CONFIG_CACHE = (key, merged)
+    return copy.deepcopy(merged)
 
 
 def save_config(config: dict) -> bool:
     """Сохраняет конфигурацию в файл."""
+    global _CONFIG_CACHE
+
     ensure_skill_dir()
     try:
         with open(CONFIG_FILE, "w") as f:
@@ -179,6 +216,9 @@ def save_config(config: dict) -> bool:
         return True
     except Exception:
         return False
+    finally:
+        # mtime может не измениться в пределах разрешения ФС
+        _CONFIG_CACHE = None
 
 
 def get_config_value(key: str, default: Any = None) -> Any:
@@ -227,6 +267,7 @@ def _crc16(data: bytes) -> int:
     return crc
 
 
+@lru_cache(maxsize=1024)
 def raw_to_friendly(
     raw_address: str, bounceable: bool = True, testnet: bool = False
 ) -> str:
@@ -283,6 +324,7 @@ def raw_to_friendly(
         raise ValueError(f"Failed to convert raw address: {e}")
 
 
+@lru_cache(maxsize=1024)
 def friendly_to_raw(friendly_address: str) -> str:
     """
     Конвертирует user-friendly адрес в raw формат (0:abc123...).
@@ -326,6 +368,7 @@ def friendly_to_raw(friendly_address: str) -> str:
         raise ValueError(f"Failed to convert friendly address: {e}")
 
 
+@lru_cache(maxsize=256)
 def is_valid_address(address: str) -> bool:
     """Проверяет валидность TON адреса (raw или friendly)."""
     try:
@@ -370,6 +413,34 @@ def normalize_address(address: str, to_format: str = "friendly") -> str:
             return address
 
 
+def normalize_address_both(address: str) -> Tuple[str, str]:
+    """
+    Возвращает обе формы адреса за одну конвертацию.
+
+    Args:
+        address: Любой валидный TON адрес
+
+    Returns:
+        (raw, friendly)
+    """
+    if ":" in address:
+        return address, raw_to_friendly(address)
+    return friendly_to_raw(address), address
+
+
+# =============================================================================
+# JSON (orjson если установлен)
+# =============================================================================
+
+
+def _parse_json_response(response: requests.Response) -> Any:
+    """Парсит тело ответа как JSON (orjson напрямую из bytes, если доступен)."""
+    content = response.content
+    if ORJSON_AVAILABLE and isinstance(content, bytes):
+        return orjson.loads(content)
+    return response.json()
+
+
 # =============================================================================
 # HTTP клиент с retry
 # =============================================================================
@@ -380,6 +451,8 @@ def create_http_session(
     backoff_factor: float = 0.5,
     status_forcelist: tuple = (500, 502, 503, 504),
     timeout: int = 30,
+    pool_size: int = 10,
+    pool_hosts: int = 10,
 ) -> requests.Session:
     """
     Создаёт HTTP сессию с автоматическими retry.
@@ -389,6 +462,8 @@ def create_http_session(
         backoff_factor: Фактор задержки между попытками
         status_forcelist: HTTP коды для retry
         timeout: Таймаут по умолчанию
+        pool_size: Размер пула соединений на хост
+        pool_hosts: Сколько пулов (хостов) держать открытыми
 
     Returns:
         Настроенная requests.Session
@@ -402,7 +477,11 @@ def create_http_session(
         allowed_methods=["HEAD", "GET", "POST", "PUT", "DELETE", "OPTIONS", "TRACE"],
     )
 
-    adapter = HTTPAdapter(max_retries=retry_strategy)
+    adapter = HTTPAdapter(
+        max_retries=retry_strategy,
+        pool_connections=pool_hosts,
+        pool_maxsize=pool_size,
+    )
     session.mount("https://", adapter)
     session.mount("http://", adapter)
 
@@ -414,6 +493,45 @@ def create_http_session(
     return session
 
 
+# Общие сессии (keep-alive + пул соединений), по одной на число retry.
+# Размер пула покрывает параллельные запросы compare (до 16 потоков + /rates).
+HTTP_POOL_SIZE = 32
+
+# Для общих сессий повторяем и 429 (Retry учитывает заголовок Retry-After)
+HTTP_RETRY_STATUSES = (429, 500, 502, 503, 504)
+_shared_sessions: dict = {}
+_shared_sessions_lock = threading.Lock()
+
+
+def get_shared_session(retries: int = 3) -> requests.Session:
+    """
+    Возвращает общую для процесса HTTP сессию с заданным числом retry.
+
+    Повторные запросы к одному хосту переиспользуют TCP/TLS соединения
+    вместо нового handshake на каждый вызов.
+    """
+    with _shared_sessions_lock:
+        session = _shared_sessions.get(retries)
+        if session is None:
+            session = create_http_session(
+                retries=retries,
+                backoff_factor=0.3,
+                status_forcelist=HTTP_RETRY_STATUSES,
+                pool_size=HTTP_POOL_SIZE,
+            )
+            _shared_sessions[retries] = session
+        return session
+
+
+@atexit.register
+def _close_shared_sessions() -> None:
+    """Закрывает общие сессии при выходе из процесса."""
+    with _shared_sessions_lock:
+        for session in _shared_sessions.values():
+            session.close()
+        _shared_sessions.clear()
+
+
 def api_request(
     url: str,
     method: str = "GET",
@@ -444,7 +562,7 @@ def api_request(
     Returns:
         dict с ключами: success, data/error, status_code
     """
-    session = create_http_session(retries=retries, timeout=timeout)
+    session = get_shared_session(retries)
 
     req_headers = {"Accept": "application/json"}
     if headers:
@@ -464,7 +582,7 @@ def api_request(
 
         # Пытаемся распарсить JSON
         try:
-            data = response.json()
+            data = _parse_json_response(response)
         except Exception:
             data = response.text
 
@@ -485,6 +603,109 @@ def api_request(
         return {"success": False, "error": str(e), "status_code": None}
 
 
+# =============================================================================
+# In-process TTL кэш ответов API
+# =============================================================================
+
+# TTL (секунды) для политик кэширования
+CACHE_POLICIES = {
+    "short": 10,  # цены / рыночные данные
+    "normal": 60,  # пулы, история
+    "long": 600,  # метаданные, trust score
+}
+
+
+def ttl_cache(
+    policy: str = "normal",
+    maxsize: int = 256,
+    key_func: Optional[Callable[[Any], Any]] = None,
+    stale_on_error: bool = True,
+) -> Callable:
+    """
+    Декоратор: кэширует успешные ответы API-хелперов в памяти процесса.
+
+    Кэшируются только ответы с success=True. Если свежий запрос вернул
+    ошибку или бросил исключение, а в кэше есть устаревшая запись —
+    возвращается она (stale-while-error).
+
+    Args:
+        policy: Политика TTL из CACHE_POLICIES ("short", "normal", "long")
+        maxsize: Максимум записей (старые вытесняются первыми)
+        key_func: Нормализация первого позиционного аргумента для ключа
+            (например, символ токена → адрес, чтобы "USDT" и его адрес
+            делили одну запись)
+        stale_on_error: Отдавать устаревшую запись при ошибке обновления.
+            False — для данных, по которым принимаются решения (торговля):
+            просроченная запись удаляется, ошибка возвращается как есть
+
+    Returns:
+        Декоратор; у обёрнутой функции есть cache_clear() и
+        cache_invalidate(*args, **kwargs) для сброса одной записи
+    """
+    ttl = CACHE_POLICIES[policy]
+
+    def decorator(func: Callable) -> Callable:
+        cache: OrderedDict = OrderedDict()
+        lock = threading.Lock()
+
+        def make_key(args: tuple, kwargs: dict) -> tuple:
+            if key_func is not None and args:
+                args = (key_func(args[0]),) + args[1:]
+            return (args, tuple(sorted(kwargs.items())))
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            key = make_key(args, kwargs)
+            now = time.monotonic()
+
+            with lock:
+                entry = cache.get(key)
+                if entry is not None and entry[0] <= now and not stale_on_error:
+                    del cache[key]
+                    entry = None
+            if entry is not None and entry[0] > now:
+                return _copy_result(entry[1])
+
+            try:
+                result = func(*args, **kwargs)
+            except Exception:
+                if entry is not None:
+                    return _copy_result(entry[1])
+                raise
+
+            if isinstance(result, dict) and result.get("success"):
+                with lock:
+                    cache[key] = (now + ttl, result)
+                    cache.move_to_end(key)
+                    while len(cache) > maxsize:
+                        cache.popitem(last=False)
+                return _copy_result(result)
+
+            if entry is not None:
+                return _copy_result(entry[1])
+            return result
+
+        def cache_clear() -> None:
+            with lock:
+                cache.clear()
+
+        def cache_invalidate(*args, **kwargs) -> None:
+            key = make_key(args, kwargs)
+            with lock:
+                cache.pop(key, None)
+
+        wrapper.cache_clear = cache_clear  # ty: ignore[unresolved-attribute]
+        wrapper.cache_invalidate = cache_invalidate  # ty: ignore[unresolved-attribute]
+        return wrapper
+
+    return decorator
+
+
+def _copy_result(result: Any) -> Any:
+    """Поверхностная копия ответа, чтобы вызывающий код не портил кэш."""
+    return dict(result) if isinstance(result, dict) else result
+
+
 # =============================================================================
 # swap.coffee API helpers
 # =============================================================================
@@ -801,7 +1022,7 @@ def main():
                     "area": "monitor",
                     "read_only": True,
                     "writes_on_chain": False,
-                    "requires": ["sseclient-py (optional)"] ,
+                    "requires": [],
                 },
             ],
             "known_limitations": [
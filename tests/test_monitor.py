@@ -0,0 +1,163 @@
+"""
+Unit tests for monitor.py SSE parsing.
+
+Run with: pytest tests/test_monitor.py -v
+"""
+
+import sys
+import threading
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+import monitor
+from monitor import MonitorState, _iter_sse_events, _parse_sse_frame
+
+
+def _events(chunks):
+    return list(_iter_sse_events(chunks))
+
+
+# =============================================================================
+# Frame parsing
+# =============================================================================
+
+
+class TestParseSseFrame:
+    """Tests for _parse_sse_frame."""
+
+    def test_default_event_type(self):
+        """Frame without an event field is a 'message' with no id."""
+        assert _parse_sse_frame(b"data: {}") == ("message", b"{}", None)
+
+    def test_event_id_and_multiline_data(self):
+        """Fields are parsed and data lines are joined with newlines."""
+        frame = b"event: tx\nid: 42\ndata: a\ndata: b"
+
+        assert _parse_sse_frame(frame) == ("tx", b"a\nb", "42")
+
+    def test_comments_and_single_space(self):
+        """Comment lines are skipped; only one leading space is stripped."""
+        frame = b":heartbeat\ndata:  x\ndata:y"
+
+        assert _parse_sse_frame(frame) == ("message", b" x\ny", None)
+
+    def test_id_with_null_is_ignored(self):
+        """An id containing NUL is ignored, as the SSE spec requires."""
+        assert _parse_sse_frame(b"id: a\0b\ndata: x")[2] is None
+
+
+# =============================================================================
+# Stream splitting
+# =============================================================================
+
+
+class TestIterSseEvents:
+    """Tests for _iter_sse_events."""
+
+    def test_lf_frames(self):
+        """Frames separated by blank lines are yielded in order."""
+        events = _events([b"data: x\n\ndata: y\n\n"])
+
+        assert [data for _, data, _ in events] == [b"x", b"y"]
+
+    def test_frame_split_across_chunks(self):
+        """A frame arriving in several chunks is yielded once complete."""
+        events = _events([b"da", b"ta: x\n", b"\n"])
+
+        assert [data for _, data, _ in events] == [b"x"]
+
+    def test_incomplete_frame_is_not_yielded(self):
+        """Data without the terminating blank line is held back."""
+        assert _events([b"data: x\n"]) == []
+
+    @pytest.mark.parametrize(
+        "chunks",
+        [
+            [b"data: x\r\n\r\n"],
+            [b"data: x\r\n\r", b"\n"],
+            [b"data: x\r", b"\n\r\n"],
+            [b"data: x\r\n", b"\r\n"],
+        ],
+    )
+    def test_crlf_line_endings(self, chunks):
+        """CRLF is recognised even when split across chunk boundaries."""
+        assert [data for _, data, _ in _events(chunks)] == [b"x"]
+
+    def test_split_crlf_does_not_merge_events(self):
+        """A CRLF separator split across chunks still ends the first event."""
+        events = _events([b"data: x\r\n\r", b"\ndata: y\n\n"])
+
+        assert [data for _, data, _ in events] == [b"x", b"y"]
+
+    def test_bare_cr_line_endings(self):
+        """Bare CR is a valid SSE line ending."""
+        events = _events([b"data: x\r\rdata: y\r", b"\r", b"data: z\n\n"])
+
+        assert [data for _, data, _ in events] == [b"x", b"y", b"z"]
+
+
+# =============================================================================
+# State persistence
+# =============================================================================
+
+
+class TestMonitorState:
+    """Tests for MonitorState delayed writes."""
+
+    def test_dirty_state_flushed_without_further_events(self):
+        """The last update is written within flush_interval on a quiet stream."""
+        saved = threading.Event()
+        with (
+            patch.object(monitor, "load_state", return_value={"last_seen": {}}),
+            patch.object(
+                monitor, "save_state", side_effect=lambda state: saved.set()
+            ) as mock_save,
+        ):
+            state = MonitorState(flush_interval=0.1)
+            state.update_last_seen("EQaddr", "42")
+
+            assert not mock_save.called
+            assert saved.wait(timeout=2)
+
+        saved_state = mock_save.call_args.args[0]
+        assert saved_state["last_seen"]["EQaddr"]["event_id"] == "42"
+        assert state._timer is None
+
+    def test_burst_written_once(self):
+        """Updates within one interval share a single delayed write."""
+        saved = threading.Event()
+        with (
+            patch.object(monitor, "load_state", return_value={"last_seen": {}}),
+            patch.object(
+                monitor, "save_state", side_effect=lambda state: saved.set()
+            ) as mock_save,
+        ):
+            state = MonitorState(flush_interval=0.1)
+            for event_id in ("1", "2", "3"):
+                state.update_last_seen("EQaddr", event_id)
+
+            assert saved.wait(timeout=2)
+
+        assert mock_save.call_count == 1
+        assert mock_save.call_args.args[0]["last_seen"]["EQaddr"]["event_id"] == "3"
+
+    def test_flush_cancels_pending_timer(self):
+        """An explicit flush on shutdown writes at once and drops the timer."""
+        with (
+            patch.object(monitor, "load_state", return_value={"last_seen": {}}),
+            patch.object(monitor, "save_state") as mock_save,
+        ):
+            state = MonitorState(flush_interval=60)
+            state.update_last_seen("EQaddr", "42")
+            timer = state._timer
+
+            state.flush()
+
+        mock_save.assert_called_once()
+        assert state._timer is None
+        assert timer.finished.is_set()
@@ -0,0 +1,411 @@
+"""
+Unit tests for nft.py module (Marketapp trading helpers).
+
+Run with: pytest tests/test_nft.py -v
+"""
+
+import sys
+from fractions import Fraction
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+import nft
+from nft import (
+    MAX_WALLET_MESSAGES,
+    _fetch_floor_nft,
+    _nano_to_ton,
+    _to_ton,
+    build_and_send_marketapp_tx,
+    buy_nfts,
+    change_prices,
+    create_multi_transfer_message,
+    sell_nfts,
+)
+
+pytestmark = pytest.mark.nft
+
+requires_tonsdk = pytest.mark.skipif(
+    not nft.TONSDK_AVAILABLE, reason="tonsdk not installed"
+)
+
+
+# =============================================================================
+# Test Data
+# =============================================================================
+
+NFT_1 = "EQDtFpEwcFAEcRe5mLVh2N6C0x-_hJEM7W61_JLnSF74p4q2"
+NFT_2 = "EQBvW8Z5huBkMJYdnfAEM5JqTNkuWX3diqYENkWsIL0XggGG"
+OWNER = "0:4e95324902a9671fa85343288b17ad6c45d93b2e2849166cc8f3aa1e9e0a0472"
+
+FIXED_TIME = 1700000000
+
+
+@pytest.fixture(scope="module")
+def v4_wallet():
+    """Fresh v4r2 wallet instance for signing."""
+    from tonsdk.contract.wallet import Wallets, WalletVersionEnum
+
+    _, _, _, wallet = Wallets.create(WalletVersionEnum.v4r2, workchain=0)
+    return wallet
+
+
+@pytest.fixture
+def wallet_data():
+    """Storage record returned by get_wallet_from_storage."""
+    with patch.object(
+        nft, "get_wallet_from_storage", return_value={"address": OWNER}
+    ) as mock:
+        yield mock
+
+
+def _nft_info(owner=OWNER, price_ton=1.5, name="Item"):
+    return {
+        "success": True,
+        "name": name,
+        "owner": owner,
+        "status": "for_sale",
+        "sale": {"price_ton": price_ton},
+    }
+
+
+def _marketapp_tx(messages_count: int) -> dict:
+    return {
+        "success": True,
+        "data": {
+            "transaction": {
+                "messages": [
+                    {"address": NFT_1, "amount": str(10**9 + i)}
+                    for i in range(messages_count)
+                ]
+            }
+        },
+    }
+
+
+# =============================================================================
+# Multi-message signing
+# =============================================================================
+
+
+@requires_tonsdk
+class TestMultiTransferMessage:
+    """Tests for create_multi_transfer_message."""
+
+    def test_single_order_matches_tonsdk(self, v4_wallet):
+        """One order produces the same BOC as wallet.create_transfer_message."""
+        from tonsdk.boc import Cell
+
+        payload = Cell()
+        payload.bits.write_uint(0x1234, 32)
+        to_addr = v4_wallet.address.to_string(True, True, True)
+
+        with patch("time.time", return_value=FIXED_TIME):
+            expected = v4_wallet.create_transfer_message(
+                to_addr=to_addr, amount=5, payload=payload, seqno=3
+            )
+            actual = create_multi_transfer_message(
+                v4_wallet, [(to_addr, 5, payload)], seqno=3
+            )
+
+        assert actual["message"].to_boc(False) == expected["message"].to_boc(False)
+
+    def test_each_order_becomes_outgoing_message(self, v4_wallet):
+        """Every order is appended as its own message ref."""
+        orders = [(NFT_1, 1, None), (NFT_2, 2, None), (NFT_1, 3, None)]
+
+        query = create_multi_transfer_message(v4_wallet, orders, seqno=7)
+
+        assert len(query["signing_message"].refs) == len(orders)
+
+
+@requires_tonsdk
+class TestBuildAndSendMarketappTx:
+    """Tests for build_and_send_marketapp_tx."""
+
+    def test_sends_multi_message_transaction(self, v4_wallet):
+        """Batch transactions with several messages are signed and sent once."""
+        transaction = _marketapp_tx(2)["data"]["transaction"]
+
+        with patch.object(
+            nft, "tonapi_request", return_value={"success": True, "data": {}}
+        ) as mock_send:
+            result = build_and_send_marketapp_tx(transaction, v4_wallet, OWNER, 5)
+
+        assert result["success"] is True
+        mock_send.assert_called_once()
+        assert mock_send.call_args.kwargs["json_data"]["boc"]
+
+    def test_rejects_too_many_messages(self, v4_wallet):
+        """More messages than the wallet can sign is an error, nothing is sent."""
+        transaction = _marketapp_tx(MAX_WALLET_MESSAGES + 1)["data"]["transaction"]
+
+        with patch.object(nft, "tonapi_request") as mock_send:
+            result = build_and_send_marketapp_tx(transaction, v4_wallet, OWNER, 5)
+
+        assert result["success"] is False
+        mock_send.assert_not_called()
+
+
+# =============================================================================
+# Batched trading
+# =============================================================================
+
+
+@requires_tonsdk
+class TestBatchedTrading:
+    """Tests for buy_nfts / sell_nfts / change_prices."""
+
+    def test_buy_nfts_sends_one_request(self, wallet_data):
+        """All NFTs go into a single Marketapp POST."""
+        infos = {NFT_1: _nft_info(price_ton=1.5), NFT_2: _nft_info(price_ton=2.5)}
+
+        with (
+            patch.object(nft, "_get_nft_info_cached", side_effect=infos.get),
+            patch.object(
+                nft, "marketapp_request", return_value=_marketapp_tx(2)
+            ) as mock_request,
+        ):
+            result = buy_nfts([NFT_1, NFT_2], "main", "pw")
+
+        assert result["success"] is True
+        assert result["confirmed"] is False
+        assert result["total_price_ton"] == 4.0
+        assert [n["price_ton"] for n in result["nfts"]] == [1.5, 2.5]
+        assert result["emulation"]["messages_count"] == 2
+
+        mock_request.assert_called_once()
+        assert mock_request.call_args.args[0] == "/nfts/buy/"
+        items = mock_request.call_args.kwargs["json_data"]["data"]
+        assert [i["price"] for i in items] == [1.5, 2.5]
+
+    def test_buy_nfts_confirm_sends_and_invalidates(self, wallet_data):
+        """Confirmed batch is sent once and drops cached NFT info."""
+        infos = {NFT_1: _nft_info(), NFT_2: _nft_info()}
+
+        with (
+            patch.object(nft, "_get_nft_info_cached", side_effect=infos.get),
+            patch.object(nft, "marketapp_request", return_value=_marketapp_tx(2)),
+            patch.object(nft, "create_wallet_instance", return_value=MagicMock()),
+            patch.object(nft, "get_seqno", return_value=1),
+            patch.object(
+                nft, "build_and_send_marketapp_tx", return_value={"success": True}
+            ) as mock_send,
+            patch.object(nft, "invalidate_nft_info") as mock_invalidate,
+        ):
+            result = buy_nfts([NFT_1, NFT_2], "main", "pw", confirm=True)
+
+        assert result["success"] is True
+        assert result["sent"] is True
+        mock_send.assert_called_once()
+        assert [c.args[0] for c in mock_invalidate.call_args_list] == [NFT_1, NFT_2]
+
+    def test_buy_nfts_requires_sale(self, wallet_data):
+        """A batch with an unlisted NFT fails before contacting Marketapp."""
+        infos = {NFT_1: _nft_info(), NFT_2: {"success": True, "sale": None}}
+
+        with (
+            patch.object(nft, "_get_nft_info_cached", side_effect=infos.get),
+            patch.object(nft, "marketapp_request") as mock_request,
+        ):
+            result = buy_nfts([NFT_1, NFT_2], "main", "pw")
+
+        assert result["success"] is False
+        assert NFT_2 in result["error"]
+        mock_request.assert_not_called()
+
+    def test_oversized_transaction_rejected_before_emulation(self, wallet_data):
+        """A returned transaction the wallet cannot sign is refused up front."""
+        infos = {NFT_1: _nft_info(), NFT_2: _nft_info()}
+
+        with (
+            patch.object(nft, "_get_nft_info_cached", side_effect=infos.get),
+            patch.object(
+                nft,
+                "marketapp_request",
+                return_value=_marketapp_tx(MAX_WALLET_MESSAGES + 1),
+            ),
+            patch.object(nft, "emulate_marketapp_tx") as mock_emulate,
+        ):
+            result = buy_nfts([NFT_1, NFT_2], "main", "pw")
+
+        assert result["success"] is False
+        mock_emulate.assert_not_called()
+
+    def test_sell_nfts_checks_ownership(self, wallet_data):
+        """Selling someone else's NFT fails before contacting Marketapp."""
+        infos = {NFT_1: _nft_info(), NFT_2: _nft_info(owner=NFT_1)}
+
+        with (
+            patch.object(nft, "_get_nft_info_cached", side_effect=infos.get),
+            patch.object(nft, "marketapp_request") as mock_request,
+        ):
+            result = sell_nfts(
+                [
+                    {"nft_address": NFT_1, "price": 3},
+                    {"nft_address": NFT_2, "price": 4},
+                ],
+                "main",
+                "pw",
+            )
+
+        assert result["success"] is False
+        assert "not owned" in result["error"]
+        mock_request.assert_not_called()
+
+    def test_sell_nfts_passes_owner_and_prices(self, wallet_data):
+        """Sale request carries the owner's friendly address and every price."""
+        infos = {NFT_1: _nft_info(), NFT_2: _nft_info()}
+
+        with (
+            patch.object(nft, "_get_nft_info_cached", side_effect=infos.get),
+            patch.object(
+                nft, "marketapp_request", return_value=_marketapp_tx(2)
+            ) as mock_request,
+        ):
+            result = sell_nfts(
+                [
+                    {"nft_address": NFT_1, "price": 3},
+                    {"nft_address": NFT_2, "price": 4},
+                ],
+                "main",
+                "pw",
+            )
+
+        assert result["success"] is True
+        json_data = mock_request.call_args.kwargs["json_data"]
+        assert ":" not in json_data["owner_address"]
+        assert [i["price"] for i in json_data["data"]] == [3, 4]
+
+    def test_change_prices_reports_old_and_new(self, wallet_data):
+        """change_prices returns both prices per NFT."""
+        infos = {NFT_1: _nft_info(price_ton=1), NFT_2: _nft_info(price_ton=2)}
+
+        with (
+            patch.object(nft, "_get_nft_info_cached", side_effect=infos.get),
+            patch.object(
+                nft, "marketapp_request", return_value=_marketapp_tx(2)
+            ) as mock_request,
+        ):
+            result = change_prices(
+                [
+                    {"nft_address": NFT_1, "price": 5},
+                    {"nft_address": NFT_2, "price": 6},
+                ],
+                "main",
+                "pw",
+            )
+
+        assert result["success"] is True
+        assert mock_request.call_args.args[0] == "/nfts/change_price/"
+        assert [(n["old_price_ton"], n["new_price_ton"]) for n in result["nfts"]] == [
+            (1, 5),
+            (2, 6),
+        ]
+
+    def test_batch_size_limited(self, wallet_data):
+        """More NFTs than one wallet transaction can carry is refused."""
+        items = [{"nft_address": NFT_1, "price": 1}] * (MAX_WALLET_MESSAGES + 1)
+
+        with patch.object(nft, "marketapp_request") as mock_request:
+            result = change_prices(items, "main", "pw")
+
+        assert result["success"] is False
+        mock_request.assert_not_called()
+
+
+# =============================================================================
+# Collection floor
+# =============================================================================
+
+
+def _onsale_page(*prices):
+    return {
+        "success": True,
+        "data": {
+            "items": [
+                {"address": f"nft{i}", "min_bid": str(p)} for i, p in enumerate(prices)
+            ]
+        },
+    }
+
+
+class TestFetchFloorNft:
+    """Tests for _fetch_floor_nft."""
+
+    def test_sorted_response_used_directly(self):
+        """A server-sorted page gives the floor without a client-side scan."""
+        with patch.object(
+            nft, "marketapp_request", return_value=_onsale_page(5, 7, 9)
+        ) as mock_request:
+            result = _fetch_floor_nft("EQcoll")
+
+        assert result["floor_price_nano"] == 5
+        assert result["floor_nft"]["address"] == "nft0"
+        mock_request.assert_called_once()
+        assert mock_request.call_args.kwargs["params"]["sort_by"] == "min_bid_asc"
+
+    def test_unsorted_response_falls_back_to_scan(self):
+        """If sort_by was ignored, the floor comes from the scan instead."""
+        with patch.object(
+            nft,
+            "marketapp_request",
+            side_effect=[_onsale_page(9, 5, 7), _onsale_page(9, 5, 7, 0)],
+        ) as mock_request:
+            result = _fetch_floor_nft("EQcoll")
+
+        assert result["floor_price_nano"] == 5
+        assert result["floor_nft"]["address"] == "nft1"
+        assert result["on_sale_count"] == 4
+        assert mock_request.call_count == 2
+        assert "sort_by" not in mock_request.call_args.kwargs["params"]
+
+    def test_rejected_sort_falls_back_to_scan(self):
+        """A failed sorted request falls back to the scan."""
+        with patch.object(
+            nft,
+            "marketapp_request",
+            side_effect=[{"success": False, "error": "422"}, _onsale_page(3, 2)],
+        ):
+            result = _fetch_floor_nft("EQcoll")
+
+        assert result["floor_price_nano"] == 2
+
+    def test_nothing_on_sale(self):
+        """An empty sorted page means nothing is listed."""
+        with patch.object(nft, "marketapp_request", return_value=_onsale_page()):
+            result = _fetch_floor_nft("EQcoll")
+
+        assert result["empty"] is True
+        assert result["floor_nft"] is None
+
+
+# =============================================================================
+# nanoTON conversion
+# =============================================================================
+
+
+class TestNanoToTon:
+    """Tests for _to_ton and _nano_to_ton."""
+
+    def test_int_and_string(self):
+        """API amounts may come as int or decimal string."""
+        assert _to_ton(1_500_000_000) == 1.5
+        assert _to_ton("2500000000") == 2.5
+
+    def test_large_amount_single_rounding(self):
+        """Amounts above 2**53 are divided exactly, not via a rounded float."""
+        nano = 2**60 + 1
+        assert _to_ton(nano) == float(Fraction(nano, 10**9))
+
+    def test_zero(self):
+        """A zero sale price stays 0.0, while a missing stat becomes None."""
+        assert _to_ton(0) == 0.0
+        assert _to_ton(None) == 0.0
+        assert _nano_to_ton(0) is None
+        assert _nano_to_ton("") is None
+        assert _nano_to_ton("1000000000") == 1.0
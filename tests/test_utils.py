@@ -8,6 +8,7 @@ Run with: pytest tests/test_utils.py -v
 
 import base64
 import json
+import os
 import sys
 from pathlib import Path
 from unittest.mock import MagicMock, patch
@@ -33,12 +34,16 @@ from utils import (
     friendly_to_raw,
     is_valid_address,
     normalize_address,
+    normalize_address_both,
     _crc16,
     # HTTP
     create_http_session,
+    get_shared_session,
     api_request,
     tonapi_request,
+    ttl_cache,
 )
+from common import json_dumps, json_loads
 
 
 # =============================================================================
@@ -374,6 +379,29 @@ class TestConfigManager:
         # Should return defaults, not crash
         assert "tonapi_key" in config
 
+    def test_cached_config_is_not_shared(self):
+        """Mutating a loaded config does not leak into the next load."""
+        save_config({"limits": {"max_transfer_ton": 50}})
+
+        first = load_config()
+        first["limits"]["max_transfer_ton"] = 1
+        first["tonapi_key"] = "mutated"
+
+        second = load_config()
+        assert second["limits"]["max_transfer_ton"] == 50
+        assert second["tonapi_key"] == ""
+
+    def test_config_reloaded_after_external_change(self):
+        """Cached config is dropped when the file changes on disk."""
+        save_config({"tonapi_key": "old"})
+        assert load_config()["tonapi_key"] == "old"
+
+        self.config_file.write_text(json.dumps({"tonapi_key": "new"}))
+        stat = self.config_file.stat()
+        os.utime(self.config_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+
+        assert load_config()["tonapi_key"] == "new"
+
 
 # =============================================================================
 # Address Formatting Tests
@@ -565,6 +593,16 @@ class TestAddressValidation:
 
         assert normalized == raw
 
+    def test_normalize_address_both(self):
+        """Both forms match normalize_address for raw and friendly input."""
+        friendly = raw_to_friendly(VALID_RAW_ADDRESS)
+
+        assert normalize_address_both(VALID_RAW_ADDRESS) == (
+            VALID_RAW_ADDRESS,
+            friendly,
+        )
+        assert normalize_address_both(friendly) == (VALID_RAW_ADDRESS, friendly)
+
 
 # =============================================================================
 # HTTP Client Tests
@@ -590,6 +628,30 @@ class TestHttpClient:
         assert "https://" in session.adapters
         assert "http://" in session.adapters
 
+    def test_shared_session_is_reused(self):
+        """Shared session is created once per retry setting."""
+        assert get_shared_session(3) is get_shared_session(3)
+        assert get_shared_session(3) is not get_shared_session(1)
+
+    def test_shared_session_pool_and_retry(self):
+        """Shared session pool fits parallel fan-out and retries 429."""
+        adapter = get_shared_session(3).get_adapter("https://tonapi.io")
+
+        assert adapter._pool_maxsize >= 17
+        assert 429 in adapter.max_retries.status_forcelist
+
+    @patch("requests.Session.request")
+    def test_api_request_reuses_session(self, mock_request):
+        """Consecutive requests go through the same pooled session."""
+        mock_request.return_value = MagicMock(ok=True, status_code=200, json=lambda: {})
+
+        api_request("https://api.example.com/a")
+        api_request("https://api.example.com/b")
+
+        first_session = mock_request.call_args_list[0][0][0]
+        second_session = mock_request.call_args_list[1][0][0]
+        assert first_session is second_session
+
     @patch("requests.Session.request")
     def test_api_request_get_success(self, mock_request):
         """Successful GET request returns data."""
@@ -676,6 +738,44 @@ class TestHttpClient:
         assert "connection" in result["error"].lower()
 
 
+class TestJsonHelpers:
+    """Tests for JSON helpers used by CLI output and API parsing."""
+
+    def test_json_dumps_matches_stdlib(self):
+        """Output parses back to the same object and keeps non-ASCII text."""
+        data = {"name": "Тон", "price": 1.5, "tags": ["a", None]}
+
+        text = json_dumps(data)
+
+        assert json.loads(text) == data
+        assert "Тон" in text
+
+    def test_json_dumps_non_str_keys(self):
+        """Non-string keys (e.g. None dex name) are serialized like stdlib."""
+        assert json.loads(json_dumps({None: 1, 2: 3})) == {"null": 1, "2": 3}
+
+    def test_json_dumps_big_int(self):
+        """Integers beyond 64 bits fall back to stdlib serialization."""
+        assert json.loads(json_dumps({"supply": 2**70})) == {"supply": 2**70}
+
+    def test_json_loads_bytes_and_str(self):
+        """json_loads accepts both bytes and str."""
+        assert json_loads(b'{"a": 1}') == {"a": 1}
+        assert json_loads('{"a": 1}') == {"a": 1}
+
+    @patch("requests.Session.request")
+    def test_api_request_parses_raw_content(self, mock_request):
+        """Raw response bytes are decoded as JSON."""
+        body = b'{"rates": {"TON": 1}}'
+        mock_request.return_value = MagicMock(
+            ok=True, status_code=200, content=body, json=lambda: json.loads(body)
+        )
+
+        result = api_request("https://api.example.com/rates")
+
+        assert result["data"] == {"rates": {"TON": 1}}
+
+
 class TestTonApiRequest:
     """Tests for TonAPI-specific request wrapper."""
 
@@ -727,6 +827,123 @@ class TestTonApiRequest:
         assert call_kwargs["params"] == {"limit": 10}
 
 
+class TestTtlCache:
+    """Tests for the in-process TTL response cache."""
+
+    def test_caches_successful_response(self):
+        """Second call within TTL does not hit the wrapped function."""
+        fetch = MagicMock(return_value={"success": True, "data": 1})
+        cached = ttl_cache("short")(fetch)
+
+        assert cached("USDT") == {"success": True, "data": 1}
+        assert cached("USDT") == {"success": True, "data": 1}
+        assert fetch.call_count == 1
+
+    def test_different_args_are_separate_entries(self):
+        """Cache key includes positional and keyword arguments."""
+        fetch = MagicMock(return_value={"success": True})
+        cached = ttl_cache("short")(fetch)
+
+        cached("USDT")
+        cached("NOT")
+        cached("NOT", days=7)
+        assert fetch.call_count == 3
+
+    def test_key_func_shares_entry_between_aliases(self):
+        """Arguments normalized to the same key share one cache entry."""
+        aliases = {"USDT": "EQusdt", "EQusdt": "EQusdt"}
+        fetch = MagicMock(return_value={"success": True})
+        cached = ttl_cache("short", key_func=aliases.get)(fetch)
+
+        cached("USDT")
+        cached("EQusdt")
+        assert fetch.call_count == 1
+        fetch.assert_called_once_with("USDT")
+
+    def test_expired_entry_is_refetched(self):
+        """Entries older than the policy TTL are refreshed."""
+        fetch = MagicMock(return_value={"success": True})
+        cached = ttl_cache("short")(fetch)
+
+        with patch("utils.time.monotonic", return_value=1000.0):
+            cached("USDT")
+        with patch("utils.time.monotonic", return_value=1011.0):
+            cached("USDT")
+        assert fetch.call_count == 2
+
+    def test_failures_are_not_cached(self):
+        """Responses with success=False are returned but not stored."""
+        fetch = MagicMock(return_value={"success": False, "error": "down"})
+        cached = ttl_cache("short")(fetch)
+
+        assert cached("USDT")["success"] is False
+        cached("USDT")
+        assert fetch.call_count == 2
+
+    def test_stale_entry_served_on_error(self):
+        """Expired entry is returned when the refresh fails or raises."""
+        fetch = MagicMock(return_value={"success": True, "data": "old"})
+        cached = ttl_cache("short")(fetch)
+
+        with patch("utils.time.monotonic", return_value=1000.0):
+            cached("USDT")
+
+        fetch.return_value = {"success": False, "error": "down"}
+        with patch("utils.time.monotonic", return_value=2000.0):
+            assert cached("USDT")["data"] == "old"
+
+        fetch.side_effect = RuntimeError("boom")
+        with patch("utils.time.monotonic", return_value=3000.0):
+            assert cached("USDT")["data"] == "old"
+
+    def test_stale_on_error_disabled(self):
+        """With stale_on_error=False an expired entry is dropped, not served."""
+        fetch = MagicMock(return_value={"success": True, "data": "old"})
+        cached = ttl_cache("short", stale_on_error=False)(fetch)
+
+        with patch("utils.time.monotonic", return_value=1000.0):
+            cached("USDT")
+
+        fetch.return_value = {"success": False, "error": "down"}
+        with patch("utils.time.monotonic", return_value=2000.0):
+            assert cached("USDT") == {"success": False, "error": "down"}
+
+        fetch.side_effect = RuntimeError("boom")
+        with patch("utils.time.monotonic", return_value=3000.0):
+            with pytest.raises(RuntimeError):
+                cached("USDT")
+
+    def test_returned_dict_mutation_does_not_leak(self):
+        """Callers get a copy, so mutating the result keeps the cache intact."""
+        cached = ttl_cache("short")(lambda token: {"success": True})
+
+        cached("USDT")["assessment"] = "x"
+        assert "assessment" not in cached("USDT")
+
+    def test_cache_clear(self):
+        """cache_clear() drops all entries."""
+        fetch = MagicMock(return_value={"success": True})
+        cached = ttl_cache("long")(fetch)
+
+        cached("USDT")
+        cached.cache_clear()
+        cached("USDT")
+        assert fetch.call_count == 2
+
+    def test_cache_invalidate_drops_single_entry(self):
+        """cache_invalidate() drops only the matching (normalized) key."""
+        aliases = {"USDT": "EQusdt", "EQusdt": "EQusdt", "NOT": "EQnot"}
+        fetch = MagicMock(return_value={"success": True})
+        cached = ttl_cache("long", key_func=aliases.get)(fetch)
+
+        cached("USDT")
+        cached("NOT")
+        cached.cache_invalidate("EQusdt")
+        cached("USDT")
+        cached("NOT")
+        assert fetch.call_count == 3
+
+
 # =============================================================================
 # Edge Cases and Security
 # =============================================================================